@@ -5,19 +5,26 @@ import time
 import json
 
 
-def fetch_api_data(url: str, retries: int = 5, backoff_factor: float = 1.0):
+# Number of rooms fetched and shown at once; more are loaded with "Show more rooms"
+ROOMS_PER_PAGE = 10
+
+
+def fetch_api_data(url: str, retries: int = 5, backoff_factor: float = 1.0, with_headers: bool = False):
     """
     Fetch JSON data from the provided API URL with retry logic.
 
     :param url: The API endpoint URL.
     :param retries: Maximum number of retry attempts.
     :param backoff_factor: Factor used to compute sleep time between retries.
-    :return: Parsed JSON data if successful, otherwise None.
+    :param with_headers: Whether to also return the response headers.
+    :return: Parsed JSON data (and headers) if successful, otherwise None.
     """
     for attempt in range(retries):
         try:
             response = requests.get(url, timeout=60)
             response.raise_for_status()
+            if with_headers:
+                return response.json(), response.headers
             return response.json()
         except requests.exceptions.RequestException as e:
             st.write(f"API request failed (attempt {attempt + 1}/{retries}): {str(e)}")
@@ -38,11 +45,13 @@ def fetch_room_ranking(date: str, start_time: str, end_time: str, seating_capaci
                        noise_level_preference: str, lighting_preference: str,
                        equipment_weight: int, temperature_weight: int,
                        air_quality_weight: int, noise_weight: int,
-                       lighting_weight: int):
+                       lighting_weight: int, cursor: str = None):
     """
-    Build the API URL with query parameters and fetch the ranked list of available rooms.
+    Build the API URL with query parameters and fetch a page of the ranked list of available rooms.
     
-    :return: JSON response with room ranking data.
+    :param cursor: Cursor of the page returned by the previous call, None for the first page.
+    :return: Tuple of the room ranking data and the cursor of the next page (None on the last page),
+        or None if the request failed.
     """
     api_url = (
         f"http://booking_system:8081/rank-rooms?date={date}"
@@ -60,8 +69,15 @@ def fetch_room_ranking(date: str, start_time: str, end_time: str, seating_capaci
         f"&air_quality_weight={air_quality_weight}"
         f"&noise_weight={noise_weight}"
         f"&light_weight={lighting_weight}"
+        f"&top_k={ROOMS_PER_PAGE}"
     )
-    return fetch_api_data(api_url)
+    if cursor:
+        api_url += f"&cursor={cursor}"
+    result = fetch_api_data(api_url, with_headers=True)
+    if result is None:
+        return None
+    data, headers = result
+    return data, headers.get("X-Next-Cursor")
 
 
 def send_booking(room_id: str, date: str, start_time: str, end_time: str, user_name: str, description: str) -> bool:
@@ -161,6 +177,10 @@ if "current_search" not in st.session_state:
     st.session_state.current_search = None
 if "message" not in st.session_state:
     st.session_state.message = None  # Holds success or error messages.
+if "next_cursor" not in st.session_state:
+    st.session_state.next_cursor = None  # Cursor of the next page of the ranking.
+if "ranking_params" not in st.session_state:
+    st.session_state.ranking_params = None  # Parameters of the last ranking request.
 
 # Page Title
 st.title("Room Booking System")
@@ -243,6 +263,7 @@ if st.session_state.current_search is None:
 elif st.session_state.current_search != new_search_key:
     st.session_state.current_search = new_search_key
     st.session_state.availability_data = None
+    st.session_state.next_cursor = None
     st.session_state.message = None
 
 
@@ -253,29 +274,31 @@ if st.button("Check Availability"):
     if time_intervals.index(start_time) >= time_intervals.index(end_time):
         st.error("End time must be later than start time!")
     else:
+        st.session_state.ranking_params = dict(
+            date=str(date),
+            start_time=start_time,
+            end_time=end_time,
+            seating_capacity=seating_capacity,
+            pc=pc,
+            projector=projector,
+            blackboard=blackboard,
+            smartboard=smartboard,
+            whiteboard=whiteboard,
+            microphone=microphone,
+            temperature_preference=temperature_preference,
+            air_quality_preference=air_quality_preference,
+            noise_level_preference=noise_level_preference,
+            lighting_preference=lighting_preference,
+            equipment_weight=equipment_weight,
+            temperature_weight=temperature_weight,
+            air_quality_weight=air_quality_weight,
+            noise_weight=noise_weight,
+            lighting_weight=lighting_weight
+        )
         with st.spinner("Searching for available rooms..."):
-            data = fetch_room_ranking(
-                date=str(date),
-                start_time=start_time,
-                end_time=end_time,
-                seating_capacity=seating_capacity,
-                pc=pc,
-                projector=projector,
-                blackboard=blackboard,
-                smartboard=smartboard,
-                whiteboard=whiteboard,
-                microphone=microphone,
-                temperature_preference=temperature_preference,
-                air_quality_preference=air_quality_preference,
-                noise_level_preference=noise_level_preference,
-                lighting_preference=lighting_preference,
-                equipment_weight=equipment_weight,
-                temperature_weight=temperature_weight,
-                air_quality_weight=air_quality_weight,
-                noise_weight=noise_weight,
-                lighting_weight=lighting_weight
-            )
-        st.session_state.availability_data = data  # Save the fetched ranking data.
+            result = fetch_room_ranking(**st.session_state.ranking_params)
+        # Save the fetched ranking data.
+        st.session_state.availability_data, st.session_state.next_cursor = result if result else (None, None)
         st.session_state.message = None  # Clear any previous messages.
 
 ##############################
@@ -295,9 +318,12 @@ if st.session_state.message:
 # Display Available Rooms    #
 ##############################
 if st.session_state.availability_data is not None:
-    available_rooms = st.session_state.availability_data
+    # Rooms whose environmental data could not be fetched in time are listed without rank
+    available_rooms = [room for room in st.session_state.availability_data if room.get("compliance") != "unknown"]
+    unknown_rooms = [room["room_id"] for room in st.session_state.availability_data if room.get("compliance") == "unknown"]
     if available_rooms:
-        st.success(f"Found {len(available_rooms)} available rooms!")
+        more = " so far" if st.session_state.next_cursor else ""
+        st.success(f"Found {len(available_rooms)} available rooms{more}!")
         for room in available_rooms:
             with st.expander(f"Rank #{room['rank']} - {room['room_id']} (Score: {room['score']:.2f})", expanded=True):
                 cols = st.columns([3, 1])
@@ -351,8 +377,17 @@ if st.session_state.availability_data is not None:
                         )
                     else:
                         st.warning("Enter your name and course name above to book")
-    else:
+    elif not unknown_rooms:
         st.warning("No available rooms found matching your criteria")
+    if unknown_rooms:
+        st.info(f"Environmental data currently unavailable for: {', '.join(unknown_rooms)}")
+    if st.session_state.next_cursor and st.button("Show more rooms"):
+        with st.spinner("Loading more rooms..."):
+            result = fetch_room_ranking(**st.session_state.ranking_params, cursor=st.session_state.next_cursor)
+        if result:
+            data, st.session_state.next_cursor = result
+            st.session_state.availability_data = st.session_state.availability_data + data
+            st.rerun()
 
 
 ##############################
@@ -0,0 +1,264 @@
+"""
+Offline benchmark of the room-ranking pipeline.
+
+For every combination of the sweep parameters, a stub of restapi_rooms (benchmarks/stub_restapi.py)
+is started in a separate process with a seeded synthetic dataset, and get_ranking,
+build_topsis_matrix and topsis_decision_logic are run against it. The report holds latency
+percentiles, the peak RSS of the benchmark process and the number of upstream requests per
+endpoint, as JSON to compare between versions.
+
+    get_ranking (cold)      every run starts with empty caches, catalog and availability index
+    get_ranking (warm)      caches kept between runs
+    get_ranking (warm, top 10)  as warm, only the 10 best rooms selected and formatted
+    build_topsis_matrix     compliance cache emptied before every run
+    topsis_decision_logic   on the decision matrix built for the dataset
+
+With --raw, the compliance summary endpoint is treated as unavailable, so compliance is computed
+from the raw 30-second sensor data.
+
+Run from the booking_system directory:
+    python -m benchmarks.bench_pipeline --rooms 10 50 100 --days 1 14 --booking-density 0.3 --output bench.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.stub_restapi import SyntheticDataset, serve
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def reset_peak_rss() -> bool:
+    """Resets the peak RSS of the process (Linux only). Returns False if it cannot be reset."""
+    try:
+        with open("/proc/self/clear_refs", "w") as clear_refs:
+            clear_refs.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_kb() -> int:
+    """Returns the peak RSS of the process in KiB since the last reset_peak_rss."""
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def latency_stats(timings: list) -> dict:
+    timings_ms = np.array(timings) * 1000
+    return {
+        "runs": len(timings),
+        "mean_ms": float(timings_ms.mean()),
+        "min_ms": float(timings_ms.min()),
+        "p50_ms": float(np.percentile(timings_ms, 50)),
+        "p90_ms": float(np.percentile(timings_ms, 90)),
+        "p99_ms": float(np.percentile(timings_ms, 99)),
+        "max_ms": float(timings_ms.max()),
+    }
+
+
+class StubProcess:
+    """Runs the stub of restapi_rooms for one dataset in a child process."""
+
+    def __init__(self, dataset: SyntheticDataset, port: int):
+        self.url = f"http://127.0.0.1:{port}"
+        ready = multiprocessing.Event()
+        self.process = multiprocessing.Process(target=serve, args=(dataset, port, ready), daemon=True)
+        self.process.start()
+        if not ready.wait(timeout=30):
+            raise RuntimeError("Stub server did not start")
+
+    def stats(self) -> dict:
+        with urllib.request.urlopen(f"{self.url}/_stats") as response:
+            return json.loads(response.read())
+
+    def reset(self):
+        urllib.request.urlopen(urllib.request.Request(f"{self.url}/_reset", data=b"", method="POST")).close()
+
+    def stop(self):
+        self.process.terminate()
+        self.process.join()
+
+
+def run_case(name: str, func, setup, repeat: int, stub: StubProcess) -> dict:
+    """
+    Runs func repeat times (after setup each time) and measures latency, peak RSS and upstream requests.
+    """
+    stub.reset()
+    rss_reset = reset_peak_rss()
+    timings = []
+    for _ in range(repeat):
+        setup()
+        # The pipeline logs every room; keep the output of the benchmark readable
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+    upstream = stub.stats()
+    return {
+        "benchmark": name,
+        "latency": latency_stats(timings),
+        "peak_rss_kb": peak_rss_kb(),
+        "peak_rss_scope": "case" if rss_reset else "process",
+        "upstream_requests": upstream,
+        "upstream_requests_per_run": sum(upstream.values()) / repeat,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rooms", type=int, nargs="+", default=[10, 50, 100], help="Numbers of rooms")
+    parser.add_argument("--days", type=int, nargs="+", default=[14], help="Days of 30-second sensor data")
+    parser.add_argument("--booking-density", type=float, nargs="+", default=[0.3], help="Shares of booked slots")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per benchmark")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the datasets")
+    parser.add_argument("--port", type=int, default=18080, help="Port of the stub of restapi_rooms")
+    parser.add_argument("--raw", action="store_true", help="Compute compliance from the raw sensor data")
+    parser.add_argument("--output", help="File to write the JSON report to (default: stdout)")
+    args = parser.parse_args()
+
+    # The modules read their configuration at import time, so it is set before importing them
+    os.environ["RESTAPI_ROOMS_URL"] = f"http://127.0.0.1:{args.port}"
+    os.environ["SHARED_STORE_PATH"] = os.path.join(tempfile.mkdtemp(prefix="bench_pipeline_"), "store.sqlite")
+    # Large sweeps must measure the full pipeline rather than stop at the request deadline
+    os.environ.setdefault("REQUEST_DEADLINE", "600")
+    from modules import decision_logic
+    from modules.availability_index import AvailabilityIndex
+    from modules.room_catalog import RoomCatalog
+
+    if args.raw:
+        decision_logic.fetch_compliance_summary = lambda *args, **kwargs: None
+
+    # Benchmark every process on its own: no state shared with other workers
+    decision_logic.compliance_cache.store = None
+
+    def reset_compliance():
+        decision_logic.compliance_cache.invalidate()
+
+    def reset_all():
+        reset_compliance()
+        decision_logic.room_catalog = RoomCatalog()
+        decision_logic.availability_index = AvailabilityIndex()
+
+    params = dict(
+        start_time="10:00:00", end_time="11:00:00", seating_capacity=10,
+        projector=True, blackboard=False, smartboard=False, microphone=False, pc=True, whiteboard=False,
+        air_quality_preference="high", noise_level="silent", lighting="bright", temperature_preference="moderate",
+        equipment_weight=5, air_quality_weight=3, temperature_weight=2, noise_weight=1, light_weight=1,
+    )
+    user_prefs = decision_logic.create_user_prefs(
+        params["seating_capacity"], params["projector"], params["blackboard"], params["smartboard"],
+        params["microphone"], params["pc"], params["whiteboard"], params["air_quality_preference"],
+        params["noise_level"], params["lighting"], params["temperature_preference"],
+    )
+    weights = decision_logic.build_weights(
+        params["projector"], params["blackboard"], params["smartboard"], params["microphone"], params["pc"],
+        params["whiteboard"], params["equipment_weight"], params["air_quality_weight"],
+        params["temperature_weight"], params["noise_weight"], params["light_weight"],
+    )
+    lower_better_cols = decision_logic.get_lower_better_cols(params["temperature_preference"])
+
+    results = []
+    for rooms in args.rooms:
+        for days in args.days:
+            for density in args.booking_density:
+                dataset = SyntheticDataset(rooms, days, density, seed=args.seed)
+                date = dataset.start_date.isoformat()
+                stub = StubProcess(dataset, args.port)
+                try:
+                    reset_all()
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        available = decision_logic.check_availability(
+                            date, params["start_time"], params["end_time"],
+                            decision_logic.room_catalog, params["seating_capacity"],
+                        )
+                        matrix = decision_logic.build_topsis_matrix(
+                            available, decision_logic.RANKING_SENSORS, decision_logic.room_catalog
+                        )
+
+                    cases = [
+                        run_case("get_ranking (cold)", lambda: decision_logic.get_ranking(date=date, **params),
+                                 reset_all, args.repeat, stub),
+                        run_case("get_ranking (warm)", lambda: decision_logic.get_ranking(date=date, **params),
+                                 lambda: None, args.repeat, stub),
+                        run_case("get_ranking (warm, top 10)",
+                                 lambda: decision_logic.get_ranking(date=date, limit=10, **params),
+                                 lambda: None, args.repeat, stub),
+                        run_case("build_topsis_matrix",
+                                 lambda: decision_logic.build_topsis_matrix(
+                                     available, decision_logic.RANKING_SENSORS, decision_logic.room_catalog),
+                                 reset_compliance, args.repeat, stub),
+                    ]
+                    if not matrix.empty:
+                        cases.append(run_case(
+                            "topsis_decision_logic",
+                            lambda: decision_logic.topsis_decision_logic(matrix, user_prefs, weights, lower_better_cols),
+                            lambda: None, args.repeat, stub,
+                        ))
+                finally:
+                    stub.stop()
+
+                for case in cases:
+                    case.update({
+                        "rooms": rooms, "days": days, "booking_density": density,
+                        "available_rooms": len(available), "ranked_rooms": len(matrix),
+                    })
+                    results.append(case)
+                    print(f"{case['benchmark']:<26} rooms={rooms:<5} days={days:<3} density={density:<4} "
+                          f"p50={case['latency']['p50_ms']:9.2f} ms p90={case['latency']['p90_ms']:9.2f} ms "
+                          f"requests/run={case['upstream_requests_per_run']:7.1f}", file=sys.stderr)
+
+    report = {
+        "created_at": datetime.utcnow().isoformat() + "Z",
+        "revision": git_revision(),
+        "environment": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "config": {
+            "repeat": args.repeat,
+            "seed": args.seed,
+            "raw_sensor_data": args.raw,
+            "request": params,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Microbenchmark of the PM2.5/PM10 24h rolling-window check.
+
+Compares the previous implementation of check_compliance_pm25 (row-by-row strptime parsing, sort,
+set_index and a pandas time-based rolling mean) with the NumPy kernel in modules/timeseries.py.
+
+Run from the booking_system directory:
+    python -m benchmarks.bench_timeseries --days 14 --repeat 5
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from modules.compliance_check import calculate_percentage, check_compliance_pm25, parse_timestamp
+from modules.timeseries import NS_PER_DAY, parse_timestamps, rolling_exceedance, sort_by_time
+
+
+def make_series(days: int, step_seconds: int = 30, seed: int = 0) -> pd.DataFrame:
+    """Builds a PM2.5 series in the format returned by restapi_rooms."""
+    rng = np.random.default_rng(seed)
+    n = days * 86400 // step_seconds
+    timestamps = pd.date_range("2025-01-01", periods=n, freq=f"{step_seconds}s", tz="UTC")
+    values = 18 + 8 * np.sin(np.arange(n) / 2880) + rng.normal(0, 3, n)
+    return pd.DataFrame({
+        "timestamp": [ts.isoformat() for ts in timestamps],
+        "value": values,
+    })
+
+
+def legacy_pm25_exceedance(df: pd.DataFrame, limit: float = 25) -> float:
+    """The rolling-window part of check_compliance_pm25 before the NumPy kernel."""
+    df = df.copy()
+    df["timestamp"] = df["timestamp"].apply(parse_timestamp)
+    df = df.sort_values("timestamp").set_index("timestamp")
+    return calculate_percentage(df["value"].rolling("24h").mean() > limit)
+
+
+def kernel_pm25_exceedance(df: pd.DataFrame, limit: float = 25) -> float:
+    times, values = sort_by_time(parse_timestamps(df["timestamp"]), df["value"].to_numpy(dtype=float))
+    return rolling_exceedance(times, values, NS_PER_DAY, limit)
+
+
+def best_of(func, df: pd.DataFrame, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(df)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=14, help="Days of 30-second data")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per implementation (best is reported)")
+    args = parser.parse_args()
+
+    df = make_series(args.days)
+    assert np.isclose(legacy_pm25_exceedance(df), kernel_pm25_exceedance(df))
+
+    legacy = best_of(legacy_pm25_exceedance, df, args.repeat)
+    kernel = best_of(kernel_pm25_exceedance, df, args.repeat)
+    full = best_of(check_compliance_pm25, df, args.repeat)
+
+    print(f"points:                      {len(df)}")
+    print(f"legacy rolling check:        {legacy * 1000:9.2f} ms")
+    print(f"numpy kernel:                {kernel * 1000:9.2f} ms  ({legacy / kernel:.1f}x faster)")
+    print(f"check_compliance_pm25:       {full * 1000:9.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
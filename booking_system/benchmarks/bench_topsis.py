@@ -0,0 +1,134 @@
+"""
+Microbenchmark of the TOPSIS ranking.
+
+Compares the previous pandas implementation of topsis_decision_logic (DataFrame copies, per-column
+mean/std loop and ideal solutions built column by column) with the NumPy kernel in modules/topsis.py
+and with the current topsis_decision_logic, which wraps the kernel.
+
+Run from the booking_system directory:
+    python -m benchmarks.bench_topsis --rooms 10 100 1000 10000 --repeat 5
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from modules.decision_logic import (
+    build_weights,
+    create_user_prefs,
+    get_lower_better_cols,
+    topsis_decision_logic,
+)
+from modules.topsis import topsis_closeness
+
+
+EQUIPMENT = ["projector", "capacity", "blackboard", "microphone", "pc", "smartboard", "whiteboard"]
+
+# Column order of the weights returned by build_weights
+WEIGHT_COLUMNS = ["co2", "temperature", "noise", "light", "humidity", "voc", "pm2_5", "pm10",
+                  "projector", "capacity", "blackboard", "microphone", "pc", "smartboard", "whiteboard"]
+
+
+def make_matrix(rooms: int, seed: int = 0) -> pd.DataFrame:
+    """Builds a decision matrix with the columns produced by build_topsis_matrix."""
+    rng = np.random.default_rng(seed)
+    data = {
+        "co2": rng.uniform(400, 1000, rooms),
+        "temperature": rng.uniform(19, 26, rooms),
+        "noise": rng.uniform(20, 80, rooms),
+        "light": rng.uniform(500, 1500, rooms),
+        "humidity": rng.uniform(30, 70, rooms),
+        "voc": rng.uniform(50, 400, rooms),
+        "pm2_5": rng.uniform(1, 25, rooms),
+        "pm10": rng.uniform(5, 50, rooms),
+    }
+    for column in EQUIPMENT:
+        data[column] = rng.integers(10, 200, rooms) if column == "capacity" else rng.integers(0, 2, rooms)
+    return pd.DataFrame(data, index=[f"room-{i}" for i in range(rooms)])
+
+
+def legacy_topsis(room_data: pd.DataFrame, user_pref: dict, weights=None, lower_better_cols=[]) -> pd.DataFrame:
+    """topsis_decision_logic before the NumPy kernel."""
+    adjusted_df = room_data.copy()
+    for col in user_pref:
+        if col in room_data.columns:
+            mean, std = room_data[col].mean(), room_data[col].std()
+            adjusted_df[col] = -abs((room_data[col] - user_pref[col]) / (std + 1e-9))
+        else:
+            adjusted_df[col] = room_data[col]
+
+    norm = np.sqrt((adjusted_df ** 2).sum(axis=0))
+    normalized = adjusted_df / norm
+
+    if weights is None:
+        weights = np.ones(len(room_data.columns))
+    weights = np.array(weights) / np.sum(weights)
+    weighted = normalized * weights
+
+    ideal_best = {}
+    ideal_worst = {}
+    for col in weighted.columns:
+        if col in lower_better_cols:
+            ideal_best[col] = weighted[col].min()
+            ideal_worst[col] = weighted[col].max()
+        else:
+            ideal_best[col] = weighted[col].max()
+            ideal_worst[col] = weighted[col].min()
+
+    dist_pis = np.sqrt(((weighted - pd.Series(ideal_best)) ** 2).sum(axis=1))
+    dist_nis = np.sqrt(((weighted - pd.Series(ideal_worst)) ** 2).sum(axis=1))
+    closeness = dist_nis / (dist_pis + dist_nis)
+
+    result = room_data.copy()
+    result['score'] = closeness
+    result['rank'] = closeness.rank(ascending=False)
+    return result.sort_values('rank')
+
+
+def best_of(func, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rooms", type=int, nargs="+", default=[10, 100, 1000, 10000], help="Matrix sizes")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per implementation (best is reported)")
+    args = parser.parse_args()
+
+    user_prefs = create_user_prefs(20, True, False, True, False, True, False, "high", "silent", "bright", "cool")
+    weights = build_weights(True, False, True, False, True, False, 5, 3, 2, 1, 1)
+    lower_better_cols = get_lower_better_cols("cool")
+
+    print(f"{'rooms':>7} {'legacy pandas':>15} {'wrapper':>22} {'numpy kernel':>22}")
+    for rooms in args.rooms:
+        matrix = make_matrix(rooms)
+        # The legacy implementation expects the preferences in the column order of the matrix
+        ordered_prefs = {col: user_prefs[col] for col in matrix.columns}
+        ordered_weights = [weights[WEIGHT_COLUMNS.index(col)] for col in matrix.columns]
+
+        expected = legacy_topsis(matrix, ordered_prefs, ordered_weights, lower_better_cols)
+        result = topsis_decision_logic(matrix, ordered_prefs, ordered_weights, lower_better_cols)
+        assert np.allclose(expected["score"], result["score"].reindex(expected.index))
+
+        values = matrix.to_numpy(dtype=np.float64)
+        prefs = np.array([ordered_prefs[col] for col in matrix.columns], dtype=np.float64)
+        lower_better = matrix.columns.isin(lower_better_cols)
+        ordered_weights = np.array(ordered_weights, dtype=np.float64)
+
+        legacy = best_of(lambda: legacy_topsis(matrix, ordered_prefs, ordered_weights, lower_better_cols), args.repeat)
+        wrapper = best_of(lambda: topsis_decision_logic(matrix, ordered_prefs, ordered_weights, lower_better_cols), args.repeat)
+        kernel = best_of(lambda: topsis_closeness(values, prefs, ordered_weights, lower_better), args.repeat)
+
+        print(f"{rooms:>7} {legacy * 1000:12.2f} ms "
+              f"{wrapper * 1000:9.2f} ms ({legacy / wrapper:5.1f}x) "
+              f"{kernel * 1000:9.2f} ms ({legacy / kernel:5.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Microbenchmark of the wire format of the sensor series.
+
+Compares the list of {"timestamp": iso_string, "value": v} readings with the columnar representation
+(start/step encoded epoch milliseconds and a values array) for one sensor series: payload size,
+JSON parse time, time to build the DataFrame and memory of the DataFrame.
+
+Run from the booking_system directory:
+    python -m benchmarks.bench_wire_format --days 14 --repeat 5
+"""
+import argparse
+import json
+import time
+
+import pandas as pd
+
+from benchmarks.stub_restapi import SyntheticDataset
+from modules.data_fetcher import columnar_frame
+
+
+def best_of(func, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=14, help="Days of 30-second data")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per format (best is reported)")
+    args = parser.parse_args()
+
+    dataset = SyntheticDataset(rooms=1, days=args.days, booking_density=0.0)
+    room_id = dataset.room_ids[0]
+    formats = {
+        "readings": (dataset.sensor_body(room_id, "co2", args.days), lambda data: pd.DataFrame(data["co2"])),
+        "columnar": (dataset.sensor_columnar_body(room_id, "co2", args.days), columnar_frame),
+    }
+
+    print(f"{'format':>9} {'payload':>10} {'json parse':>11} {'dataframe':>11} {'memory':>10}")
+    for name, (body, build) in formats.items():
+        parse_time, data = best_of(lambda: json.loads(body), args.repeat)
+        build_time, frame = best_of(lambda: build(data), args.repeat)
+        memory = frame.memory_usage(deep=True).sum()
+        print(f"{name:>9} {len(body) / 1024:7.0f} KB {parse_time * 1000:8.1f} ms "
+              f"{build_time * 1000:8.1f} ms {memory / 1024:7.0f} KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+"""
+Local stand-in for restapi_rooms serving a synthetic, seeded dataset.
+
+The stub answers the endpoints the booking system calls (equipment with ETag, bookings, compliance
+summary and per-room sensor data) from generated data instead of Postgres, Google Calendar and
+InfluxDB, so the ranking pipeline can be benchmarked offline. Sensor series are served in the
+columnar representation when the Accept header asks for it, like restapi_rooms does. Every dataset
+is fully determined by its parameters and seed, and the stub counts the requests it receives per
+endpoint (GET /_stats, POST /_reset).
+
+Run from the booking_system directory:
+    python -m benchmarks.stub_restapi --rooms 50 --days 14 --booking-density 0.3 --port 18080
+"""
+import argparse
+import hashlib
+import json
+import threading
+from collections import Counter
+from datetime import date as Date, datetime, timedelta
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+
+from modules.compliance_check import summarize_compliance_batch
+
+
+SENSORS = ["co2", "temperature", "noise", "light", "humidity", "voc", "pm2_5", "pm10"]
+
+# Typical level and spread of every sensor, inside the compliance limits for most rooms
+SENSOR_PROFILES = {
+    "co2": (700.0, 120.0),
+    "temperature": (22.0, 1.0),
+    "noise": (40.0, 6.0),
+    "light": (750.0, 120.0),
+    "humidity": (45.0, 6.0),
+    "voc": (150.0, 40.0),
+    "pm2_5": (10.0, 3.0),
+    "pm10": (20.0, 5.0),
+}
+
+COLUMNAR_MEDIA_TYPE = "application/vnd.rooms.columnar+json"
+
+EQUIPMENT_FLAGS = ["projector", "pc", "microphone", "smartboard", "blackboard", "whiteboard"]
+
+# Bookable slots of a day: 08:00 to 20:00
+BOOKING_HOURS = (8, 20)
+
+
+class SyntheticDataset:
+    """
+    Rooms, equipment, bookings and sensor histories generated from a seed.
+
+    Parameters:
+        rooms (int): Number of rooms.
+        days (int): Days of sensor history and of bookings from start_date.
+        booking_density (float): Probability that a bookable 30-minute slot is booked.
+        seed (int): Seed of all random draws.
+        step_seconds (int): Interval between two sensor measurements.
+        start_date (str): First day of the bookings in "YYYY-MM-DD" format.
+    """
+
+    def __init__(
+        self,
+        rooms: int,
+        days: int,
+        booking_density: float,
+        seed: int = 0,
+        step_seconds: int = 30,
+        start_date: str = "2025-03-03",
+    ):
+        self.rooms = rooms
+        self.days = days
+        self.booking_density = booking_density
+        self.seed = seed
+        self.step_seconds = step_seconds
+        self.start_date = datetime.strptime(start_date, "%Y-%m-%d").date()
+        # Histories end at the current minute, as the compliance window is relative to now
+        self.end = np.datetime64(datetime.utcnow().replace(second=0, microsecond=0), "s")
+        self.room_ids = [f"room-{index:04d}" for index in range(rooms)]
+        self.positions = {room_id: index for index, room_id in enumerate(self.room_ids)}
+
+        rng = self.rng("equipment")
+        self.equipment = [
+            {
+                "capacity": int(rng.choice([10, 20, 30, 50, 80, 120])),
+                **{flag: bool(rng.random() < 0.5) for flag in EQUIPMENT_FLAGS},
+            }
+            for _ in self.room_ids
+        ]
+        self.equipment_body = json.dumps(
+            [{"room": room_id, "equipment": equipment} for room_id, equipment in zip(self.room_ids, self.equipment)]
+        ).encode()
+        self.equipment_etag = '"' + hashlib.sha1(self.equipment_body).hexdigest() + '"'
+
+    def rng(self, *parts) -> np.random.Generator:
+        """Returns a generator seeded by the dataset seed and parts, independent of the call order."""
+        digest = hashlib.sha256(repr((self.seed,) + parts).encode()).digest()
+        return np.random.default_rng(int.from_bytes(digest[:8], "little"))
+
+    def bookings(self, start_date: Date, days: int) -> dict:
+        """
+        Returns {room: ["%Y-%m-%d %H:%M:%S", ...]} for days days from start_date, like /rooms/bookings.
+        """
+        first_slot, last_slot = BOOKING_HOURS[0] * 2, BOOKING_HOURS[1] * 2
+        bookings = {}
+        for room_id in self.room_ids:
+            slots = []
+            for offset in range(days):
+                day = start_date + timedelta(days=offset)
+                if not 0 <= (day - self.start_date).days < self.days:
+                    continue
+                booked = self.rng("bookings", room_id, day.isoformat()).random(last_slot - first_slot) < self.booking_density
+                for slot in np.flatnonzero(booked) + first_slot:
+                    moment = datetime(day.year, day.month, day.day) + timedelta(minutes=30 * int(slot))
+                    slots.append(moment.strftime("%Y-%m-%d %H:%M:%S"))
+            bookings[room_id] = slots
+        return bookings
+
+    def series(self, room_id: str, sensor: str, days: int):
+        """
+        Returns the (timestamps, values) arrays of a room's sensor over the last days days.
+        """
+        days = min(days, self.days)
+        points = days * 86400 // self.step_seconds
+        times = self.end - np.arange(points, 0, -1) * np.timedelta64(self.step_seconds, "s")
+        level, spread = SENSOR_PROFILES[sensor]
+        rng = self.rng("series", room_id, sensor)
+        # Room-specific offset plus a daily cycle and noise
+        offset = rng.normal(0, spread / 2)
+        cycle = np.sin(np.arange(points) * (2 * np.pi * self.step_seconds / 86400))
+        values = level + offset + spread * cycle + rng.normal(0, spread / 3, points)
+        return times, values
+
+    @lru_cache(maxsize=256)
+    def sensor_body(self, room_id: str, sensor: str, days: int) -> bytes:
+        """Returns the /rooms/{room_id}/{sensor} response body."""
+        times, values = self.series(room_id, sensor, days)
+        timestamps = np.char.add(np.datetime_as_string(times, unit="s"), "+00:00")
+        return json.dumps({
+            "room": room_id,
+            sensor: [{"timestamp": ts, "value": round(float(value), 2)} for ts, value in zip(timestamps.tolist(), values)],
+        }).encode()
+
+    @lru_cache(maxsize=256)
+    def sensor_columnar_body(self, room_id: str, sensor: str, days: int) -> bytes:
+        """Returns the /rooms/{room_id}/{sensor} response body in the columnar representation."""
+        times, values = self.series(room_id, sensor, days)
+        return json.dumps({
+            "room": room_id,
+            "sensor": sensor,
+            "count": len(times),
+            "start": int(times[0].astype("datetime64[ms]").astype(np.int64)) if len(times) else None,
+            "step": self.step_seconds * 1000,
+            "values": np.round(values, 2).tolist(),
+        }).encode()
+
+    @lru_cache(maxsize=None)
+    def summary(self, room_id: str, sensor: str, days: int) -> dict:
+        """Returns the compliance statistics of a room's sensor, as computed by /rooms/compliance-summary."""
+        times, values = self.series(room_id, sensor, days)
+        frame = pd.DataFrame({
+            "room_id": room_id,
+            "sensor": sensor,
+            "timestamp": np.datetime_as_string(times, unit="s"),
+            "value": values,
+        })
+        stats = summarize_compliance_batch(frame).loc[(room_id, sensor)]
+        return {key: float(value) for key, value in stats.items() if not pd.isna(value)}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    dataset: SyntheticDataset = None
+    requests = Counter()
+    lock = threading.Lock()
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_body(self, body: bytes, status: int = 200, headers: dict = None, content_type: str = "application/json"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def count(self, endpoint: str):
+        with self.lock:
+            self.requests[endpoint] += 1
+
+    def do_POST(self):
+        if urlparse(self.path).path == "/_reset":
+            with self.lock:
+                self.requests.clear()
+            return self.send_body(b"{}")
+        self.send_body(b'{"error": "Not found"}', 404)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        parts = url.path.strip("/").split("/")
+        dataset = self.dataset
+
+        if url.path == "/_stats":
+            with self.lock:
+                return self.send_body(json.dumps(dict(self.requests)).encode())
+
+        if url.path == "/rooms/equipment":
+            self.count("/rooms/equipment")
+            if self.headers.get("If-None-Match") == dataset.equipment_etag:
+                self.send_response(304)
+                self.send_header("ETag", dataset.equipment_etag)
+                return self.end_headers()
+            return self.send_body(dataset.equipment_body, headers={"ETag": dataset.equipment_etag})
+
+        if url.path == "/rooms/bookings":
+            self.count("/rooms/bookings")
+            start_date = datetime.strptime(query.get("startDate", dataset.start_date.isoformat()), "%Y-%m-%d").date()
+            return self.send_body(json.dumps(dataset.bookings(start_date, int(query.get("days", 1)))).encode())
+
+        if url.path == "/rooms/compliance-summary":
+            self.count("/rooms/compliance-summary")
+            rooms = [room for room in query.get("rooms", "").split(",") if room in dataset.positions]
+            sensors = [sensor for sensor in query.get("sensors", "").split(",") if sensor in SENSOR_PROFILES]
+            days = int(query.get("days", 14))
+            body = [
+                {"room": room_id, "sensors": {sensor: dataset.summary(room_id, sensor, days) for sensor in sensors}}
+                for room_id in rooms or dataset.room_ids
+            ]
+            return self.send_body(json.dumps(body).encode())
+
+        if len(parts) == 3 and parts[0] == "rooms" and parts[1] in dataset.positions and parts[2] in SENSOR_PROFILES:
+            self.count("/rooms/{room_id}/{sensor}")
+            if COLUMNAR_MEDIA_TYPE in self.headers.get("Accept", ""):
+                body = dataset.sensor_columnar_body(parts[1], parts[2], dataset.days)
+                return self.send_body(body, content_type=COLUMNAR_MEDIA_TYPE)
+            return self.send_body(dataset.sensor_body(parts[1], parts[2], dataset.days))
+
+        self.send_body(b'{"error": "Not found"}', 404)
+
+
+def serve(dataset: SyntheticDataset, port: int, ready=None):
+    """
+    Serves dataset on 127.0.0.1:port until the process is terminated.
+
+    Parameters:
+        dataset (SyntheticDataset): The data to serve.
+        port (int): Port to listen on.
+        ready (multiprocessing.Event): Set once the server accepts connections.
+    """
+    handler = type("DatasetHandler", (StubHandler,), {"dataset": dataset, "requests": Counter()})
+    ThreadingHTTPServer.allow_reuse_address = True
+    ThreadingHTTPServer.daemon_threads = True
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    if ready is not None:
+        ready.set()
+    server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rooms", type=int, default=50, help="Number of rooms")
+    parser.add_argument("--days", type=int, default=14, help="Days of 30-second sensor data and bookings")
+    parser.add_argument("--booking-density", type=float, default=0.3, help="Share of booked slots between 08:00 and 20:00")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the dataset")
+    parser.add_argument("--port", type=int, default=18080, help="Port to listen on")
+    args = parser.parse_args()
+
+    dataset = SyntheticDataset(args.rooms, args.days, args.booking_density, seed=args.seed)
+    print(f"Serving {args.rooms} rooms on http://127.0.0.1:{args.port} (RESTAPI_ROOMS_URL)")
+    serve(dataset, args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+# Production server: several pre-forked worker processes, each with a few threads.
+# Run with: gunicorn --config gunicorn.conf.py swagger_server.wsgi:application
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8081')}"
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "gthread"
+threads = int(os.getenv("WEB_THREADS", "4"))
+timeout = int(os.getenv("WEB_TIMEOUT", "120"))
+
+# Import the application once in the master so that the workers share its memory copy-on-write.
+# Background threads, connection pools and store connections are created lazily in each worker.
+preload_app = True
+
+# The workers share compliance results, the room catalog and metrics through modules/shared_store.py
+os.environ["SHARED_STORE_ENABLED"] = "1"
+
+accesslog = "-"
+
+
+def on_starting(server):
+    # Entries of a previous run of the service must not be reused
+    from modules.shared_store import shared_store
+    shared_store.remove()
+
+
+def worker_exit(server, worker):
+    # Runs in the exiting worker: its metrics snapshot would otherwise stay in the shared store forever
+    from modules.instrumentation import metrics
+    metrics.discard()
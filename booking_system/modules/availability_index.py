@@ -0,0 +1,359 @@
+import os
+import threading
+import time
+from datetime import date as Date, datetime, timedelta
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from modules.data_fetcher import fetch_room_bookings
+from modules.instrumentation import span
+from modules.shared_store import SharedStore
+
+
+SLOT_MINUTES = 30
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+
+# Number of days loaded in one bookings request, and the time after which they are fetched again
+HORIZON_DAYS = int(os.getenv("AVAILABILITY_HORIZON_DAYS", "14"))
+INDEX_TTL = float(os.getenv("AVAILABILITY_INDEX_TTL", "60"))
+# Seconds during which the bookings version read from the shared store is reused
+VERSION_INTERVAL = float(os.getenv("AVAILABILITY_VERSION_INTERVAL", "1"))
+
+
+def parse_day(day) -> Date:
+    """
+    Parses a "YYYY-MM-DD" string (or a date) into a date.
+    """
+    if isinstance(day, datetime):
+        return day.date()
+    if isinstance(day, Date):
+        return day
+    return datetime.strptime(day, "%Y-%m-%d").date()
+
+
+def slot_index(moment: datetime) -> int:
+    """
+    Returns the index of the 30-minute slot of the day a moment falls in.
+    """
+    return (moment.hour * 60 + moment.minute) // SLOT_MINUTES
+
+
+def slot_mask(start_time: str, end_time: str) -> int:
+    """
+    Builds the bitmask of the 30-minute slots covering [start_time, end_time).
+
+    Parameters:
+        start_time (str): Start time in "HH:MM:SS" format.
+        end_time (str): End time in "HH:MM:SS" format, "24:00:00" for the end of the day.
+
+    Returns:
+        int: Bitmask where bit i stands for the slot starting at i * 30 minutes.
+    """
+    first = slot_index(datetime.strptime(start_time, "%H:%M:%S"))
+    if end_time == "24:00:00":
+        last = SLOTS_PER_DAY
+    else:
+        last = slot_index(datetime.strptime(end_time, "%H:%M:%S"))
+    if last <= first:
+        return 0
+    return ((1 << (last - first)) - 1) << first
+
+
+def search_window(earliest_time: str, latest_time: str) -> int:
+    """
+    Builds the bitmask of the whole 30-minute slots inside [earliest_time, latest_time).
+
+    Unlike slot_mask, a start time inside a slot is rounded up to the next slot, so that no
+    booking found in the window starts before earliest_time.
+
+    Parameters:
+        earliest_time (str): Earliest start time in "HH:MM:SS" format.
+        latest_time (str): Latest end time in "HH:MM:SS" format, "24:00:00" for the end of the day.
+
+    Returns:
+        int: Bitmask where bit i stands for the slot starting at i * 30 minutes.
+    """
+    moment = datetime.strptime(earliest_time, "%H:%M:%S")
+    seconds = (moment.hour * 60 + moment.minute) * 60 + moment.second
+    first = -(-seconds // (SLOT_MINUTES * 60))
+    return slot_mask("00:00:00", latest_time) >> first << first
+
+
+class AvailabilityIndex:
+    """
+    Booked slots of all rooms as one 48-bit bitmap per room and day.
+
+    The bitmaps of a rolling horizon of days are held in a (rooms, days) uint64 array, loaded with a
+    single bookings request and reloaded once they are older than the TTL. Checking which rooms are
+    free for a set of slots is a bitwise AND of one integer mask over the whole array, and single
+    bookings can be added or removed in place without a reload. With a shared store, the index is
+    also reloaded when another worker process reported a booking (see bump_bookings); the version
+    of the bookings in the store is read at most every version_interval seconds.
+
+    The bookings are fetched without holding the lock, by one thread at a time, so that reads of
+    an index that is still valid never wait for a reload.
+
+    Parameters:
+        horizon_days (int): Minimum number of days loaded at once.
+        ttl (float): Lifetime of the loaded bookings in seconds.
+        store (SharedStore): Store shared with the other worker processes, or None.
+        version_interval (float): Time in seconds during which a bookings version is reused.
+    """
+
+    def __init__(self, horizon_days: int = HORIZON_DAYS, ttl: float = INDEX_TTL, store: Optional[SharedStore] = None,
+                 version_interval: float = VERSION_INTERVAL):
+        self.horizon_days = horizon_days
+        self.ttl = ttl
+        self.store = store
+        self.version_interval = version_interval
+        self.version = 0
+        self.start: Optional[Date] = None
+        self.loaded_at = 0.0
+        self.room_ids: List[str] = []
+        self.positions: Dict[str, int] = {}
+        self.masks = np.zeros((0, 0), dtype=np.uint64)
+        self._lock = threading.RLock()
+        self._load_lock = threading.Lock()
+        # Slots booked or released while the bookings are fetched, applied again to the new bitmaps
+        self._changes: Optional[List[tuple]] = None
+        self._store_version = 0
+        self._version_checked_at: Optional[float] = None
+
+    @property
+    def days(self) -> int:
+        return self.masks.shape[1]
+
+    def _position(self, room_id: str) -> int:
+        """
+        Returns the row of a room, adding an empty row for a room that was not seen yet.
+        """
+        position = self.positions.get(room_id)
+        if position is None:
+            position = self.positions[room_id] = len(self.room_ids)
+            self.room_ids.append(room_id)
+            self.masks = np.vstack((self.masks, np.zeros((1, self.days), dtype=np.uint64)))
+        return position
+
+    def _locate(self, slot_timestamp: str):
+        """
+        Returns the (day column, slot index) of a "%Y-%m-%d %H:%M:%S" slot, or None outside the horizon.
+        """
+        moment = datetime.strptime(slot_timestamp, "%Y-%m-%d %H:%M:%S")
+        if self.start is None:
+            return None
+        day = (moment.date() - self.start).days
+        if not 0 <= day < self.days:
+            return None
+        return day, slot_index(moment)
+
+    def load(self, start: Date, days: int):
+        """
+        Replaces the index with the bookings of days days from start.
+
+        Raises:
+            RuntimeError: If the bookings cannot be fetched.
+        """
+        version = self.bookings_version(fresh=True)
+        with self._lock:
+            self._changes = []
+        try:
+            with span("bookings_load"):
+                bookings = fetch_room_bookings(start.strftime("%Y-%m-%d"), days=days)
+            if bookings is None:
+                raise RuntimeError("Could not fetch room bookings")
+
+            with self._lock:
+                self.version = version
+                self.start = start
+                self.masks = np.zeros((len(self.room_ids), days), dtype=np.uint64)
+                for room_id, slots in bookings.items():
+                    for slot in slots:
+                        self._set(room_id, slot, True)
+                for room_id, slot, booked in self._changes:
+                    self._set(room_id, slot, booked)
+                self.loaded_at = time.monotonic()
+        finally:
+            with self._lock:
+                self._changes = None
+        print(f"Availability index loaded: {len(self.room_ids)} rooms, {days} days from {start}")
+
+    def covers(self, first_day: Date, last_day: Date) -> bool:
+        """
+        Checks that the index is fresh and covers first_day to last_day.
+        """
+        version = self.bookings_version()
+        with self._lock:
+            return (
+                self.start is not None
+                and self.start <= first_day
+                and last_day < self.start + timedelta(days=self.days)
+                and time.monotonic() - self.loaded_at < self.ttl
+                and version == self.version
+            )
+
+    def ensure(self, first_day: Date, last_day: Date):
+        """
+        Reloads the index if it is stale or does not cover first_day to last_day.
+
+        Threads needing a reload wait for the one already loading, and load again only if its
+        bookings still do not cover their days.
+        """
+        if self.covers(first_day, last_day):
+            return
+        with self._load_lock:
+            if not self.covers(first_day, last_day):
+                self.load(first_day, max(self.horizon_days, (last_day - first_day).days + 1))
+
+    def bookings_version(self, fresh: bool = False) -> int:
+        """
+        Returns the number of bookings reported to any worker, 0 without a shared store.
+
+        The version read from the store is reused for version_interval seconds unless fresh is True.
+        """
+        if self.store is None:
+            return 0
+        with self._lock:
+            checked_at = self._version_checked_at
+            if not fresh and checked_at is not None and time.monotonic() - checked_at < self.version_interval:
+                return self._store_version
+        try:
+            version = self.store.version("bookings", "all")
+        except Exception as e:
+            print(f"Shared store lookup failed: {str(e)}")
+            return self.version
+        with self._lock:
+            self._store_version = version
+            self._version_checked_at = time.monotonic()
+        return version
+
+    def bump_bookings(self, date: str) -> int:
+        """
+        Tells the other workers that a booking of date was made, so that they reload their index and
+        drop what they derived from that date.
+
+        Returns:
+            int: The new version of the bookings of date, 0 without a shared store.
+        """
+        if self.store is None:
+            return 0
+        self.store.bump("bookings", "all")
+        return self.store.bump("bookings", date)
+
+    def date_version(self, date: str) -> int:
+        """
+        Returns the number of bookings of date reported to any worker, 0 without a shared store.
+        """
+        if self.store is None:
+            return 0
+        try:
+            return self.store.version("bookings", date)
+        except Exception as e:
+            print(f"Shared store lookup failed: {str(e)}")
+            return 0
+
+    def _set(self, room_id: str, slot_timestamp: str, booked: bool) -> bool:
+        position = self._position(room_id)
+        location = self._locate(slot_timestamp)
+        if location is None:
+            return False
+        day, slot = location
+        bit = np.uint64(1 << slot)
+        if booked:
+            self.masks[position, day] |= bit
+        else:
+            self.masks[position, day] &= ~bit
+        return True
+
+    def book(self, room_id: str, slot_timestamp: str) -> bool:
+        """
+        Marks a "%Y-%m-%d %H:%M:%S" slot of a room as booked.
+
+        Returns:
+            bool: False if the slot is outside the loaded horizon (it will be picked up by the next load).
+        """
+        with self._lock:
+            if self._changes is not None:
+                self._changes.append((room_id, slot_timestamp, True))
+            return self._set(room_id, slot_timestamp, True)
+
+    def release(self, room_id: str, slot_timestamp: str) -> bool:
+        """
+        Marks a "%Y-%m-%d %H:%M:%S" slot of a room as free.
+        """
+        with self._lock:
+            if self._changes is not None:
+                self._changes.append((room_id, slot_timestamp, False))
+            return self._set(room_id, slot_timestamp, False)
+
+    def day_masks(self, room_ids: List[str], start_date: str, days: int) -> np.ndarray:
+        """
+        Returns the booked-slot bitmaps of rooms over several days.
+
+        Parameters:
+            room_ids (list): Rooms to look up. Rooms without any booking get empty bitmaps.
+            start_date (str): First day in "YYYY-MM-DD" format.
+            days (int): Number of days.
+
+        Returns:
+            np.ndarray: uint64 array of shape (rooms, days).
+        """
+        first_day = parse_day(start_date)
+        self.ensure(first_day, first_day + timedelta(days=days - 1))
+        with self._lock:
+            offset = (first_day - self.start).days
+            positions = np.array([self.positions.get(room_id, -1) for room_id in room_ids], dtype=np.intp)
+            booked = np.zeros((len(room_ids), days), dtype=np.uint64)
+            known = positions >= 0
+            booked[known] = self.masks[positions[known], offset:offset + days]
+        return booked
+
+    def free_days(self, room_ids: List[str], start_date: str, days: int, mask: int) -> np.ndarray:
+        """
+        Checks which rooms have all the slots of mask free on each of several days.
+
+        Parameters:
+            room_ids (list): Rooms to check.
+            start_date (str): First day in "YYYY-MM-DD" format.
+            days (int): Number of days.
+            mask (int): Bitmask of the slots, as returned by slot_mask.
+
+        Returns:
+            np.ndarray: Boolean array of shape (rooms, days).
+        """
+        return (self.day_masks(room_ids, start_date, days) & np.uint64(mask)) == 0
+
+    def free_rooms(self, room_ids: List[str], date: str, start_time: str, end_time: str) -> List[str]:
+        """
+        Lists the rooms that are free during the whole period of a day.
+        """
+        free = self.free_days(room_ids, date, 1, slot_mask(start_time, end_time))[:, 0]
+        return [room_id for room_id, is_free in zip(room_ids, free) if is_free]
+
+
+def free_starts(booked: np.ndarray, slots: int, window: int) -> np.ndarray:
+    """
+    Finds the start slots of free runs of a given length in booked-slot bitmaps.
+
+    Parameters:
+        booked (np.ndarray): uint64 bitmaps of booked slots, of any shape.
+        slots (int): Length of the run in slots.
+        window (int): Bitmask of the slots the runs must lie in, as returned by slot_mask.
+
+    Returns:
+        np.ndarray: uint64 bitmaps of the same shape where bit i is set if slots i to i + slots - 1
+            are all free and inside the window.
+    """
+    free = ~booked & np.uint64(window)
+    starts = free.copy()
+    for offset in range(1, slots):
+        starts &= free >> np.uint64(offset)
+    return starts
+
+
+def expand_slots(bitmaps: np.ndarray) -> np.ndarray:
+    """
+    Expands uint64 slot bitmaps into a boolean array with one more axis of SLOTS_PER_DAY slots.
+    """
+    bits = np.arange(SLOTS_PER_DAY, dtype=np.uint64)
+    return ((bitmaps[..., None] >> bits) & np.uint64(1)).astype(bool)
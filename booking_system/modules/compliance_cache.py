@@ -0,0 +1,220 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+from modules.shared_store import SharedStore
+
+
+class TTLCache:
+    """
+    Thread-safe, size-bounded LRU cache whose entries expire after a time-to-live.
+
+    Parameters:
+        maxsize (int): Maximum number of entries. The least recently used entry is evicted first.
+        ttl (float): Lifetime of an entry in seconds.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # key -> [value, expires_at, last_access]
+        self._entries: "OrderedDict[Hashable, list]" = OrderedDict()
+        self._lock = threading.RLock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Returns the value stored under key, or None if it is missing or expired.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] <= now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            entry[2] = now
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """
+        Stores value under key, evicting the least recently used entries if the cache is full.
+        """
+        now = time.monotonic()
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            last_access = previous[2] if previous is not None else now
+            self._entries[key] = [value, now + (self.ttl if ttl is None else ttl), last_access]
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, predicate: Optional[Callable[[Hashable], bool]] = None) -> int:
+        """
+        Removes every entry whose key matches predicate (all entries if predicate is None).
+
+        Returns:
+            int: Number of removed entries.
+        """
+        with self._lock:
+            keys = [key for key in self._entries if predicate is None or predicate(key)]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    def expiring(self, within: float, accessed_since: float) -> List[Hashable]:
+        """
+        Lists the keys that expire in less than `within` seconds and were read in the last
+        `accessed_since` seconds.
+        """
+        now = time.monotonic()
+        with self._lock:
+            return [
+                key for key, (_, expires_at, last_access) in self._entries.items()
+                if expires_at - now < within and now - last_access < accessed_since
+            ]
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns the hit, miss and eviction counters and the current size of the cache.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+            }
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+
+class ComplianceCache(TTLCache):
+    """
+    Cache of compliance results keyed by (room_id, sensor, window_days).
+
+    A background thread reloads the entries that are about to expire and have been read recently,
+    so that frequently requested rooms never fall back to the sensor download and compliance checks.
+    With a shared store, loaded entries are also written to it, and the worker processes look up
+    the store before evaluating anything themselves.
+
+    Parameters:
+        loader (callable): Function receiving a list of keys and returning a dictionary
+            {key: value} for the keys it could evaluate.
+        maxsize (int): Maximum number of entries.
+        ttl (float): Lifetime of an entry in seconds.
+        refresh_ahead (float): Entries expiring within this many seconds are reloaded by the refresher.
+        refresh_interval (float): Time between two runs of the refresher in seconds.
+        store (SharedStore): Store shared with the other worker processes, or None.
+        namespace (str): Namespace of the entries in the store.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[List[Hashable]], Dict[Hashable, Any]],
+        maxsize: int = 4096,
+        ttl: float = 600.0,
+        refresh_ahead: float = 60.0,
+        refresh_interval: float = 15.0,
+        store: Optional[SharedStore] = None,
+        namespace: str = "compliance",
+    ):
+        super().__init__(maxsize=maxsize, ttl=ttl)
+        self.loader = loader
+        self.refresh_ahead = refresh_ahead
+        self.refresh_interval = refresh_interval
+        self.store = store
+        self.namespace = namespace
+        self.refreshes = 0
+        self.shared_hits = 0
+        self._refresher: Optional[threading.Thread] = None
+        self._refresher_pid: Optional[int] = None
+
+    def load(self, keys: List[Hashable], min_ttl: float = 0.0) -> Dict[Hashable, Any]:
+        """
+        Evaluates keys with the loader and stores the results. Keys another worker already stored
+        in the shared store with more than min_ttl seconds left are taken from there instead.
+
+        Returns:
+            dict: The loaded values.
+        """
+        if not keys:
+            return {}
+        values = {}
+        if self.store is not None:
+            try:
+                shared = self.store.get_many(self.namespace, keys)
+            except Exception as e:
+                print(f"Shared store lookup failed: {str(e)}")
+                shared = {}
+            for key, (value, remaining) in shared.items():
+                if remaining > min_ttl:
+                    self.set(key, value, ttl=remaining)
+                    values[key] = value
+            with self._lock:
+                self.shared_hits += len(values)
+            keys = [key for key in keys if key not in values]
+        if not keys:
+            return values
+
+        loaded = self.loader(keys)
+        for key, value in loaded.items():
+            self.set(key, value)
+        if self.store is not None:
+            try:
+                self.store.set_many(self.namespace, loaded, self.ttl)
+            except Exception as e:
+                print(f"Shared store update failed: {str(e)}")
+        values.update(loaded)
+        return values
+
+    def refresh(self) -> int:
+        """
+        Reloads the recently used entries that are about to expire.
+
+        Returns:
+            int: Number of reloaded entries.
+        """
+        keys = self.expiring(within=self.refresh_ahead, accessed_since=self.ttl)
+        if not keys:
+            return 0
+        loaded = self.load(keys, min_ttl=self.refresh_ahead)
+        with self._lock:
+            self.refreshes += len(loaded)
+        return len(loaded)
+
+    def start_refresher(self):
+        """
+        Starts the background refresher of the current process, if it is not running yet.
+        """
+        with self._lock:
+            pid = os.getpid()
+            if self._refresher is not None and self._refresher_pid == pid and self._refresher.is_alive():
+                return
+            self._refresher = threading.Thread(target=self._refresh_loop, name="compliance-refresher", daemon=True)
+            self._refresher_pid = pid
+            self._refresher.start()
+
+    def _refresh_loop(self):
+        while True:
+            time.sleep(self.refresh_interval)
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Compliance cache refresh failed: {str(e)}")
+
+    def stats(self) -> Dict[str, int]:
+        stats = super().stats()
+        with self._lock:
+            stats["refreshes"] = self.refreshes
+            stats["shared_hits"] = self.shared_hits
+        return stats
@@ -2,6 +2,14 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 
+from modules.timeseries import (
+    NS_PER_DAY,
+    parse_timestamps,
+    sort_by_time,
+    rolling_exceedance,
+    grouped_rolling_mean,
+)
+
 def calculate_percentage(series):
     """Helper function to calculate the percentage of True values in a boolean series."""
     return series.mean() * 100
@@ -63,14 +71,9 @@ def check_compliance_pm25(df_pm25: pd.DataFrame, tolerance: float = 5.0):
     """
     pm25_limit = 25
 
-    df_pm25['timestamp'] = df_pm25['timestamp'].apply(parse_timestamp)
-    df_pm25 = df_pm25.sort_values('timestamp')
-
-    df_pm25 = df_pm25.set_index('timestamp')
-
-    df_pm25['pm2_5_rolling'] = df_pm25['value'].rolling('24h').mean()
+    times, values = sort_by_time(parse_timestamps(df_pm25['timestamp']), df_pm25['value'].to_numpy(dtype=float))
 
-    pm25_non_compliant = calculate_percentage(df_pm25['pm2_5_rolling'] > pm25_limit)
+    pm25_non_compliant = rolling_exceedance(times, values, NS_PER_DAY, pm25_limit)
 
     compliant = pm25_non_compliant <= tolerance
     avg_pm25 = df_pm25['value'].mean()
@@ -97,14 +100,9 @@ def check_compliance_pm10(df_pm10: pd.DataFrame, tolerance: float = 5.0):
     """
     pm10_limit = 50
 
-    df_pm10['timestamp'] = df_pm10['timestamp'].apply(parse_timestamp)
-    df_pm10 = df_pm10.sort_values('timestamp')
-    
-    df_pm10 = df_pm10.set_index('timestamp')
+    times, values = sort_by_time(parse_timestamps(df_pm10['timestamp']), df_pm10['value'].to_numpy(dtype=float))
 
-    df_pm10['pm10_rolling'] = df_pm10['value'].rolling('24h').mean()
-
-    pm10_non_compliant = calculate_percentage(df_pm10['pm10_rolling'] > pm10_limit)
+    pm10_non_compliant = rolling_exceedance(times, values, NS_PER_DAY, pm10_limit)
 
     compliant = pm10_non_compliant <= tolerance
     avg_pm10 = df_pm10['value'].mean()
@@ -274,4 +272,273 @@ def check_compliance_temperature(df: pd.DataFrame, tolerance: float = 20.0):
         'max_temperature': max_temperature,
         'percent_in_range': percent_in_range,
         'compliant': compliant
-    }
\ No newline at end of file
+    }
+
+# Thresholds behind the statistics consumed by check_compliance_summary: "upper"/"lower" give the
+# percentage of measurements strictly above/below the value (pct_above/pct_below), "rolling" the
+# percentage of 24h rolling means strictly above the value (pct_rolling_above).
+SUMMARY_THRESHOLDS = {
+    "co2": {"upper": 1500, "lower": 1000},
+    "pm2_5": {"rolling": 25},
+    "pm10": {"rolling": 50},
+    "noise": {"upper": 85},
+    "light": {"lower": 500},
+    "humidity": {"upper": 70, "lower": 30},
+    "voc": {"upper": 400},
+    "temperature": {"upper": 26, "lower": 19},
+}
+
+# Default tolerances of check_compliance_summary, the same as those of the per-sensor checks
+SUMMARY_TOLERANCES = {
+    "co2": 5.0,
+    "pm2_5": 5.0,
+    "pm10": 5.0,
+    "noise": 10.0,
+    "light": 50.0,
+    "humidity": 15.0,
+    "voc": 5.0,
+    "temperature": 20.0,
+}
+
+
+def check_compliance_summary(sensor: str, summary: dict, tolerance: float = None):
+    """
+    Evaluates the compliance rules of a sensor from precomputed statistics instead of raw measurements.
+    The statistics are those returned by the restapi_rooms `/rooms/compliance-summary` endpoint
+    (mean, max, min, count and the threshold exceedance percentages), and the verdicts mirror the
+    per-sensor checks above.
+
+    Parameters:
+        sensor (str): Sensor name.
+        summary (dict): Statistics of the sensor for one room, or None if there was no data.
+        tolerance (float): Allowed percentage of non-compliance. Defaults to the tolerance of the
+            corresponding per-sensor check.
+
+    Returns:
+        dict: A summary of compliance, with the same keys as the per-sensor check.
+    """
+    if not summary or not summary.get('count'):
+        return {'compliant': False}
+    if tolerance is None:
+        tolerance = SUMMARY_TOLERANCES.get(sensor, 0.0)
+
+    if sensor == "co2":
+        return {
+            'avg_co2_level': summary['mean'],
+            'max_co2_level': summary['max'],
+            'below_1000_ppm': summary['pct_below'],
+            'exceeded_1500_ppm': summary['pct_above'],
+            'compliant': (summary['pct_above'] <= tolerance) and (summary['pct_below'] > 50)
+        }
+    elif sensor == "pm2_5":
+        return {
+            'avg_pm25': summary['mean'],
+            'pm2_5_non_compliant': summary['pct_rolling_above'],
+            'compliant': summary['pct_rolling_above'] <= tolerance
+        }
+    elif sensor == "pm10":
+        return {
+            'avg_pm10': summary['mean'],
+            'pm10_non_compliant': summary['pct_rolling_above'],
+            'compliant': summary['pct_rolling_above'] <= tolerance
+        }
+    elif sensor == "noise":
+        return {
+            'avg_noise_level': summary['mean'],
+            'max_noise_level': summary['max'],
+            'exceeded_85_db': summary['pct_above'],
+            'compliant': summary['pct_above'] <= tolerance
+        }
+    elif sensor == "light":
+        return {
+            'avg_light_intensity': summary['mean'],
+            'min_light_intensity': summary['min'],
+            'max_light_intensity': summary['max'],
+            'below_recommended': summary['pct_below'],
+            'compliant': summary['pct_below'] <= tolerance
+        }
+    elif sensor == "humidity":
+        percent_in_range = 100 - summary['pct_below'] - summary['pct_above']
+        return {
+            'avg_humidity': summary['mean'],
+            'min_humidity': summary['min'],
+            'max_humidity': summary['max'],
+            'percent_in_range': percent_in_range,
+            'compliant': percent_in_range >= (100 - tolerance)
+        }
+    elif sensor == "voc":
+        return {
+            'avg_voc_level': summary['mean'],
+            'max_voc_level': summary['max'],
+            'percent_above_limit': summary['pct_above'],
+            'compliant': summary['pct_above'] <= tolerance
+        }
+    elif sensor == "temperature":
+        percent_in_range = 100 - summary['pct_below'] - summary['pct_above']
+        return {
+            'avg_temperature': summary['mean'],
+            'min_temperature': summary['min'],
+            'max_temperature': summary['max'],
+            'percent_in_range': percent_in_range,
+            'compliant': percent_in_range >= (100 - tolerance)
+        }
+
+    print(f"No compliance rule defined for sensor '{sensor}'. Assuming compliant.")
+    return {'compliant': True}
+
+
+# Columns of the statistics computed by summarize_compliance_batch
+STAT_COLUMNS = ['mean', 'max', 'min', 'count', 'pct_above', 'pct_below', 'pct_rolling_above']
+
+
+def summarize_compliance_batch(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Computes the compliance statistics of every room and sensor in a single grouped pass.
+    The statistics are those consumed by check_compliance_summary.
+
+    Parameters:
+        df (pd.DataFrame): Long-format DataFrame with columns 'room_id', 'sensor', 'timestamp' and 'value'.
+
+    Returns:
+        pd.DataFrame: DataFrame indexed by ('room_id', 'sensor') with the columns 'mean', 'max', 'min',
+            'count', 'pct_above', 'pct_below' and 'pct_rolling_above'. Percentages of thresholds a sensor
+            does not have are NaN.
+    """
+    if df.empty:
+        return pd.DataFrame(columns=STAT_COLUMNS, index=pd.MultiIndex.from_tuples([], names=['room_id', 'sensor']))
+
+    def threshold(name):
+        return df['sensor'].map({sensor: t.get(name, np.nan) for sensor, t in SUMMARY_THRESHOLDS.items()})
+
+    values = df['value'].astype(float)
+    frame = pd.DataFrame({
+        'room_id': df['room_id'],
+        'sensor': df['sensor'],
+        'value': values,
+        'above': (values > threshold('upper')) * 100.0,
+        'below': (values < threshold('lower')) * 100.0,
+    })
+    stats = frame.groupby(['room_id', 'sensor']).agg(
+        mean=('value', 'mean'),
+        max=('value', 'max'),
+        min=('value', 'min'),
+        count=('value', 'count'),
+        pct_above=('above', 'mean'),
+        pct_below=('below', 'mean'),
+    )
+
+    # 24h rolling means, only for the sensors with a rolling limit
+    rolling_limits = {sensor: t['rolling'] for sensor, t in SUMMARY_THRESHOLDS.items() if 'rolling' in t}
+    rolling_rows = df[df['sensor'].isin(rolling_limits.keys())]
+    if not rolling_rows.empty:
+        groups = pd.MultiIndex.from_arrays([rolling_rows['room_id'], rolling_rows['sensor']])
+        codes, uniques = pd.factorize(groups)
+        means = grouped_rolling_mean(
+            codes, parse_timestamps(rolling_rows['timestamp']), rolling_rows['value'].to_numpy(dtype=float), NS_PER_DAY
+        )
+        limits = rolling_rows['sensor'].map(rolling_limits).to_numpy(dtype=float)
+        exceeded = pd.Series((means > limits) * 100.0).groupby(codes).mean()
+        stats['pct_rolling_above'] = pd.Series(exceeded.to_numpy(), index=uniques[exceeded.index])
+    else:
+        stats['pct_rolling_above'] = np.nan
+
+    # Percentages of thresholds a sensor does not have are meaningless
+    sensors = stats.index.get_level_values('sensor')
+    for column, name in (('pct_above', 'upper'), ('pct_below', 'lower'), ('pct_rolling_above', 'rolling')):
+        has_threshold = sensors.map(lambda sensor: name in SUMMARY_THRESHOLDS.get(sensor, {}))
+        stats.loc[~np.asarray(has_threshold, dtype=bool), column] = np.nan
+
+    return stats[STAT_COLUMNS]
+
+
+def stats_from_summaries(summaries: dict) -> pd.DataFrame:
+    """
+    Builds the statistics of summarize_compliance_batch from the statistics returned by the restapi_rooms
+    `/rooms/compliance-summary` endpoint.
+
+    Parameters:
+        summaries (dict): Mapping of room id to a mapping of sensor to its statistics (None without data).
+
+    Returns:
+        pd.DataFrame: DataFrame indexed by ('room_id', 'sensor') with the columns of STAT_COLUMNS.
+    """
+    records = [
+        {'room_id': room_id, 'sensor': sensor, **summary}
+        for room_id, sensors in summaries.items()
+        for sensor, summary in sensors.items()
+        if summary
+    ]
+    stats = pd.DataFrame.from_records(records, columns=['room_id', 'sensor'] + STAT_COLUMNS)
+    return stats.astype({column: float for column in STAT_COLUMNS}).set_index(['room_id', 'sensor'])
+
+
+def check_compliance_stats(stats: pd.DataFrame, tolerances: dict = None) -> pd.DataFrame:
+    """
+    Evaluates every compliance rule for every room from precomputed statistics in a single vectorized pass.
+
+    Parameters:
+        stats (pd.DataFrame): Statistics indexed by ('room_id', 'sensor'), as returned by
+            summarize_compliance_batch or stats_from_summaries.
+        tolerances (dict): Allowed percentage of non-compliance per sensor. Sensors that are missing use
+            the tolerance of the corresponding per-sensor check.
+
+    Returns:
+        pd.DataFrame: DataFrame indexed by room id with, for every sensor, the average value (column named
+            after the sensor, as in the TOPSIS decision matrix) and the verdict ('<sensor>_compliant'),
+            plus an overall 'compliant' column. A room without data for a sensor is not compliant.
+    """
+    tolerances = {**SUMMARY_TOLERANCES, **(tolerances or {})}
+    if stats.empty:
+        return pd.DataFrame({'compliant': pd.Series(dtype=bool)}, index=pd.Index([], name='room_id'))
+
+    sensors = stats.index.get_level_values('sensor')
+    tolerance = sensors.map(lambda sensor: tolerances.get(sensor, 0.0)).to_numpy(dtype=float)
+    pct_above = stats['pct_above'].fillna(0.0).to_numpy(dtype=float)
+    pct_below = stats['pct_below'].fillna(0.0).to_numpy(dtype=float)
+    pct_rolling_above = stats['pct_rolling_above'].fillna(0.0).to_numpy(dtype=float)
+
+    # Same rules as the per-sensor checks, evaluated for all rows at once
+    compliant = np.select(
+        [
+            sensors == "co2",
+            sensors.isin(["pm2_5", "pm10"]),
+            sensors.isin(["noise", "voc"]),
+            sensors == "light",
+            sensors.isin(["humidity", "temperature"]),
+        ],
+        [
+            (pct_above <= tolerance) & (pct_below > 50),
+            pct_rolling_above <= tolerance,
+            pct_above <= tolerance,
+            pct_below <= tolerance,
+            (100 - pct_below - pct_above) >= (100 - tolerance),
+        ],
+        default=True,
+    )
+    compliant &= stats['count'].fillna(0).to_numpy() > 0
+
+    averages = stats['mean'].astype(float).unstack('sensor')
+    verdicts = pd.Series(compliant, index=stats.index).unstack('sensor', fill_value=False).astype(bool)
+    verdicts = verdicts.reindex(columns=averages.columns, fill_value=False)
+
+    table = averages.join(verdicts.add_suffix('_compliant'))
+    table['compliant'] = verdicts.all(axis=1)
+    table.index.name = 'room_id'
+    table.columns.name = None
+    return table
+
+
+def check_compliance_batch(df: pd.DataFrame, tolerances: dict = None) -> pd.DataFrame:
+    """
+    Evaluates every compliance rule for every room in a single vectorized pass.
+    This is the batch variant of the per-sensor checks above: it takes the measurements of all rooms
+    and sensors in one long-format DataFrame instead of one DataFrame per room and sensor.
+
+    Parameters:
+        df (pd.DataFrame): Long-format DataFrame with columns 'room_id', 'sensor', 'timestamp' and 'value'.
+        tolerances (dict): Allowed percentage of non-compliance per sensor, see check_compliance_stats.
+
+    Returns:
+        pd.DataFrame: The compliance table of check_compliance_stats, indexed by room id.
+    """
+    return check_compliance_stats(summarize_compliance_batch(df), tolerances)
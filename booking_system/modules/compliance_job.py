@@ -0,0 +1,67 @@
+"""
+Scheduled evaluation of the compliance of every room.
+
+Every COMPLIANCE_JOB_INTERVAL seconds, the compliance of all rooms and sensors over the last
+COMPLIANCE_WINDOW_DAYS days is evaluated with the rules of compliance_check.py and written to the
+room_compliance table, from which the service reads it with COMPLIANCE_SOURCE=table.
+
+Run from the booking_system directory:
+    python -m modules.compliance_job           # every COMPLIANCE_JOB_INTERVAL seconds
+    python -m modules.compliance_job --once    # a single evaluation
+"""
+import argparse
+import os
+import time
+
+from modules.compliance_table import write_compliance
+from modules.data_fetcher import fetch_rooms, fetch_rooms_and_equipments
+from modules.decision_logic import COMPLIANCE_WINDOW_DAYS, RANKING_SENSORS, evaluate_compliance
+
+
+# Time in seconds between two evaluations
+COMPLIANCE_JOB_INTERVAL = float(os.getenv("COMPLIANCE_JOB_INTERVAL", "900"))
+
+
+def run_once(window: int = COMPLIANCE_WINDOW_DAYS) -> int:
+    """
+    Evaluates the compliance of all rooms and stores it in the room_compliance table.
+
+    Parameters:
+        window (int): Length of the sensor history in days.
+
+    Returns:
+        int: Number of stored verdicts.
+
+    Raises:
+        RuntimeError: If the rooms cannot be fetched.
+    """
+    rooms_and_equipments = fetch_rooms_and_equipments()
+    if rooms_and_equipments is None:
+        raise RuntimeError("Could not fetch the rooms")
+
+    rooms = fetch_rooms(rooms_and_equipments)
+    keys = [(room_id, sensor, window) for room_id in rooms for sensor in RANKING_SENSORS]
+    return write_compliance(evaluate_compliance(keys))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--once", action="store_true", help="Evaluate once and exit")
+    args = parser.parse_args()
+
+    while True:
+        started = time.monotonic()
+        try:
+            stored = run_once()
+            print(f"Compliance job: {stored} verdicts stored in {time.monotonic() - started:.1f} s")
+        except Exception as e:
+            print(f"Compliance job failed: {str(e)}")
+            if args.once:
+                raise
+        if args.once:
+            return
+        time.sleep(max(0.0, COMPLIANCE_JOB_INTERVAL - (time.monotonic() - started)))
+
+
+if __name__ == "__main__":
+    main()
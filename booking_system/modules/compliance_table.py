@@ -0,0 +1,145 @@
+import math
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+_session_factory = None
+_lock = threading.Lock()
+
+
+def get_session():
+    """
+    Returns a new session of the rooms database.
+
+    The SQLAlchemy models and engine (models.py and db.py from shared_vol) are copied into this package
+    by the Docker build and only imported on first use, so the service runs without a database unless
+    the compliance table is used.
+
+    Returns:
+        sqlalchemy.orm.Session: A new session.
+    """
+    global _session_factory
+    with _lock:
+        if _session_factory is None:
+            from sqlalchemy.orm import sessionmaker
+            from modules.db import engine
+            from modules.models import RoomCompliance
+
+            # The table may be newer than the database initialised by static_data
+            RoomCompliance.__table__.create(engine, checkfirst=True)
+            _session_factory = sessionmaker(bind=engine)
+        return _session_factory()
+
+
+def to_json_value(value: Any) -> Any:
+    """
+    Converts the NumPy scalars and NaN values of a compliance result to plain JSON values.
+    """
+    if isinstance(value, dict):
+        return {key: to_json_value(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_json_value(item) for item in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+def write_compliance(
+    results: Dict[Tuple[str, str, int], Tuple[Dict[str, Any], Dict[str, Any]]],
+    evaluated_at: Optional[datetime] = None,
+) -> int:
+    """
+    Stores compliance results in the room_compliance table, replacing the previous verdicts.
+
+    Parameters:
+        results (dict): Mapping of (room_id, sensor, window_days) to a (compliance_result, sensor_attributes)
+            tuple, as returned by evaluate_compliance.
+        evaluated_at (datetime): Time of the evaluation, now by default.
+
+    Returns:
+        int: Number of stored rows (results of rooms missing from the rooms table are skipped).
+    """
+    from sqlalchemy.dialects.postgresql import insert
+    from modules.models import Room, RoomCompliance
+
+    evaluated_at = evaluated_at or datetime.now(timezone.utc)
+    session = get_session()
+    try:
+        room_names = list({room_id for room_id, _, _ in results})
+        room_ids = dict(session.query(Room.name, Room.id).filter(Room.name.in_(room_names)).all())
+        rows = [
+            {
+                "room_id": room_ids[room_id],
+                "sensor": sensor,
+                "window_days": window,
+                "compliant": bool(compliance_result.get("compliant", False)),
+                "result": to_json_value(compliance_result),
+                "attributes": to_json_value(attributes),
+                "evaluated_at": evaluated_at,
+            }
+            for (room_id, sensor, window), (compliance_result, attributes) in results.items()
+            if room_id in room_ids
+        ]
+        if rows:
+            statement = insert(RoomCompliance).values(rows)
+            session.execute(statement.on_conflict_do_update(
+                constraint="_room_id_window_sensor_compliance_uc",
+                set_={
+                    column: statement.excluded[column]
+                    for column in ("compliant", "result", "attributes", "evaluated_at")
+                },
+            ))
+            session.commit()
+        return len(rows)
+    finally:
+        session.close()
+
+
+def read_compliance(
+    rooms: List[str],
+    environmental_sensors: List[str],
+    window: int,
+    max_age: float,
+) -> Dict[Tuple[str, str, int], Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """
+    Reads the stored compliance results of rooms with a single indexed query.
+
+    Parameters:
+        rooms (list): List of room IDs.
+        environmental_sensors (list): List of environmental sensor names.
+        window (int): Length of the sensor history in days.
+        max_age (float): Age in seconds after which a stored result is ignored.
+
+    Returns:
+        dict: Mapping of (room_id, sensor, window) to a (compliance_result, sensor_attributes) tuple,
+            for the results found. Empty if the database is unavailable.
+    """
+    if not rooms or not environmental_sensors:
+        return {}
+    try:
+        from modules.models import Room, RoomCompliance
+
+        session = get_session()
+        try:
+            rows = (
+                session.query(Room.name, RoomCompliance.sensor, RoomCompliance.result, RoomCompliance.attributes)
+                .join(Room, Room.id == RoomCompliance.room_id)
+                .filter(
+                    Room.name.in_(rooms),
+                    RoomCompliance.window_days == window,
+                    RoomCompliance.sensor.in_(environmental_sensors),
+                    RoomCompliance.evaluated_at >= datetime.now(timezone.utc) - timedelta(seconds=max_age),
+                )
+                .all()
+            )
+        finally:
+            session.close()
+    except Exception as e:
+        print(f"Compliance table lookup failed: {str(e)}")
+        return {}
+    return {(room_id, sensor, window): (result, attributes) for room_id, sensor, result, attributes in rows}
@@ -1,54 +1,445 @@
+import os
+import numpy as np
 import pandas as pd
 import requests
 import json
 import time
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeoutError
+import contextvars
+from urllib.parse import quote, urlparse
 
+from requests.adapters import HTTPAdapter
 
-def fetch_api_data(url: str, retries: int = 5, backoff_factor: float = 1.0):
+from modules.instrumentation import metrics, upstream_call
+from modules.resilience import DeadlineExceeded, circuit_breaker, latency_tracker, remaining
+
+
+RESTAPI_ROOMS_URL = os.getenv("RESTAPI_ROOMS_URL", "http://restapi_rooms:8080")
+
+# Maximum number of upstream requests in flight at once (also the size of the connection pool)
+FETCH_CONCURRENCY = int(os.getenv("FETCH_CONCURRENCY", "16"))
+
+# Timeout in seconds of a single upstream request, shortened to the time left until the request deadline
+UPSTREAM_TIMEOUT = float(os.getenv("UPSTREAM_TIMEOUT", "30"))
+
+# Columnar representation of the sensor series, preferred over the list of {timestamp, value} readings
+COLUMNAR_MEDIA_TYPE = "application/vnd.rooms.columnar+json"
+
+_session = None
+_executor = None
+_hedge_executor = None
+_lock = threading.Lock()
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key into one call.
+
+    The first caller of a key runs the function; callers arriving while it is in flight wait for it
+    and receive the same result (or exception) instead of calling the function again. Once the call
+    completed, the next caller of the key starts a new one, so nothing is cached. Results are shared
+    between the callers and must not be modified.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.shared = 0
+
+    def do(self, key, func, *args, timeout: float = None, **kwargs):
+        """
+        Runs func(*args, **kwargs), or waits for the call of key already in flight.
+
+        Args:
+            key (Hashable): Identity of the call.
+            func (callable): The function to run.
+            timeout (float): Time in seconds to wait for a call already in flight, unlimited if None.
+
+        Returns:
+            tuple: (result, shared), shared being True if the result came from another caller's call.
+
+        Raises:
+            concurrent.futures.TimeoutError: If the call in flight did not complete within timeout.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = Future()
+                self.calls += 1
+            else:
+                self.shared += 1
+        if not leader:
+            return call.result(timeout=timeout), True
+
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as e:
+            call.set_exception(e)
+            raise
+        else:
+            call.set_result(result)
+            return result, False
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+# Upstream calls in flight, shared by all requests of the process
+upstream_flights = SingleFlight()
+
+
+def get_session():
+    """
+    Returns the process-wide HTTP session, whose keep-alive connection pool is shared by all fetches.
+
+    Returns:
+        requests.Session: The shared session.
+    """
+    global _session
+    with _lock:
+        if _session is None:
+            adapter = HTTPAdapter(pool_connections=FETCH_CONCURRENCY, pool_maxsize=FETCH_CONCURRENCY)
+            _session = requests.Session()
+            _session.mount("http://", adapter)
+            _session.mount("https://", adapter)
+        return _session
+
+
+def get_executor():
+    """
+    Returns the process-wide thread pool used to run upstream requests concurrently.
+
+    Returns:
+        ThreadPoolExecutor: The shared executor, limited to FETCH_CONCURRENCY workers.
+    """
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=FETCH_CONCURRENCY, thread_name_prefix="fetch")
+        return _executor
+
+
+def get_hedge_executor():
+    """
+    Returns the process-wide thread pool running the hedged upstream requests.
+    It is separate from the fetch executor, whose workers wait for the requests they hedge.
+
+    Returns:
+        ThreadPoolExecutor: The shared executor, limited to 2 * FETCH_CONCURRENCY workers.
+    """
+    global _hedge_executor
+    with _lock:
+        if _hedge_executor is None:
+            _hedge_executor = ThreadPoolExecutor(max_workers=2 * FETCH_CONCURRENCY, thread_name_prefix="hedge")
+        return _hedge_executor
+
+
+def coalesced(key, endpoint: str, func, *args):
+    """
+    Runs func(*args) through the single-flight layer, counting the calls that shared another one's result.
+    A caller waiting for another one's call gives up at its own deadline and gets None.
+    """
+    budget = remaining()
+    try:
+        result, shared = upstream_flights.do(key, func, *args, timeout=None if budget is None else max(0.0, budget))
+    except FutureTimeoutError:
+        print(f"Deadline exceeded waiting for {endpoint}")
+        return None
+    if shared:
+        metrics.inc("booking_upstream_coalesced_total", endpoint=endpoint)
+    return result
+
+
+def fetch_api_data(
+    url: str,
+    retries: int = 5,
+    backoff_factor: float = 1.0,
+    endpoint: str = None,
+    headers: dict = None,
+    missing=None,
+):
     """
     Fetches JSON data from the given API URL.
+    Concurrent fetches of the same URL share one request and its (read-only) result.
+    The request is bounded by the deadline of the current request (see resilience.py), hedged when
+    it is slower than usual, and not sent at all while the circuit of the endpoint is open.
 
     Args:
         url (str): The API URL to fetch data from.
+        endpoint (str): Label of the call in the upstream metrics, the path of the URL by default.
+        headers (dict): Additional request headers.
+        missing: Value returned if the server answers with a client error (4xx), i.e. the data does not exist.
 
     Returns:
         dict: A dictionary containing the JSON data, or None if an error occurs.
     """
+    endpoint = endpoint or urlparse(url).path
+    key = ("GET", url, tuple(sorted((headers or {}).items())))
+    response = coalesced(key, endpoint, _fetch_response, url, retries, backoff_factor, endpoint, headers)
+    if response is None:
+        return None
+    if response.status_code >= 400:
+        print(f"API request failed: {response.status_code} {response.reason} for {url}")
+        return missing
+    try:
+        return response.json()
+    except ValueError as e:
+        print(f"Failed to parse JSON response: {str(e)}")
+        return None
+
+
+def fetch_api_data_if_modified(
+    url: str, etag: str = None, retries: int = 5, backoff_factor: float = 1.0, endpoint: str = None
+):
+    """
+    Fetches JSON data from the given API URL with a conditional GET.
+
+    Args:
+        url (str): The API URL to fetch data from.
+        etag (str): ETag of the version already held, sent as If-None-Match.
+        endpoint (str): Label of the call in the upstream metrics, the path of the URL by default.
+
+    Returns:
+        tuple: (data, etag), where data is None if the server answered 304 Not Modified,
+            or None if an error occurs.
+    """
+    endpoint = endpoint or urlparse(url).path
+    headers = {"If-None-Match": etag} if etag else {}
+    response = coalesced(
+        ("GET", url, etag), endpoint, _fetch_response, url, retries, backoff_factor, endpoint, headers
+    )
+    if response is None:
+        return None
+    if response.status_code == 304:
+        return None, etag
+    if response.status_code >= 400:
+        print(f"API request failed: {response.status_code} {response.reason} for {url}")
+        return None
+    try:
+        return response.json(), response.headers.get("ETag")
+    except ValueError as e:
+        print(f"Failed to parse JSON response: {str(e)}")
+        return None
+
+
+def _fetch_response(url: str, retries: int, backoff_factor: float, endpoint: str, headers: dict):
+    """
+    Sends a GET, retrying server errors and timeouts with exponential backoff within the deadline.
+
+    Returns:
+        requests.Response: The response (status below 500), or None if the upstream is unavailable.
+    """
+    breaker = circuit_breaker(endpoint)
     for attempt in range(retries):
+        if not breaker.allow():
+            metrics.inc("booking_upstream_requests_total", endpoint=endpoint, outcome="rejected")
+            print(f"Circuit of {endpoint} open, not requesting {url}")
+            return None
+        # A timeout cut short by the deadline says nothing about the health of the upstream
+        budget = remaining()
+        deadline_limited = budget is not None and budget < UPSTREAM_TIMEOUT
         try:
-            response = requests.get(url, timeout=30)
-            response.raise_for_status()
-            return response.json()
+            response = _hedged_get(url, headers, endpoint)
+        except DeadlineExceeded:
+            breaker.release()
+            print(f"Deadline exceeded, not requesting {url}")
+            return None
         except requests.exceptions.RequestException as e:
+            if _is_upstream_failure(e, deadline_limited):
+                breaker.failure()
+            else:
+                breaker.release()
             print(f"API request failed (attempt {attempt+1}/{retries}): {str(e)}")
-            if attempt == retries - 1:
-                return None
             sleep_time = backoff_factor * (2 ** attempt)
+            budget = remaining()
+            if attempt == retries - 1 or (budget is not None and budget <= sleep_time):
+                return None
             time.sleep(sleep_time)
-        except json.JSONDecodeError as e:
-            print(f"Failed to parse JSON response: {str(e)}")
-            return None
+        except BaseException:
+            # Not an answer of the upstream (e.g. the executor shut down): end a half-open trial unchanged
+            breaker.release()
+            raise
+        else:
+            breaker.success()
+            return response
     return None
 
 
+def _is_upstream_failure(error: requests.exceptions.RequestException, deadline_limited: bool) -> bool:
+    """
+    Returns True if error counts against the circuit of the endpoint: a connection error, a server
+    error, or a timeout that ran the full UPSTREAM_TIMEOUT rather than one shortened by the deadline.
+    """
+    if isinstance(error, requests.exceptions.Timeout):
+        return not deadline_limited
+    return isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.HTTPError))
+
+
+def _send(url: str, headers: dict, timeout: float, endpoint: str):
+    with upstream_call(endpoint):
+        response = get_session().get(url, headers=headers, timeout=timeout)
+        if response.status_code >= 500:
+            response.raise_for_status()
+        return response
+
+
+def _hedged_get(url: str, headers: dict, endpoint: str):
+    """
+    Sends a GET with a timeout of at most UPSTREAM_TIMEOUT seconds and the time left until the deadline.
+    If no response arrived after the usual (HEDGE_PERCENTILE) latency of the endpoint, a second identical
+    request is sent and the first response of the two is used.
+
+    Raises:
+        DeadlineExceeded: If the deadline has already passed.
+        requests.exceptions.RequestException: If the request(s) failed or timed out.
+    """
+    budget = remaining()
+    timeout = UPSTREAM_TIMEOUT if budget is None else min(UPSTREAM_TIMEOUT, budget)
+    if timeout <= 0:
+        raise DeadlineExceeded()
+
+    tracker = latency_tracker(endpoint)
+    delay = tracker.hedge_delay()
+    started = time.monotonic()
+    if delay is None or delay >= timeout:
+        response = _send(url, headers, timeout, endpoint)
+        tracker.add(time.monotonic() - started)
+        return response
+
+    executor = get_hedge_executor()
+    attempts = [executor.submit(contextvars.copy_context().run, _send, url, headers, timeout, endpoint)]
+    done, _ = wait(attempts, timeout=delay)
+    if not done:
+        metrics.inc("booking_upstream_hedged_total", endpoint=endpoint)
+        attempts.append(
+            executor.submit(contextvars.copy_context().run, _send, url, headers, timeout - delay, endpoint)
+        )
+
+    # The first successful response wins; the other request is left to finish in the background
+    error = None
+    pending = set(attempts)
+    while pending:
+        done, pending = wait(pending, timeout=max(0.0, started + timeout - time.monotonic()), return_when=FIRST_COMPLETED)
+        if not done:
+            break
+        for attempt in done:
+            try:
+                response = attempt.result()
+            except requests.exceptions.RequestException as e:
+                error = e
+            else:
+                tracker.add(time.monotonic() - started)
+                return response
+    raise error or requests.exceptions.Timeout(f"No response from {url} within {timeout:.1f} s")
+
+
+def columnar_frame(series: dict) -> pd.DataFrame:
+    """
+    Builds the DataFrame of a series in the columnar representation of restapi_rooms.
+
+    Args:
+        series (dict): Series with "values" and either "start" and "step" or "times" (epoch milliseconds).
+
+    Returns:
+        pd.DataFrame: DataFrame with a datetime64 (UTC) 'timestamp' column and a float32 'value' column.
+    """
+    values = np.asarray(series["values"], dtype=np.float32)
+    if series.get("times") is not None:
+        times = np.asarray(series["times"], dtype=np.int64)
+    else:
+        times = (series.get("start") or 0) + series.get("step", 0) * np.arange(len(values), dtype=np.int64)
+    return pd.DataFrame({"timestamp": times.astype("datetime64[ms]").astype("datetime64[ns]"), "value": values})
+
+
 def download_sensor_data(room_id: str, sensor_name: str):
     """
     Fetches a JSON file from a REST API and loads the content of a specific sensor into a pandas DataFrame.
+    The columnar representation is requested, so the columns are built without parsing one object
+    per reading; servers that only know the list of readings are still supported.
 
     Args:
         room_id (str): The room id from where the sensor data should be retrieved.
         sensor_name (str): The key in the JSON data corresponding to the desired sensor data.
 
     Returns:
-        pd.DataFrame: A pandas DataFrame containing the JSON data, or an empty DataFrame if an error occurs.
+        pd.DataFrame: A pandas DataFrame containing the JSON data, an empty DataFrame if there is no data,
+            or None if the data could not be fetched (in time). Concurrent downloads of the same series share the DataFrame, which must not be modified.
     """
-    api_url = f"http://restapi_rooms:8080/rooms/{room_id}/{sensor_name}"
-    json_data = fetch_api_data(api_url)
+    return coalesced(
+        ("sensor", room_id, sensor_name), "/rooms/{room_id}/{sensor}", _download_sensor_data, room_id, sensor_name
+    )
+
+
+def _download_sensor_data(room_id: str, sensor_name: str):
+    api_url = f"{RESTAPI_ROOMS_URL}/rooms/{room_id}/{sensor_name}"
+    json_data = fetch_api_data(
+        api_url,
+        endpoint="/rooms/{room_id}/{sensor}",
+        headers={"Accept": f"{COLUMNAR_MEDIA_TYPE}, application/json;q=0.9"},
+        missing={},
+    )
+    if json_data is None:
+        return None
+    if json_data and "values" in json_data:
+        return columnar_frame(json_data)
     if json_data and sensor_name in json_data:
         return pd.DataFrame(json_data[sensor_name])
     return pd.DataFrame()
 
 
+def submit_sensor_downloads(room_ids: list, sensor_names: list):
+    """
+    Starts downloading the data of every sensor of every room concurrently.
+    The downloads share the pooled session and run on the shared executor, so at most
+    FETCH_CONCURRENCY requests are in flight at once.
+
+    Args:
+        room_ids (list): The room ids from where the sensor data should be retrieved.
+        sensor_names (list): The sensors to retrieve for each room.
+
+    Returns:
+        dict: A dictionary mapping room ids to {sensor_name: Future}, each future resolving to the
+            DataFrame (or None) returned by download_sensor_data. Futures that have not started yet can be cancelled.
+    """
+    executor = get_executor()
+    # Each download runs in a copy of the caller's context, so its timings are added to the caller's request
+    return {
+        room_id: {
+            sensor_name: executor.submit(contextvars.copy_context().run, download_sensor_data, room_id, sensor_name)
+            for sensor_name in sensor_names
+        }
+        for room_id in room_ids
+    }
+
+
+def fetch_compliance_summary(room_ids: list, sensor_names: list, days: int = 14):
+    """
+    Fetches the compliance statistics of several rooms and sensors in a single request.
+    The statistics are computed by InfluxDB, so only a few numbers per room and sensor are transferred
+    instead of the full sensor history.
+
+    Args:
+        room_ids (list): The room ids to summarise.
+        sensor_names (list): The sensors to summarise.
+        days (int): The length of the history window in days.
+
+    Returns:
+        dict: A dictionary mapping room ids to {sensor_name: statistics}, or None if an error occurs.
+    """
+    api_url = (
+        f"{RESTAPI_ROOMS_URL}/rooms/compliance-summary"
+        f"?rooms={quote(','.join(room_ids))}&sensors={','.join(sensor_names)}&days={days}"
+    )
+    json_data = fetch_api_data(api_url)
+    if json_data is None:
+        return None
+    return {room_info["room"]: room_info.get("sensors", {}) for room_info in json_data}
+
+
 def fetch_room_bookings(date: str, days: int):
     """
     Fetches room bookings from the API.
@@ -60,7 +451,7 @@ def fetch_room_bookings(date: str, days: int):
     Returns:
         dict: A dictionary containing the JSON data, or None if an error occurs.
     """
-    api_url = f"http://restapi_rooms:8080/rooms/bookings?startDate={date}&days={days}"
+    api_url = f"{RESTAPI_ROOMS_URL}/rooms/bookings?startDate={date}&days={days}"
     return fetch_api_data(api_url)
 
 
@@ -71,10 +462,22 @@ def fetch_rooms_and_equipments():
     Returns:
         dict: A dictionary containing the JSON data, or None if an error occurs.
     """
-    api_url = f"http://restapi_rooms:8080/rooms/equipment"
+    api_url = f"{RESTAPI_ROOMS_URL}/rooms/equipment"
     return fetch_api_data(api_url)
 
 
+def fetch_rooms_and_equipments_if_modified(etag: str = None):
+    """
+    Fetches Equipments from the API unless they did not change since the version tagged etag.
+
+    Returns:
+        tuple: (rooms_and_equipments, etag) with rooms_and_equipments None if not modified,
+            or None if an error occurs.
+    """
+    api_url = f"{RESTAPI_ROOMS_URL}/rooms/equipment"
+    return fetch_api_data_if_modified(api_url, etag)
+
+
 def fetch_rooms(rooms_and_equipments):
 
     return [room_info["room"] for room_info in rooms_and_equipments]
@@ -84,8 +487,8 @@ def fetch_equipment(rooms_and_equipments, room_id):
 
     for room in rooms_and_equipments:
         if room["room"] == room_id:
-            equipment = room['equipment']
-            for key, value in equipment.items():
-                if isinstance(value, bool):  # Check if the value is boolean
-                    room['equipment'][key] = 1 if value else 0
-            return equipment
\ No newline at end of file
+            # Convert boolean values to 0/1 on a copy, leaving the shared data untouched
+            return {
+                key: (1 if value else 0) if isinstance(value, bool) else value
+                for key, value in room['equipment'].items()
+            }
\ No newline at end of file
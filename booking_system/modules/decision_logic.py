@@ -1,17 +1,18 @@
+import base64
+import hashlib
 import json
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, wait
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 
 import numpy as np
 import pandas as pd
 
 # Import external modules (assumed to be available in your project)
 from modules.data_fetcher import (
-    fetch_rooms,
-    fetch_rooms_and_equipments,
-    fetch_equipment,
-    fetch_room_bookings,
-    download_sensor_data,
+    fetch_compliance_summary,
+    submit_sensor_downloads,
 )
 from modules.compliance_check import (
     check_compliance_co2,
@@ -22,18 +23,37 @@ from modules.compliance_check import (
     check_humidity_compliance,
     check_compliance_voc,
     check_compliance_temperature,
+    check_compliance_stats,
+    check_compliance_summary,
+    stats_from_summaries,
+    summarize_compliance_batch,
 )
+from modules.availability_index import (
+    SLOT_MINUTES, AvailabilityIndex, expand_slots, free_starts, search_window, slot_mask
+)
+from modules.compliance_cache import ComplianceCache, TTLCache
+from modules.topsis import average_ranks, top_k_order, topsis_closeness, topsis_closeness_batch
+from modules.live_compliance import LiveComplianceState
+from modules.room_catalog import RoomCatalog, equipment_mask
+from modules.shared_store import shared_store
+from modules.instrumentation import span
+from modules.resilience import with_deadline
+from modules.compliance_table import read_compliance
 
 
-def topsis_decision_logic(room_data: pd.DataFrame, user_pref: dict, weights=None, lower_better_cols=[]) -> pd.DataFrame:
+def topsis_decision_logic(room_data: pd.DataFrame, user_pref: dict, weights=None, lower_better_cols=[], top_k: Optional[int] = None) -> pd.DataFrame:
     """
     Perform TOPSIS (Technique for Order Preference by Similarity to Ideal Solution)
     to rank rooms based on user preferences.
+    The computation itself runs on NumPy arrays in modules/topsis.py; the DataFrame is only
+    unpacked and rebuilt here.
     Parameters:
         room_data (pd.DataFrame): DataFrame containing attributes of each room.
         user_pref (dict): Dictionary of user preferences for each attribute.
         weights (list or None): List of weights for each attribute. If None, all attributes are equally weighted.
         lower_better_cols (list): List of columns where lower values are better.
+        top_k (int or None): Only return the top_k best rooms, selected without sorting all rooms.
+            Their ranks are the ranks among all rooms.
     Returns:
         pd.DataFrame: DataFrame with closeness coefficients and ranks for each room.
     """
@@ -42,24 +62,18 @@ def topsis_decision_logic(room_data: pd.DataFrame, user_pref: dict, weights=None
         if room_data.empty:
             return pd.DataFrame()
 
-        # Adjust the decision matrix based on user preferences using z-score
-        adjusted_df = room_data.copy()
-        for col in user_pref:
-            if col in room_data.columns:
-                mean, std = room_data[col].mean(), room_data[col].std()
-                adjusted_df[col] = -abs((room_data[col] - user_pref[col]) / (std + 1e-9))
-            else:
-                adjusted_df[col] = room_data[col]
-
-        # Normalize the decision matrix
-        norm = np.sqrt((adjusted_df ** 2).sum(axis=0))
-        normalized = adjusted_df / norm
+        columns = room_data.columns
+        prefs = np.array([user_pref.get(col, np.nan) for col in columns], dtype=np.float64)
+        lower_better = columns.isin(lower_better_cols)
 
         # Apply weights (if not provided, use equal weighting)
         if weights is None:
-            weights = np.ones(len(room_data.columns))
-        weights = np.array(weights) / np.sum(weights)
-        weighted = normalized * weights
+            weights = np.ones(len(columns))
+        weights = np.asarray(weights, dtype=np.float64)
+        if weights.shape != (len(columns),):
+            raise ValueError(f"Expected {len(columns)} weights, got {weights.size}")
+
+        closeness = topsis_closeness(room_data.to_numpy(dtype=np.float64), prefs, weights, lower_better)
 
         # Handle single-room scenario
         if len(room_data) == 1:
@@ -68,33 +82,17 @@ def topsis_decision_logic(room_data: pd.DataFrame, user_pref: dict, weights=None
             result['rank'] = 1
             return result
 
-        # Determine the positive ideal solution (PIS) and negative ideal solution (NIS)
-        # Adjusting the logic for columns where lower values are better.
-        ideal_best = {}
-        ideal_worst = {}
-        for col in weighted.columns:
-            if col in lower_better_cols:
-                ideal_best[col] = weighted[col].min()  # lower is better
-                ideal_worst[col] = weighted[col].max()
-            else:
-                ideal_best[col] = weighted[col].max()  # higher is better
-                ideal_worst[col] = weighted[col].min()
-
-        # Convert the ideal values to a Series for vectorized computation
-        ideal_best_series = pd.Series(ideal_best)
-        ideal_worst_series = pd.Series(ideal_worst)
-
-        # Calculate Euclidean distances from the PIS and NIS
-        dist_pis = np.sqrt(((weighted - ideal_best_series) ** 2).sum(axis=1))
-        dist_nis = np.sqrt(((weighted - ideal_worst_series) ** 2).sum(axis=1))
-
-        # Calculate the closeness coefficient
-        closeness = dist_nis / (dist_pis + dist_nis)
+        if top_k is not None:
+            order = top_k_order(closeness, top_k)
+            result = room_data.iloc[order].copy()
+            result['score'] = closeness[order]
+            result['rank'] = average_ranks(closeness, order)
+            return result
 
         # Prepare and return the final results with scores and rankings
         result = room_data.copy()
         result['score'] = closeness
-        result['rank'] = closeness.rank(ascending=False)
+        result['rank'] = result['score'].rank(ascending=False)
         return result.sort_values('rank')
 
     except Exception as e:
@@ -152,7 +150,219 @@ def extract_sensor_attributes(sensor: str, compliance_result: Dict[str, Any]) ->
     return attributes
 
 
-def build_topsis_matrix(rooms: List[str], environmental_sensors: List[str], rooms_and_equipments: List[Dict[str, Any]]) -> pd.DataFrame:
+# Length of the sensor history (in days) the compliance checks are evaluated on
+COMPLIANCE_WINDOW_DAYS = 14
+
+# Mapping sensor names to their compliance functions
+COMPLIANCE_FUNCTIONS = {
+    "co2": check_compliance_co2,
+    "pm2_5": check_compliance_pm25,
+    "pm10": check_compliance_pm10,
+    "noise": check_compliance_noise,
+    "light": check_compliance_lighting,
+    "humidity": check_humidity_compliance,
+    "voc": check_compliance_voc,
+    "temperature": check_compliance_temperature,
+}
+
+
+def compliance_entries(stats: pd.DataFrame, keys: List[Tuple[str, str, int]]) -> Dict[Tuple[str, str, int], Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """
+    Evaluates the compliance of keys from the statistics of their rooms and sensors, with one vectorized
+    check_compliance_stats pass over all of them.
+
+    Parameters:
+        stats (pd.DataFrame): Statistics indexed by ('room_id', 'sensor'), see summarize_compliance_batch.
+        keys (list): List of (room_id, sensor, window_days) tuples.
+
+    Returns:
+        dict: Mapping of each key to a (compliance_result, sensor_attributes) tuple, where compliance_result
+            holds the statistics and the verdict and sensor_attributes the average value of the sensor.
+    """
+    table = check_compliance_stats(stats)
+    records = stats.to_dict("index")
+    entries = {}
+    for room_id, sensor, window in keys:
+        record = records.get((room_id, sensor))
+        if record is None:
+            entries[(room_id, sensor, window)] = ({"compliant": False}, {})
+            continue
+        compliance_result = {**record, "compliant": bool(table.at[room_id, f"{sensor}_compliant"])}
+        entries[(room_id, sensor, window)] = (compliance_result, {sensor: record["mean"]})
+    return entries
+
+
+def evaluate_downloads(downloads: Dict[str, Dict[str, Future]], keys: List[Tuple[str, str, int]]) -> Dict[Tuple[str, str, int], Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """
+    Evaluates the compliance of keys from raw sensor downloads while they complete.
+
+    The downloads that completed together are evaluated in one grouped pass (summarize_compliance_batch
+    and compliance_entries). As soon as a sensor of a room fails, the downloads of that room that have
+    not started yet are cancelled: the room is excluded anyway. Keys whose download failed or was
+    cancelled are left out.
+
+    Parameters:
+        downloads (dict): Mapping of room id to {sensor: Future}, as returned by submit_sensor_downloads.
+        keys (list): List of (room_id, sensor, window_days) tuples to evaluate.
+
+    Returns:
+        dict: Mapping of each evaluated key to a (compliance_result, sensor_attributes) tuple.
+    """
+    wanted = {(room_id, sensor): (room_id, sensor, window) for room_id, sensor, window in keys}
+    owners = {
+        future: (room_id, sensor)
+        for room_id, room_downloads in downloads.items()
+        for sensor, future in room_downloads.items()
+    }
+    results = {}
+    failed_rooms = set()
+    pending = set(owners)
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        frames = []
+        completed = []
+        for future in done:
+            room_id, sensor = owners[future]
+            if future.cancelled() or room_id in failed_rooms or (room_id, sensor) not in wanted:
+                continue
+            frame = future.result()
+            if frame is None:
+                continue
+            completed.append(wanted[(room_id, sensor)])
+            if "value" in frame.columns:
+                frames.append(frame.assign(room_id=room_id, sensor=sensor))
+        if not completed:
+            continue
+
+        with span("compliance_summarize"):
+            stats = summarize_compliance_batch(pd.concat(frames, ignore_index=True) if frames else pd.DataFrame())
+            entries = compliance_entries(stats, completed)
+        results.update(entries)
+        for (room_id, sensor, _), (compliance_result, _) in entries.items():
+            if not compliance_result["compliant"] and room_id not in failed_rooms:
+                failed_rooms.add(room_id)
+                for future in downloads[room_id].values():
+                    future.cancel()
+        pending = {future for future in pending if not future.cancelled()}
+    return results
+
+
+def evaluate_compliance(keys: List[Tuple[str, str, int]]) -> Dict[Tuple[str, str, int], Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """
+    Evaluates the compliance of (room_id, sensor, window_days) keys. This is the loader of the compliance cache.
+
+    The statistics of all rooms are fetched from the compliance summary endpoint in one request; the raw
+    sensor data is only downloaded if that endpoint is unavailable, and is then reduced to the same
+    statistics with summarize_compliance_batch as the downloads complete, stopping the downloads of a
+    room once one of its sensors fails (see evaluate_downloads). Either way, the verdicts are evaluated
+    together by compliance_entries. Keys whose data could not be fetched (in time) are left out, so they
+    are neither cached nor stored and count as unknown.
+
+    Parameters:
+        keys (list): List of (room_id, sensor, window_days) tuples.
+
+    Returns:
+        dict: Mapping of each evaluated key to a (compliance_result, sensor_attributes) tuple.
+    """
+    results = {}
+    windows: Dict[int, List[Tuple[str, str, int]]] = {}
+    for key in keys:
+        windows.setdefault(key[2], []).append(key)
+
+    for window, window_keys in windows.items():
+        rooms = list(dict.fromkeys(room_id for room_id, _, _ in window_keys))
+        sensors = list(dict.fromkeys(sensor for _, sensor, _ in window_keys))
+
+        summaries = fetch_compliance_summary(rooms, sensors, window)
+        if summaries is not None:
+            with span("compliance_evaluate"):
+                results.update(compliance_entries(stats_from_summaries(summaries), window_keys))
+            continue
+
+        print("Compliance summary unavailable. Falling back to raw sensor data.")
+        with span("sensor_downloads"):
+            downloads = submit_sensor_downloads(rooms, sensors)
+            results.update(evaluate_downloads(downloads, window_keys))
+
+    return results
+
+
+# Where compliance comes from: "summary" evaluates the InfluxDB history (through the cache),
+# "live" reads the running state fed by the MQTT stream and only falls back to the history for
+# sensors the stream has not delivered yet, "table" reads the room_compliance table written by the
+# scheduled compliance job (modules/compliance_job.py) and falls back to the history for rooms
+# without a recent verdict.
+COMPLIANCE_SOURCE = os.getenv("COMPLIANCE_SOURCE", "summary")
+
+# Age in seconds after which a verdict of the compliance table is no longer used
+COMPLIANCE_TABLE_MAX_AGE = float(os.getenv("COMPLIANCE_TABLE_MAX_AGE", "3600"))
+
+compliance_cache = ComplianceCache(
+    loader=evaluate_compliance,
+    maxsize=int(os.getenv("COMPLIANCE_CACHE_SIZE", "4096")),
+    ttl=float(os.getenv("COMPLIANCE_CACHE_TTL", "600")),
+    refresh_ahead=float(os.getenv("COMPLIANCE_CACHE_REFRESH_AHEAD", "60")),
+    store=shared_store,
+)
+
+
+live_compliance = LiveComplianceState(window_days=COMPLIANCE_WINDOW_DAYS)
+
+# Compliance of a sensor whose data could not be fetched before the deadline or with the upstream unavailable
+UNKNOWN_COMPLIANCE = ({"compliant": None, "status": "unknown"}, {})
+
+
+def lookup_compliance(rooms: List[str], environmental_sensors: List[str], window: int = COMPLIANCE_WINDOW_DAYS) -> Dict[Tuple[str, str, int], Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """
+    Returns the compliance results of the given rooms and sensors, evaluating only those missing from the cache.
+    Results that could not be evaluated are UNKNOWN_COMPLIANCE.
+
+    Parameters:
+        rooms (list): List of room IDs.
+        environmental_sensors (list): List of environmental sensor names.
+        window (int): Length of the sensor history in days.
+
+    Returns:
+        dict: Mapping of (room_id, sensor, window) to a (compliance_result, sensor_attributes) tuple.
+    """
+    compliance_cache.start_refresher()
+    use_live = COMPLIANCE_SOURCE == "live" and window == COMPLIANCE_WINDOW_DAYS
+    if use_live:
+        live_compliance.start(list(COMPLIANCE_FUNCTIONS.keys()))
+
+    stored = {}
+    if COMPLIANCE_SOURCE == "table":
+        with span("compliance_table"):
+            stored = read_compliance(rooms, environmental_sensors, window, COMPLIANCE_TABLE_MAX_AGE)
+
+    results = {}
+    missing = []
+    for room_id in rooms:
+        for sensor in environmental_sensors:
+            key = (room_id, sensor, window)
+            summary = live_compliance.summary(room_id, sensor) if use_live else None
+            if key in stored:
+                cached = stored[key]
+            elif summary is not None:
+                compliance_result = check_compliance_summary(sensor, summary)
+                cached = (compliance_result, extract_sensor_attributes(sensor, compliance_result))
+            else:
+                cached = compliance_cache.get(key)
+            if cached is None:
+                missing.append(key)
+                continue
+            results[key] = cached
+            if not cached[0].get("compliant", False):
+                # The room is already known to fail, its other sensors do not matter
+                break
+
+    results.update(compliance_cache.load(missing))
+    for key in missing:
+        results.setdefault(key, UNKNOWN_COMPLIANCE)
+    return results
+
+
+def build_topsis_matrix(rooms: List[str], environmental_sensors: List[str], catalog: RoomCatalog) -> pd.DataFrame:
     """
     Constructs the TOPSIS decision matrix by evaluating the compliance of each room based on environmental data,
     and incorporating equipment attributes.
@@ -160,46 +370,48 @@ def build_topsis_matrix(rooms: List[str], environmental_sensors: List[str], room
     Parameters:
         rooms (list): List of room IDs.
         environmental_sensors (list): List of environmental sensor names.
-        rooms_and_equipments (list): List of dictionaries containing room equipment data.
+        catalog (RoomCatalog): Catalog of the rooms and their equipment.
 
     Returns:
-        pd.DataFrame: DataFrame with attributes of compliant rooms for TOPSIS ranking.
-    """
-    # Mapping sensor names to their compliance functions
-    compliance_functions = {
-        "co2": check_compliance_co2,
-        "pm2_5": check_compliance_pm25,
-        "pm10": check_compliance_pm10,
-        "noise": check_compliance_noise,
-        "light": check_compliance_lighting,
-        "humidity": check_humidity_compliance,
-        "voc": check_compliance_voc,
-        "temperature": check_compliance_temperature,
-    }
-
+        pd.DataFrame: DataFrame with attributes of compliant rooms for TOPSIS ranking. The rooms whose
+            compliance is unknown are listed in its attrs["unknown_rooms"].
+    """
     compliant_rooms = []
     compliant_room_ids = []
+    unknown_rooms = []
+
+    with span("compliance"):
+        compliance_results = lookup_compliance(rooms, environmental_sensors)
 
     for room_id in rooms:
         print(f"Evaluating room: {room_id}")
         room_attributes: Dict[str, Any] = {}
         is_compliant = True
+        is_unknown = False
 
         # Evaluate each environmental sensor for compliance
         for sensor in environmental_sensors:
-            sensor_data = download_sensor_data(room_id, sensor)
-            compliance_result = perform_compliance_check(sensor, sensor_data, compliance_functions)
+            compliance_result, sensor_attributes = compliance_results.get(
+                (room_id, sensor, COMPLIANCE_WINDOW_DAYS), ({"compliant": False}, {})
+            )
+            if compliance_result.get("status") == "unknown":
+                # A known failure of another sensor still excludes the room
+                is_unknown = True
+                continue
             if not compliance_result.get("compliant", False):
                 print(f"Room {room_id} failed compliance for sensor '{sensor}'. Skipping room.")
                 is_compliant = False
                 break
 
             # Extract and update sensor-specific attributes
-            room_attributes.update(extract_sensor_attributes(sensor, compliance_result))
+            room_attributes.update(sensor_attributes)
 
+        if is_compliant and is_unknown:
+            print(f"Room {room_id}: compliance unknown. Excluded from ranking.\n")
+            unknown_rooms.append(room_id)
         # If room passed environmental compliance, add equipment data
-        if is_compliant:
-            equipment_data = fetch_equipment(rooms_and_equipments, room_id)
+        elif is_compliant:
+            equipment_data = catalog.equipment(room_id)
             if equipment_data:
                 room_attributes.update(equipment_data)
                 compliant_rooms.append(room_attributes)
@@ -212,34 +424,78 @@ def build_topsis_matrix(rooms: List[str], environmental_sensors: List[str], room
 
     if not compliant_rooms:
         print("No compliant rooms found.")
-        return pd.DataFrame()
-
-    # Construct and return the decision matrix DataFrame
-    return pd.DataFrame(compliant_rooms, index=compliant_room_ids)
+        decision_matrix = pd.DataFrame()
+    else:
+        decision_matrix = pd.DataFrame(compliant_rooms, index=compliant_room_ids)
+    decision_matrix.attrs["unknown_rooms"] = unknown_rooms
+    return decision_matrix
 
 
-def check_seats(room_id: str, rooms_and_equipments: List[Dict[str, Any]], needed_seats: int) -> bool:
+def check_seats(room_id: str, catalog: RoomCatalog, needed_seats: int) -> bool:
     """
     Checks if a room has enough seating capacity.
 
     Parameters:
         room_id (str): The room identifier.
-        rooms_and_equipments (list): Equipment data for rooms.
+        catalog (RoomCatalog): Catalog of the rooms and their equipment.
         needed_seats (int): Number of required seats.
 
     Returns:
         bool: True if the room meets or exceeds the required seating capacity.
     """
-    equipments = fetch_equipment(rooms_and_equipments, room_id)
-    return equipments.get("capacity", 0) >= needed_seats
+    return catalog.capacity(room_id) >= needed_seats
+
+
+def get_required_slots(date: str, start_time: str, end_time: str) -> List[str]:
+    """
+    Validates a booking period and lists the 30-minute slots it covers.
+
+    Parameters:
+        date (str): Date in "YYYY-MM-DD" format.
+        start_time (str): Start time in "HH:MM:SS" format (must be on 30-minute increments).
+        end_time (str): End time in "HH:MM:SS" format (must be on 30-minute increments and after start_time).
+
+    Returns:
+        list: Start timestamps of the slots in "%Y-%m-%d %H:%M:%S" format.
+
+    Raises:
+        ValueError: If the period is invalid.
+    """
+    # Validate and parse date and time inputs
+    start_datetime = datetime.strptime(f"{date} {start_time}", "%Y-%m-%d %H:%M:%S")
+    end_datetime = datetime.strptime(f"{date} {end_time}", "%Y-%m-%d %H:%M:%S")
+    if end_datetime <= start_datetime:
+        raise ValueError("End time must be after start time")
+    if start_datetime.date() != end_datetime.date():
+        raise ValueError("Start and end times must be on the same date")
+    if (start_datetime.minute % 30 != 0) or (start_datetime.second != 0):
+        raise ValueError("Start time must be in 30-minute increments with 0 seconds")
+    if (end_datetime.minute % 30 != 0) or (end_datetime.second != 0):
+        raise ValueError("End time must be in 30-minute increments with 0 seconds")
+
+    # Generate required time slots in 30-minute increments
+    required_slots = []
+    current_slot = start_datetime
+    while current_slot < end_datetime:
+        required_slots.append(current_slot.strftime("%Y-%m-%d %H:%M:%S"))
+        current_slot += timedelta(minutes=30)
+    return required_slots
+
+
+# Booked slots of all rooms as per-day bitmaps, shared by all requests of the process
+availability_index = AvailabilityIndex(store=shared_store)
+
+# Rooms, capacities and equipment, revalidated against restapi_rooms with conditional GETs
+room_catalog = RoomCatalog(store=shared_store)
 
 
 def check_availability(
     date: str, 
     start_time: str, 
     end_time: str, 
-    rooms_and_equipments: Any, 
-    needed_seats: int
+    catalog: RoomCatalog, 
+    needed_seats: int,
+    required_equipment: int = 0
 ) -> List[str]:
     """
     Checks which rooms are available within a specified time period and have sufficient seating capacity.
@@ -248,44 +504,29 @@ def check_availability(
         date (str): Date in "YYYY-MM-DD" format.
         start_time (str): Start time in "HH:MM:SS" format (must be on 30-minute increments).
         end_time (str): End time in "HH:MM:SS" format (must be on 30-minute increments and after start_time).
-        rooms_and_equipments (Any): Room and equipment information.
+        catalog (RoomCatalog): Catalog of the rooms and their equipment.
         needed_seats (int): Number of seats required.
+        required_equipment (int): Bitmask of the equipment rooms must have (see room_catalog.equipment_mask).
 
     Returns:
         list: List of available room IDs.
     """
     try:
-        # Validate and parse date and time inputs
-        start_datetime = datetime.strptime(f"{date} {start_time}", "%Y-%m-%d %H:%M:%S")
-        end_datetime = datetime.strptime(f"{date} {end_time}", "%Y-%m-%d %H:%M:%S")
-        if end_datetime <= start_datetime:
-            raise ValueError("End time must be after start time")
-        if start_datetime.date() != end_datetime.date():
-            raise ValueError("Start and end times must be on the same date")
-        if (start_datetime.minute % 30 != 0) or (start_datetime.second != 0):
-            raise ValueError("Start time must be in 30-minute increments with 0 seconds")
-        if (end_datetime.minute % 30 != 0) or (end_datetime.second != 0):
-            raise ValueError("End time must be in 30-minute increments with 0 seconds")
-
-        # Generate required time slots in 30-minute increments
-        required_slots = []
-        current_slot = start_datetime
-        while current_slot < end_datetime:
-            required_slots.append(current_slot.strftime("%Y-%m-%d %H:%M:%S"))
-            current_slot += timedelta(minutes=30)
-
-        all_rooms = fetch_rooms(rooms_and_equipments) or []
-        bookings_data = fetch_room_bookings(date, days=1)
+        # Validate the period
+        get_required_slots(date, start_time, end_time)
+
+        all_rooms = catalog.rooms()
+        seated_rooms = set(catalog.filter(min_capacity=needed_seats, required_equipment=required_equipment))
 
         available_rooms = []
-        for room_id in all_rooms:
-            booked_slots = bookings_data.get(room_id, [])
-            # Check if none of the required slots are booked
-            if not any(slot in booked_slots for slot in required_slots):
-                if check_seats(room_id, rooms_and_equipments, needed_seats):
-                    available_rooms.append(room_id)
-                else:
-                    print(f"Room {room_id} does not have enough seats.")
+        # Check if none of the required slots are booked, for all rooms at once
+        for room_id in availability_index.free_rooms(all_rooms, date, start_time, end_time):
+            if room_id in seated_rooms:
+                available_rooms.append(room_id)
+            elif required_equipment:
+                print(f"Room {room_id} does not have enough seats or the required equipment.")
+            else:
+                print(f"Room {room_id} does not have enough seats.")
         return available_rooms
 
     except ValueError as ve:
@@ -374,6 +615,112 @@ def create_user_prefs(
     return user_prefs
 
 
+# Sensors used for the environmental evaluation, in the column order of the decision matrix
+RANKING_SENSORS = ["co2", "temperature", "noise", "light", "humidity", "voc", "pm2_5", "pm10"]
+
+
+def get_lower_better_cols(temperature_preference: str) -> List[str]:
+    """
+    Returns the decision matrix columns where lower values are preferable.
+
+    Parameters:
+        temperature_preference (str): Temperature preference ("cool" makes lower temperatures better).
+
+    Returns:
+        list: Column names.
+    """
+    if temperature_preference.lower() == "cool":
+        return ["co2", "noise", "pm10", "pm2_5", "voc", "capacity", "temperature"]
+    return ["co2", "noise", "pm10", "pm2_5", "voc", "capacity"]
+
+
+def build_weights(
+    projector: bool,
+    blackboard: bool,
+    smartboard: bool,
+    microphone: bool,
+    pc: bool,
+    whiteboard: bool,
+    equipment_weight: int,
+    air_quality_weight: int,
+    temperature_weight: int,
+    noise_weight: int,
+    light_weight: int
+) -> List[int]:
+    """
+    Builds the TOPSIS weights of a ranking request.
+
+    Parameters:
+        projector, blackboard, smartboard, microphone, pc, whiteboard (bool): Requested equipment. The
+            equipment weight only applies to requested features.
+        equipment_weight (int): Weight for equipment-related criteria.
+        air_quality_weight (int): Weight for air quality sensors (applied to co2, pm2_5, pm10, voc).
+        temperature_weight (int): Weight for temperature sensor.
+        noise_weight (int): Weight for noise sensor.
+        light_weight (int): Weight for light sensor.
+
+    Returns:
+        list: Weights, in the same order as the columns of the decision matrix.
+    """
+    # Equipment weights: only add the weight if the feature is requested
+    projector_weight = equipment_weight if projector else 0
+    blackboard_weight = equipment_weight if blackboard else 0
+    microphone_weight = equipment_weight if microphone else 0
+    pc_weight = equipment_weight if pc else 0
+    smartboard_weight = equipment_weight if smartboard else 0
+    whiteboard_weight = equipment_weight if whiteboard else 0
+
+    # Weights for the decision matrix must align with the ordering of columns in the matrix.
+    return [
+        air_quality_weight,      # co2
+        temperature_weight,      # temperature
+        noise_weight,            # noise
+        light_weight,            # light
+        1,                       # humidity (default weight)
+        air_quality_weight,      # voc (using air quality weight)
+        air_quality_weight,      # pm2_5
+        air_quality_weight,      # pm10
+        projector_weight,        # projector
+        1,                       # capacity (default weight)
+        blackboard_weight,       # blackboard
+        microphone_weight,       # microphone
+        pc_weight,               # pc
+        smartboard_weight,       # smartboard
+        whiteboard_weight        # whiteboard
+    ]
+
+
+def format_ranking(topsis_result: pd.DataFrame) -> List[Dict[str, Any]]:
+    """
+    Converts a TOPSIS result into the list of dictionaries returned by the API.
+
+    Parameters:
+        topsis_result (pd.DataFrame): Ranked rooms, indexed by room id.
+
+    Returns:
+        list: List of dictionaries representing ranked rooms.
+    """
+    topsis_result = topsis_result.copy()
+    # Convert equipment columns to boolean values if present
+    equipment_columns = ["projector", "blackboard", "smartboard", "microphone", "pc", "whiteboard"]
+    for column in equipment_columns:
+        if column in topsis_result.columns:
+            topsis_result[column] = topsis_result[column].map({0: False, 1: True})
+        else:
+            print(f"Column '{column}' not found in TOPSIS results. Skipping conversion.")
+
+    # Convert results to a list of dictionaries
+    return topsis_result.reset_index().rename(columns={"index": "room_id"}).to_dict(orient="records")
+
+
+def unknown_ranking_entries(room_ids: List[str]) -> List[Dict[str, Any]]:
+    """
+    Lists rooms whose compliance is unknown after the ranked rooms, without rank or score.
+    """
+    return [{"room_id": room_id, "compliance": "unknown"} for room_id in room_ids]
+
+
+@with_deadline
 def get_ranking(
     date: str, 
     start_time: str, 
@@ -393,7 +740,9 @@ def get_ranking(
     air_quality_weight: int, 
     temperature_weight: int, 
     noise_weight: int, 
-    light_weight: int
+    light_weight: int,
+    strict_equipment: bool = False,
+    limit: Optional[int] = None
 ) -> List[Dict[str, Any]]:
     """
     Determines the ranking of available and compliant rooms based on user preferences and TOPSIS.
@@ -418,62 +767,48 @@ def get_ranking(
         temperature_weight (int): Weight for temperature sensor.
         noise_weight (int): Weight for noise sensor.
         light_weight (int): Weight for light sensor.
+        strict_equipment (bool): Whether rooms lacking requested equipment are excluded, which
+            happens before their compliance is evaluated, instead of only being ranked lower.
+        limit (int or None): Only return the first limit rooms of the ranking; only those are sorted
+            and formatted.
 
     Returns:
-        list: List of dictionaries representing ranked rooms.
+        list: List of dictionaries representing ranked rooms, followed by the available rooms whose
+            compliance is unknown (upstream unavailable or too slow for the request deadline).
     """
     # Define sensor list used for environmental evaluation
-    sensors = ["co2", "temperature", "noise", "light", "humidity", "voc", "pm2_5", "pm10"]
-
-    # Fetch room and equipment data from external sources
-    rooms_and_equipments = fetch_rooms_and_equipments()
+    sensors = RANKING_SENSORS
 
     # Check for available rooms based on date, time, and seating capacity
-    available_rooms = check_availability(date, start_time, end_time, rooms_and_equipments, seating_capacity)
+    required_equipment = equipment_mask(
+        projector=projector, blackboard=blackboard, smartboard=smartboard,
+        microphone=microphone, pc=pc, whiteboard=whiteboard
+    ) if strict_equipment else 0
+    with span("availability"):
+        available_rooms = check_availability(
+            date, start_time, end_time, room_catalog, seating_capacity, required_equipment
+        )
     print("Available rooms:", available_rooms)
     if not available_rooms:
         print("No available rooms. Returning empty list.")
         return []
 
     # Build the decision matrix using compliant room data
-    decision_matrix = build_topsis_matrix(available_rooms, sensors, rooms_and_equipments)
+    with span("decision_matrix"):
+        decision_matrix = build_topsis_matrix(available_rooms, sensors, room_catalog)
     print("Decision Matrix:\n", decision_matrix)
+    unknown = unknown_ranking_entries(decision_matrix.attrs.get("unknown_rooms", []))
     if decision_matrix.empty:
         print("Decision matrix is empty. Returning empty list.")
-        return []
+        return unknown[:limit]
 
     # Specify columns where lower values are preferable (if applicable)
-    if temperature_preference.lower() == "cool":
-        lower_better_cols = ["co2", "noise", "pm10", "pm2_5", "voc", "capacity", "temperature"]
-    else:
-        lower_better_cols = ["co2", "noise", "pm10", "pm2_5", "voc", "capacity"]
+    lower_better_cols = get_lower_better_cols(temperature_preference)
 
-    # Equipment weights: only add the weight if the feature is requested
-    projector_weight = equipment_weight if projector else 0
-    blackboard_weight = equipment_weight if blackboard else 0
-    microphone_weight = equipment_weight if microphone else 0
-    pc_weight = equipment_weight if pc else 0
-    smartboard_weight = equipment_weight if smartboard else 0
-    whiteboard_weight = equipment_weight if whiteboard else 0
-
-    # Weights for the decision matrix must align with the ordering of columns in the matrix.
-    weights = [
-        air_quality_weight,      # co2
-        temperature_weight,      # temperature
-        noise_weight,            # noise
-        light_weight,            # light
-        1,                       # humidity (default weight)
-        air_quality_weight,      # voc (using air quality weight)
-        air_quality_weight,      # pm2_5
-        air_quality_weight,      # pm10
-        projector_weight,        # projector
-        1,                       # capacity (default weight)
-        blackboard_weight,       # blackboard
-        microphone_weight,       # microphone
-        pc_weight,               # pc
-        smartboard_weight,       # smartboard
-        whiteboard_weight        # whiteboard
-    ]
+    weights = build_weights(
+        projector, blackboard, smartboard, microphone, pc, whiteboard,
+        equipment_weight, air_quality_weight, temperature_weight, noise_weight, light_weight
+    )
 
     # Create the user preferences based on input parameters
     user_prefs = create_user_prefs(
@@ -483,28 +818,371 @@ def get_ranking(
     )
 
     # Run TOPSIS decision logic to rank rooms
+    with span("topsis"):
+        topsis_result = topsis_decision_logic(
+            room_data=decision_matrix, 
+            user_pref=user_prefs,
+            weights=weights, 
+            lower_better_cols=lower_better_cols,
+            top_k=limit
+        )
+    if topsis_result.empty:
+        print("No rooms ranked. Returning empty list.")
+        return unknown[:limit]
+
+    print("TOPSIS Ranking:\n", topsis_result)
+    with span("format"):
+        return (format_ranking(topsis_result) + unknown)[:limit]
+
+
+@with_deadline
+def get_batch_ranking(date: str, profiles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Ranks the available and compliant rooms of a date for several preference profiles at once.
+
+    Bookings, room data and compliance results are fetched once for the union of the rooms available to
+    any profile, and all profiles are scored together with topsis_closeness_batch.
+
+    Parameters:
+        date (str): Date in "YYYY-MM-DD" format.
+        profiles (list): List of dictionaries with the keyword arguments of get_ranking (except date)
+            and an "id" identifying the profile.
+
+    Returns:
+        list: One dictionary per profile with its "id" and its "rooms" ranked as in get_ranking.
+            A profile with invalid input also gets an "error" message.
+    """
+    rankings = [{"id": profile.get("id", index), "rooms": []} for index, profile in enumerate(profiles)]
+    if not profiles:
+        return rankings
+
+    # Fetch room, equipment and booking data once for all profiles
+    all_rooms = room_catalog.rooms()
+    try:
+        booked = availability_index.day_masks(all_rooms, date, 1)[:, 0]
+    except Exception as e:
+        print(f"Availability check failed: {str(e)}")
+        return rankings
+
+    # Rooms each profile may rank, based on its time period and seating capacity
+    available: List[set] = []
+    for ranking, profile in zip(rankings, profiles):
+        try:
+            get_required_slots(date, profile["start_time"], profile["end_time"])
+        except ValueError as ve:
+            print(f"Validation error for profile {ranking['id']}: {str(ve)}")
+            ranking["error"] = str(ve)
+            available.append(set())
+            continue
+        free = (booked & np.uint64(slot_mask(profile["start_time"], profile["end_time"]))) == 0
+        seated_rooms = set(room_catalog.filter(min_capacity=profile["seating_capacity"]))
+        available.append({
+            room_id for room_id, is_free in zip(all_rooms, free) if is_free and room_id in seated_rooms
+        })
+
+    candidate_rooms = [room_id for room_id in all_rooms if any(room_id in rooms for rooms in available)]
+    print("Available rooms:", candidate_rooms)
+    if not candidate_rooms:
+        print("No available rooms. Returning empty rankings.")
+        return rankings
+
+    # Build the decision matrix once for all profiles
+    decision_matrix = build_topsis_matrix(candidate_rooms, RANKING_SENSORS, room_catalog)
+    print("Decision Matrix:\n", decision_matrix)
+    if decision_matrix.empty:
+        print("Decision matrix is empty. Returning empty rankings.")
+        return rankings
+
+    columns = list(decision_matrix.columns)
+    valid = np.array([[room_id in rooms for room_id in decision_matrix.index] for rooms in available])
+    user_prefs = np.full((len(profiles), len(columns)), np.nan)
+    weights = np.ones((len(profiles), len(columns)))
+    lower_better = np.zeros((len(profiles), len(columns)), dtype=bool)
+    for index, profile in enumerate(profiles):
+        prefs = create_user_prefs(
+            profile["seating_capacity"], profile["projector"], profile["blackboard"], profile["smartboard"],
+            profile["microphone"], profile["pc"], profile["whiteboard"],
+            profile["air_quality_preference"], profile["noise_level"], profile["lighting"],
+            profile["temperature_preference"]
+        )
+        user_prefs[index] = [prefs.get(col, np.nan) for col in columns]
+        profile_weights = build_weights(
+            profile["projector"], profile["blackboard"], profile["smartboard"], profile["microphone"],
+            profile["pc"], profile["whiteboard"], profile["equipment_weight"], profile["air_quality_weight"],
+            profile["temperature_weight"], profile["noise_weight"], profile["light_weight"]
+        )
+        # Weights are positional and must cover every column of the matrix
+        if len(profile_weights) != len(columns):
+            print(f"Profile {rankings[index]['id']}: {len(profile_weights)} weights for {len(columns)} columns. Skipping profile.")
+            valid[index] = False
+            continue
+        weights[index] = profile_weights
+        lower_better[index] = [col in get_lower_better_cols(profile["temperature_preference"]) for col in columns]
+
+    # Run TOPSIS for all profiles at once
+    scores = topsis_closeness_batch(decision_matrix.to_numpy(dtype=float), valid, user_prefs, weights, lower_better)
+
+    for index, ranking in enumerate(rankings):
+        if not valid[index].any():
+            continue
+        result = decision_matrix[valid[index]].copy()
+        result["score"] = scores[index, valid[index]]
+        result["rank"] = result["score"].rank(ascending=False)
+        ranking["rooms"] = format_ranking(result.sort_values("rank"))
+    return rankings
+
+
+# Longest date range, in days, that get_slot_search scans
+MAX_SEARCH_DAYS = 31
+
+
+@with_deadline
+def get_slot_search(
+    start_date: str,
+    end_date: str,
+    duration: int,
+    earliest_time: str,
+    latest_time: str,
+    top_k: int,
+    seating_capacity: int,
+    projector: bool,
+    blackboard: bool,
+    smartboard: bool,
+    microphone: bool,
+    pc: bool,
+    whiteboard: bool,
+    air_quality_preference: str,
+    noise_level: str,
+    lighting: str,
+    temperature_preference: str,
+    equipment_weight: int,
+    air_quality_weight: int,
+    temperature_weight: int,
+    noise_weight: int,
+    light_weight: int
+) -> List[Dict[str, Any]]:
+    """
+    Finds the best (room, start time) combinations for a booking of a given duration within a date range.
+
+    The availability bitmaps of all rooms are fetched once for the whole range, the free start slots of
+    every room and day are found with bitwise operations, and the rooms are scored once with TOPSIS.
+    Every free (room, start slot) pair then gets the score of its room and the top_k pairs are returned,
+    earlier slots first among equal scores.
+
+    Parameters:
+        start_date (str): First date in "YYYY-MM-DD" format.
+        end_date (str): Last date (inclusive) in "YYYY-MM-DD" format, at most MAX_SEARCH_DAYS days in total.
+        duration (int): Duration of the booking in minutes (a multiple of 30).
+        earliest_time (str): Earliest start time in "HH:MM:SS" format, rounded up to the next slot.
+        latest_time (str): Latest end time in "HH:MM:SS" format.
+        top_k (int): Maximum number of combinations to return.
+        seating_capacity (int) ... light_weight (int): As in get_ranking.
+
+    Returns:
+        list: List of dictionaries with the room, date, start and end time, score and rank of each combination.
+
+    Raises:
+        ValueError: If the date range, duration or time window is invalid.
+    """
+    first_day = datetime.strptime(start_date, "%Y-%m-%d").date()
+    days = (datetime.strptime(end_date, "%Y-%m-%d").date() - first_day).days + 1
+    if days < 1:
+        raise ValueError("End date must not be before start date")
+    if days > MAX_SEARCH_DAYS:
+        raise ValueError(f"Date range must not exceed {MAX_SEARCH_DAYS} days")
+    if duration <= 0 or duration % SLOT_MINUTES != 0:
+        raise ValueError(f"Duration must be a positive multiple of {SLOT_MINUTES} minutes")
+    window = search_window(earliest_time, latest_time)
+    if not window:
+        raise ValueError("Latest time must be at least one slot after earliest time")
+
+    # Rooms with enough seats and their free start slots, computed once per day for all rooms
+    rooms = room_catalog.filter(min_capacity=seating_capacity)
+    starts = free_starts(availability_index.day_masks(rooms, start_date, days), duration // SLOT_MINUTES, window)
+    candidate_rooms = [room_id for room_id, room_starts in zip(rooms, starts) if room_starts.any()]
+    print("Rooms with free slots:", candidate_rooms)
+    if not candidate_rooms:
+        return []
+
+    # Score every room once; the score is shared by all its slots
+    decision_matrix = build_topsis_matrix(candidate_rooms, RANKING_SENSORS, room_catalog)
+    if decision_matrix.empty:
+        print("Decision matrix is empty. Returning empty list.")
+        return []
     topsis_result = topsis_decision_logic(
-        room_data=decision_matrix, 
-        user_pref=user_prefs,
-        weights=weights, 
-        lower_better_cols=lower_better_cols
+        room_data=decision_matrix,
+        user_pref=create_user_prefs(
+            seating_capacity, projector, blackboard, smartboard,
+            microphone, pc, whiteboard,
+            air_quality_preference, noise_level, lighting, temperature_preference
+        ),
+        weights=build_weights(
+            projector, blackboard, smartboard, microphone, pc, whiteboard,
+            equipment_weight, air_quality_weight, temperature_weight, noise_weight, light_weight
+        ),
+        lower_better_cols=get_lower_better_cols(temperature_preference)
     )
     if topsis_result.empty:
         print("No rooms ranked. Returning empty list.")
         return []
+    room_scores = topsis_result["score"].reindex(rooms).to_numpy(dtype=float)
+
+    # Score all free (room, day, start slot) combinations at once and keep the best top_k
+    room_index, day_index, slot_index = np.nonzero(expand_slots(starts))
+    scores = room_scores[room_index]
+    ranked = ~np.isnan(scores)
+    room_index, day_index, slot_index, scores = room_index[ranked], day_index[ranked], slot_index[ranked], scores[ranked]
+    order = np.lexsort((slot_index, day_index, -scores))[:top_k]
+
+    results = []
+    for rank, position in enumerate(order, start=1):
+        start = datetime.combine(first_day + timedelta(days=int(day_index[position])), datetime.min.time()) \
+            + timedelta(minutes=int(slot_index[position]) * SLOT_MINUTES)
+        end = start + timedelta(minutes=duration)
+        results.append({
+            "room_id": rooms[room_index[position]],
+            "date": start.strftime("%Y-%m-%d"),
+            "start_time": start.strftime("%H:%M:%S"),
+            "end_time": end.strftime("%H:%M:%S"),
+            "score": float(scores[position]),
+            "rank": rank,
+        })
+    return results
+
+
+# Responses of /rank-rooms keyed by the normalized query. Entries of a date are dropped when a
+# booking for that date is reported through record_booking.
+ranking_cache = TTLCache(
+    maxsize=int(os.getenv("RANKING_CACHE_SIZE", "256")),
+    ttl=float(os.getenv("RANKING_CACHE_TTL", "60")),
+)
 
-    # Convert equipment columns to boolean values if present
-    equipment_columns = ["projector", "blackboard", "smartboard", "microphone", "pc", "whiteboard"]
-    for column in equipment_columns:
-        if column in topsis_result.columns:
-            topsis_result[column] = topsis_result[column].map({0: False, 1: True})
-        else:
-            print(f"Column '{column}' not found in TOPSIS results. Skipping conversion.")
 
-    print("TOPSIS Ranking:\n", topsis_result)
-    # Convert results to a list of dictionaries
-    topsis_dict = topsis_result.reset_index().rename(columns={"index": "room_id"}).to_dict(orient="records")
-    return topsis_dict
+def ranking_cache_key(date: str, **params: Any) -> Tuple[str, tuple]:
+    """
+    Builds the cache key of a ranking query, so that equivalent queries share an entry.
+
+    Parameters:
+        date (str): Date in "YYYY-MM-DD" format.
+        **params: The other keyword arguments of get_ranking.
+
+    Returns:
+        tuple: (date, version of the bookings of the date, sorted normalized parameters).
+    """
+    # Bookings reported to other workers change the version and thereby the key
+    return str(date), availability_index.date_version(str(date)), normalize_params(**params)
+
+
+def normalize_params(**params: Any) -> tuple:
+    """
+    Returns the sorted (name, value) pairs of query parameters, with strings lowercased and integral floats as int.
+    """
+    normalized = []
+    for name, value in params.items():
+        if isinstance(value, str):
+            value = value.strip().lower()
+        elif isinstance(value, float) and value.is_integer():
+            value = int(value)
+        normalized.append((name, value))
+    return tuple(sorted(normalized))
+
+
+def get_cached_ranking(date: str, limit: Optional[int] = None, **params: Any) -> List[Dict[str, Any]]:
+    """
+    Returns the ranking of get_ranking from the response cache, computing it on a miss.
+    With a limit, only the first limit rooms are computed and returned; a cached ranking serves any
+    limit up to the one it was computed with.
+    Empty rankings and rankings with rooms of unknown compliance are not cached, as they are also
+    returned when an upstream service fails.
+    """
+    with span("ranking_cache"):
+        key = ranking_cache_key(date, **params)
+        entry = ranking_cache.get(key)
+    if entry is not None:
+        computed_limit, ranking = entry
+        # A ranking shorter than its limit is complete
+        if computed_limit is None or len(ranking) < computed_limit or (limit is not None and limit <= computed_limit):
+            return ranking[:limit]
+
+    ranking = get_ranking(date=date, limit=limit, **params)
+    if ranking and not any(entry.get("compliance") == "unknown" for entry in ranking):
+        ranking_cache.set(key, (limit, ranking))
+    return ranking
+
+
+def encode_cursor(offset: int, fingerprint: str) -> str:
+    """
+    Builds the opaque pagination cursor of a position in the ranking of the query with the given fingerprint.
+    """
+    return base64.urlsafe_b64encode(f"{offset}:{fingerprint}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, fingerprint: str) -> int:
+    """
+    Returns the position encoded in a pagination cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed or belongs to another query.
+    """
+    try:
+        offset, cursor_fingerprint = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode().split(":")
+        offset = int(offset)
+    except ValueError:
+        raise ValueError("Invalid cursor")
+    if cursor_fingerprint != fingerprint or offset < 0:
+        raise ValueError("Cursor does not belong to this query")
+    return offset
+
+
+def get_ranking_page(
+    date: str, top_k: Optional[int] = None, cursor: Optional[str] = None, **params: Any
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Returns a page of the ranking of get_ranking and the cursor of the next page.
+
+    Only the rooms up to the end of the page are ranked and formatted, so the first pages of a large
+    campus stay cheap; further pages are served from the cached ranking while it is fresh.
+
+    Parameters:
+        date (str): Date in "YYYY-MM-DD" format.
+        top_k (int or None): Number of rooms per page, all remaining rooms if None.
+        cursor (str or None): Cursor returned with the previous page, None for the first page.
+        **params: The other keyword arguments of get_ranking.
+
+    Returns:
+        tuple: (rooms of the page, cursor of the next page or None on the last page).
+
+    Raises:
+        ValueError: If the cursor is invalid.
+    """
+    fingerprint = hashlib.sha1(repr((str(date), normalize_params(**params))).encode()).hexdigest()[:16]
+    offset = decode_cursor(cursor, fingerprint) if cursor else 0
+    if top_k is None:
+        return get_cached_ranking(date, **params)[offset:], None
+
+    # One room more than the page tells whether there is a next page
+    ranking = get_cached_ranking(date, limit=offset + top_k + 1, **params)
+    next_cursor = encode_cursor(offset + top_k, fingerprint) if len(ranking) > offset + top_k else None
+    return ranking[offset:offset + top_k], next_cursor
+
+
+def record_booking(room_id: str, start_timestamp: str) -> int:
+    """
+    Applies a new booking: marks its slot as booked and drops the cached rankings of its date.
+
+    Parameters:
+        room_id (str): The booked room.
+        start_timestamp (str): Start of the booked slot in "%Y-%m-%d %H:%M:%S" format.
+
+    Returns:
+        int: Number of dropped cache entries.
+    """
+    date = datetime.strptime(start_timestamp, "%Y-%m-%d %H:%M:%S").strftime("%Y-%m-%d")
+    availability_index.book(room_id, start_timestamp)
+    availability_index.bump_bookings(date)
+    invalidated = ranking_cache.invalidate(lambda key: key[0] == date)
+    print(f"Booking of {room_id} at {start_timestamp}: {invalidated} cached rankings dropped")
+    return invalidated
 
 
 # Optional: you can include a main block for testing purposes.
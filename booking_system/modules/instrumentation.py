@@ -0,0 +1,264 @@
+import contextvars
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+from modules.shared_store import SharedStore, shared_store
+
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+METRIC_HELP = {
+    "booking_request_duration_seconds": ("histogram", "Latency of the HTTP requests by endpoint."),
+    "booking_stage_duration_seconds": ("histogram", "Latency of the stages of the ranking pipeline."),
+    "booking_upstream_duration_seconds": ("histogram", "Latency of the calls to upstream services by endpoint."),
+    "booking_upstream_requests_total": ("counter", "Calls to upstream services by endpoint and outcome."),
+    "booking_upstream_coalesced_total": ("counter", "Upstream calls answered by an identical call already in flight."),
+    "booking_upstream_hedged_total": ("counter", "Slow upstream calls duplicated by a hedged request."),
+}
+
+# Spans of the request being served: a list of (name, start, duration) or None outside of a request
+current_spans: contextvars.ContextVar = contextvars.ContextVar("current_spans", default=None)
+
+
+class Metrics:
+    """
+    Latency histograms and counters of a worker process, rendered in the Prometheus text format.
+
+    With a shared store, every worker publishes a snapshot of its metrics, and the /metrics endpoint
+    of any worker returns the sum over all workers. Snapshots do not expire while their worker runs,
+    so the counters never go backwards; a worker removes its snapshot when it exits (see discard).
+    The flushes also purge the expired entries of the store.
+
+    Parameters:
+        store (SharedStore): Store shared with the other worker processes, or None.
+        flush_interval (float): Minimum time in seconds between two snapshots written to the store.
+        purge_interval (float): Minimum time in seconds between two purges of the store.
+    """
+
+    def __init__(self, store: Optional[SharedStore] = None, flush_interval: float = 1.0, purge_interval: float = 300.0):
+        self.store = store
+        self.flush_interval = flush_interval
+        self.purge_interval = purge_interval
+        # (name, labels) -> [bucket counts..., sum, count]
+        self.histograms: Dict[tuple, List[float]] = {}
+        self.counters: Dict[tuple, float] = {}
+        self._flushed_at = 0.0
+        self._purged_at = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, value: float, **labels: str):
+        """
+        Records value in the histogram name with the given labels.
+        """
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = [0] * len(LATENCY_BUCKETS) + [0.0, 0]
+            for index, bound in enumerate(LATENCY_BUCKETS):
+                if value <= bound:
+                    histogram[index] += 1
+            histogram[-2] += value
+            histogram[-1] += 1
+
+    def inc(self, name: str, amount: float = 1, **labels: str):
+        """
+        Increments the counter name with the given labels.
+        """
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "histograms": [[name, labels, list(values)] for (name, labels), values in self.histograms.items()],
+                "counters": [[name, labels, value] for (name, labels), value in self.counters.items()],
+            }
+
+    def flush(self, force: bool = False):
+        """
+        Publishes the metrics of this worker to the shared store, at most once per flush interval,
+        and purges the expired entries of the store, at most once per purge interval.
+        """
+        if self.store is None or (not force and time.monotonic() - self._flushed_at < self.flush_interval):
+            return
+        self._flushed_at = time.monotonic()
+        try:
+            self.store.set("metrics", str(os.getpid()), self.snapshot(), ttl=math.inf)
+        except Exception as e:
+            print(f"Shared store update failed: {str(e)}")
+
+        if self._flushed_at - self._purged_at < self.purge_interval:
+            return
+        self._purged_at = self._flushed_at
+        try:
+            self.store.purge()
+        except Exception as e:
+            print(f"Shared store purge failed: {str(e)}")
+
+    def discard(self):
+        """
+        Removes the snapshot of this worker from the shared store. Called when the worker exits.
+        """
+        if self.store is None:
+            return
+        try:
+            self.store.delete("metrics", str(os.getpid()))
+        except Exception as e:
+            print(f"Shared store update failed: {str(e)}")
+
+    def render(self) -> str:
+        """
+        Renders the metrics of all workers in the Prometheus text exposition format.
+        """
+        snapshots = [self.snapshot()]
+        if self.store is not None:
+            self.flush(force=True)
+            try:
+                snapshots = [value for _, value in self.store.items("metrics")] or snapshots
+            except Exception as e:
+                print(f"Shared store lookup failed: {str(e)}")
+
+        histograms: Dict[tuple, List[float]] = {}
+        counters: Dict[tuple, float] = {}
+        for snapshot in snapshots:
+            for name, labels, values in snapshot["histograms"]:
+                key = (name, tuple(tuple(label) for label in labels))
+                merged = histograms.setdefault(key, [0] * len(values))
+                histograms[key] = [a + b for a, b in zip(merged, values)]
+            for name, labels, value in snapshot["counters"]:
+                key = (name, tuple(tuple(label) for label in labels))
+                counters[key] = counters.get(key, 0) + value
+
+        lines = []
+        for metric, (kind, description) in METRIC_HELP.items():
+            lines.append(f"# HELP {metric} {description}")
+            lines.append(f"# TYPE {metric} {kind}")
+            if kind == "histogram":
+                for (name, labels), values in sorted(histograms.items()):
+                    if name != metric:
+                        continue
+                    for bound, count in zip(LATENCY_BUCKETS, values):
+                        lines.append(f"{name}_bucket{format_labels(labels, le=str(bound))} {count}")
+                    lines.append(f"{name}_bucket{format_labels(labels, le='+Inf')} {values[-1]}")
+                    lines.append(f"{name}_sum{format_labels(labels)} {values[-2]}")
+                    lines.append(f"{name}_count{format_labels(labels)} {values[-1]}")
+            else:
+                for (name, labels), value in sorted(counters.items()):
+                    if name == metric:
+                        lines.append(f"{name}{format_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def format_labels(labels: tuple, **extra: str) -> str:
+    items = list(labels) + list(extra.items())
+    if not items:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in items) + "}"
+
+
+metrics = Metrics(store=shared_store)
+
+
+@contextmanager
+def span(name: str):
+    """
+    Times a stage of the pipeline: records it in the stage histogram and in the spans of the current request.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration = time.perf_counter() - start
+        metrics.observe("booking_stage_duration_seconds", duration, stage=name)
+        spans = current_spans.get()
+        if spans is not None:
+            spans.append((name, start, duration))
+
+
+@contextmanager
+def upstream_call(endpoint: str):
+    """
+    Times a call to an upstream service and counts it by endpoint and outcome ("ok" or "error";
+    calls rejected by an open circuit are counted as "rejected" by data_fetcher).
+    """
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        duration = time.perf_counter() - start
+        metrics.observe("booking_upstream_duration_seconds", duration, endpoint=endpoint)
+        metrics.inc("booking_upstream_requests_total", endpoint=endpoint, outcome=outcome)
+        spans = current_spans.get()
+        if spans is not None:
+            spans.append((f"upstream:{endpoint}", start, duration))
+
+
+def server_timing(spans: List[tuple]) -> str:
+    """
+    Builds a Server-Timing header value from spans, summing the spans of the same name.
+    """
+    totals: Dict[str, List[float]] = {}
+    for name, _, duration in spans:
+        total = totals.setdefault(name, [0.0, 0])
+        total[0] += duration
+        total[1] += 1
+    entries = []
+    for name, (duration, count) in totals.items():
+        metric = "".join(char if char.isalnum() or char in "-_" else "_" for char in name)
+        entries.append(f'{metric};dur={duration * 1000:.1f};desc="{name} x{count}"')
+    return ", ".join(entries)
+
+
+def install(flask_app):
+    """
+    Instruments a Flask application: times every request, adds the Server-Timing header and returns the
+    spans with the response for requests with ?debug=true.
+    """
+    from flask import g, request
+
+    @flask_app.before_request
+    def start_request():
+        g.request_start = time.perf_counter()
+        g.spans_token = current_spans.set([])
+
+    @flask_app.after_request
+    def finish_request(response):
+        spans = current_spans.get() or []
+        start = getattr(g, "request_start", None)
+        if start is None:
+            return response
+        duration = time.perf_counter() - start
+        endpoint = request.url_rule.rule if request.url_rule is not None else "unmatched"
+        metrics.observe("booking_request_duration_seconds", duration, endpoint=endpoint)
+
+        if spans:
+            response.headers["Server-Timing"] = server_timing(spans) + f", total;dur={duration * 1000:.1f}"
+        if request.args.get("debug", "").lower() in ("1", "true") and response.is_json:
+            response.set_data(json.dumps({
+                "result": response.get_json(),
+                "timings": {
+                    "total_ms": duration * 1000,
+                    "spans": [
+                        {"name": name, "start_ms": (span_start - start) * 1000, "duration_ms": span_duration * 1000}
+                        for name, span_start, span_duration in spans
+                    ],
+                },
+            }))
+        metrics.flush()
+        return response
+
+    @flask_app.teardown_request
+    def end_request(exception=None):
+        token = getattr(g, "spans_token", None)
+        if token is not None:
+            current_spans.reset(token)
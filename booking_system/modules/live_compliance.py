@@ -0,0 +1,326 @@
+import json
+import math
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+import paho.mqtt.client as mqtt
+
+from modules.compliance_check import SUMMARY_THRESHOLDS, parse_timestamp
+from modules.data_fetcher import submit_sensor_downloads, fetch_rooms_and_equipments, fetch_rooms
+from modules.timeseries import NS_PER_SECOND, parse_timestamps, sort_by_time
+
+
+MQTT_BROKER = os.getenv("MQTT_BROKER", "mosquitto")
+MQTT_PORT = int(os.getenv("MQTT_PORT", "1883"))
+MQTT_TOPIC = os.getenv("MQTT_TOPIC", "+/sensors/#")
+
+# Width of a statistics bucket in seconds. Readings are aggregated per bucket, so the memory and the
+# cost of a read only depend on the window length divided by this width, not on the number of readings.
+BUCKET_SECONDS = int(os.getenv("LIVE_COMPLIANCE_BUCKET_SECONDS", "900"))
+
+# Sampling interval of the statistics in seconds, the aggregation window of the history served by restapi_rooms.
+# Live readings are averaged per interval, so that they are weighted like the backfilled history whatever the
+# publishing rate of the sensors.
+SAMPLE_SECONDS = int(os.getenv("LIVE_COMPLIANCE_SAMPLE_SECONDS", "30"))
+
+# Maps the sensor names used in the MQTT topics (and InfluxDB fields) to the names used by the API
+topic_sensor_map = {"air_quality_pm2_5": "pm2_5",
+                    "air_quality_pm10": "pm10",
+                    "co2": "co2",
+                    "voc": "voc",
+                    "sound": "noise",
+                    "temp": "temperature",
+                    "light": "light",
+                    "humidity": "humidity"
+}
+
+
+class SensorState:
+    """
+    Running compliance statistics of one sensor of one room over a sliding window.
+
+    Samples are accumulated in fixed-width time buckets holding count, sum, minimum, maximum and the
+    threshold exceedance counters. Totals over the window and over the last 24 hours are maintained
+    incrementally, so adding a sample and reading the summary do not depend on the history length.
+
+    The backfilled history arrives as means over sample_seconds intervals and is added as is (add). Raw
+    live readings are averaged per interval first (add_reading), and those of an interval the history
+    already covers are dropped, so that no interval is counted twice or with a different weight.
+
+    Parameters:
+        thresholds (dict): Thresholds of the sensor, as in SUMMARY_THRESHOLDS.
+        window_days (int): Length of the window in days.
+        bucket_seconds (int): Width of a bucket in seconds.
+        sample_seconds (int): Sampling interval of the statistics in seconds.
+    """
+
+    def __init__(self, thresholds: Dict[str, float], window_days: int, bucket_seconds: int = BUCKET_SECONDS,
+                 sample_seconds: int = SAMPLE_SECONDS):
+        self.thresholds = thresholds
+        self.bucket_seconds = bucket_seconds
+        self.sample_seconds = sample_seconds
+        # Intervals are numbered by their end, like the windows of aggregateWindow: interval n is
+        # [(n - 1) * sample_seconds, n * sample_seconds)
+        self.backfilled_interval: Optional[int] = None
+        self.pending_interval: Optional[int] = None
+        self.pending_count = 0
+        self.pending_total = 0.0
+        self.window_buckets = window_days * 86400 // bucket_seconds
+        self.day_buckets = 86400 // bucket_seconds
+        self.head: Optional[int] = None
+        # bucket index -> [count, sum, min, max, above, below, rolling_above]
+        self.buckets: Dict[int, List[float]] = {}
+        self.count = 0
+        self.total = 0.0
+        self.above = 0
+        self.below = 0
+        self.rolling_above = 0
+        self.day_count = 0
+        self.day_total = 0.0
+        self.minimum: Optional[float] = None
+        self.maximum: Optional[float] = None
+        self._extrema_dirty = False
+        self._lock = threading.Lock()
+
+    def add(self, epoch_seconds: float, value: float):
+        """
+        Adds a sample, the mean of the sampling interval ending at epoch_seconds.
+        """
+        with self._lock:
+            self._add(epoch_seconds, value)
+
+    def add_reading(self, epoch_seconds: float, value: float):
+        """
+        Adds a raw reading taken at epoch_seconds. The mean of the readings of an interval is added as
+        one sample when the first reading of a later interval arrives; readings of an interval that is
+        already backfilled or added are dropped.
+        """
+        interval = int(epoch_seconds // self.sample_seconds) + 1
+        with self._lock:
+            if self.backfilled_interval is not None and interval <= self.backfilled_interval:
+                return
+            if self.pending_interval is not None and interval != self.pending_interval:
+                if interval < self.pending_interval:
+                    return
+                self._add(self.pending_interval * self.sample_seconds, self.pending_total / self.pending_count)
+                self.pending_count = 0
+                self.pending_total = 0.0
+            self.pending_interval = interval
+            self.pending_count += 1
+            self.pending_total += value
+
+    def mark_backfilled(self, epoch_seconds: float):
+        """
+        Records that the history up to epoch_seconds, the time of the last backfilled sample, is added.
+        Its interval may be partial (the history runs up to now), so live readings of it are dropped too.
+        """
+        interval = math.ceil(epoch_seconds / self.sample_seconds)
+        with self._lock:
+            if self.backfilled_interval is None or interval > self.backfilled_interval:
+                self.backfilled_interval = interval
+            if self.pending_interval is not None and self.pending_interval <= self.backfilled_interval:
+                self.pending_interval = None
+                self.pending_count = 0
+                self.pending_total = 0.0
+
+    def _add(self, epoch_seconds: float, value: float):
+        bucket_index = int(epoch_seconds // self.bucket_seconds)
+        if self.head is None or bucket_index > self.head:
+            self._advance(bucket_index)
+        if bucket_index <= self.head - self.window_buckets:
+            return  # Older than the window
+
+        bucket = self.buckets.get(bucket_index)
+        if bucket is None:
+            bucket = self.buckets[bucket_index] = [0, 0.0, value, value, 0, 0, 0]
+        bucket[0] += 1
+        bucket[1] += value
+        bucket[2] = min(bucket[2], value)
+        bucket[3] = max(bucket[3], value)
+        self.count += 1
+        self.total += value
+        if not self._extrema_dirty:
+            self.minimum = value if self.minimum is None else min(self.minimum, value)
+            self.maximum = value if self.maximum is None else max(self.maximum, value)
+
+        if "upper" in self.thresholds and value > self.thresholds["upper"]:
+            bucket[4] += 1
+            self.above += 1
+        if "lower" in self.thresholds and value < self.thresholds["lower"]:
+            bucket[5] += 1
+            self.below += 1
+
+        if bucket_index > self.head - self.day_buckets:
+            self.day_count += 1
+            self.day_total += value
+        if "rolling" in self.thresholds and self.day_count and self.day_total / self.day_count > self.thresholds["rolling"]:
+            bucket[6] += 1
+            self.rolling_above += 1
+
+    def _advance(self, new_head: int):
+        """
+        Moves the newest bucket to new_head and drops the buckets leaving the window and the last 24 hours.
+        """
+        if self.head is not None:
+            old_day_start = self.head - self.day_buckets
+            new_day_start = new_head - self.day_buckets
+            window_start = new_head - self.window_buckets
+            for index in [index for index in self.buckets if old_day_start < index <= new_day_start]:
+                self.day_count -= self.buckets[index][0]
+                self.day_total -= self.buckets[index][1]
+            for index in [index for index in self.buckets if index <= window_start]:
+                count, total, _, _, above, below, rolling_above = self.buckets.pop(index)
+                self.count -= count
+                self.total -= total
+                self.above -= above
+                self.below -= below
+                self.rolling_above -= rolling_above
+                self._extrema_dirty = True
+        self.head = new_head
+
+    def summary(self) -> Optional[Dict[str, float]]:
+        """
+        Returns the statistics of the window in the format of the compliance summary endpoint,
+        or None if there are no readings.
+        """
+        with self._lock:
+            if not self.count:
+                return None
+            if self._extrema_dirty:
+                self.minimum = min(bucket[2] for bucket in self.buckets.values())
+                self.maximum = max(bucket[3] for bucket in self.buckets.values())
+                self._extrema_dirty = False
+
+            summary = {
+                "mean": self.total / self.count,
+                "max": self.maximum,
+                "min": self.minimum,
+                "count": self.count,
+            }
+            if "upper" in self.thresholds:
+                summary["pct_above"] = self.above / self.count * 100
+            if "lower" in self.thresholds:
+                summary["pct_below"] = self.below / self.count * 100
+            if "rolling" in self.thresholds:
+                summary["pct_rolling_above"] = self.rolling_above / self.count * 100
+            return summary
+
+
+class LiveComplianceState:
+    """
+    Per-room, per-sensor compliance statistics fed directly from the MQTT sensor stream.
+
+    On start the state subscribes to the sensor topics and replays the sensor history of all rooms
+    from restapi_rooms once; messages received during that replay are buffered and applied afterwards,
+    except those the replayed history already covers.
+
+    Parameters:
+        window_days (int): Length of the window the statistics are computed over.
+    """
+
+    def __init__(self, window_days: int):
+        self.window_days = window_days
+        self.states: Dict[tuple, SensorState] = {}
+        self.ready = False
+        self._buffer: List[tuple] = []
+        self._lock = threading.Lock()
+        self._client: Optional[mqtt.Client] = None
+        self._pid: Optional[int] = None
+
+    def _state(self, room_id: str, sensor: str) -> SensorState:
+        key = (room_id, sensor)
+        state = self.states.get(key)
+        if state is None:
+            with self._lock:
+                state = self.states.setdefault(
+                    key, SensorState(SUMMARY_THRESHOLDS.get(sensor, {}), self.window_days)
+                )
+        return state
+
+    def add_reading(self, room_id: str, sensor: str, timestamp: Any, value: float):
+        """
+        Adds a reading of an API sensor name to the state of a room.
+        """
+        if value is None:
+            return
+        with self._lock:
+            if not self.ready:
+                self._buffer.append((room_id, sensor, timestamp, value))
+                return
+        self._state(room_id, sensor).add_reading(parse_timestamp(timestamp).timestamp(), float(value))
+
+    def summary(self, room_id: str, sensor: str) -> Optional[Dict[str, float]]:
+        """
+        Returns the statistics of a room's sensor, or None if the state has no readings for it yet.
+        """
+        if not self.ready:
+            return None
+        state = self.states.get((room_id, sensor))
+        return state.summary() if state is not None else None
+
+    def on_message(self, client, userdata, message):
+        """
+        Handles a message published on <room>/sensors/<sensor>.
+        """
+        try:
+            room_id, _, topic_sensor = message.topic.split("/")
+            sensor = topic_sensor_map.get(topic_sensor)
+            if sensor is None:
+                return
+            data = json.loads(message.payload.decode())
+            if data.get("value") is not None and data.get("timestamp") is not None:
+                self.add_reading(room_id, sensor, data["timestamp"], data["value"])
+        except Exception as e:
+            print(f"Error processing MQTT message: {e}")
+
+    def backfill(self, sensors: List[str]):
+        """
+        Replays the sensor history of all rooms into the state, then applies the buffered messages
+        newer than the history of their sensor.
+        """
+        try:
+            rooms_and_equipments = fetch_rooms_and_equipments() or []
+            downloads = submit_sensor_downloads(fetch_rooms(rooms_and_equipments), sensors)
+            for room_id, room_downloads in downloads.items():
+                for sensor, future in room_downloads.items():
+                    sensor_data = future.result()
+                    if sensor_data is None or sensor_data.empty:
+                        continue
+                    state = self._state(room_id, sensor)
+                    # Timestamps arrive as ISO strings or, in the columnar format, as datetime64
+                    times, values = sort_by_time(
+                        parse_timestamps(sensor_data["timestamp"]) / NS_PER_SECOND,
+                        sensor_data["value"].to_numpy(dtype=float),
+                    )
+                    for epoch_seconds, value in zip(times.tolist(), values.tolist()):
+                        if not math.isnan(value):
+                            state.add(epoch_seconds, value)
+                    if len(times):
+                        state.mark_backfilled(float(times[-1]))
+        except Exception as e:
+            print(f"Live compliance backfill failed: {str(e)}")
+        finally:
+            with self._lock:
+                buffered, self._buffer = self._buffer, []
+                self.ready = True
+            for reading in buffered:
+                self.add_reading(*reading)
+            print(f"Live compliance state ready ({len(self.states)} sensors)")
+
+    def start(self, sensors: List[str]):
+        """
+        Connects to the broker and starts the backfill, once per process.
+        """
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self.ready = False
+
+        self._client = mqtt.Client()
+        self._client.on_message = self.on_message
+        self._client.on_connect = lambda client, userdata, flags, rc: client.subscribe(MQTT_TOPIC)
+        self._client.connect_async(MQTT_BROKER, MQTT_PORT)
+        self._client.loop_start()
+        threading.Thread(target=self.backfill, args=(sensors,), name="live-compliance-backfill", daemon=True).start()
@@ -0,0 +1,177 @@
+import contextvars
+import functools
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+import numpy as np
+
+
+# Time in seconds a ranking request may spend, including all its upstream calls
+REQUEST_DEADLINE = float(os.getenv("REQUEST_DEADLINE", "10"))
+
+# Latency percentile of an endpoint after which a duplicate of a slow request is sent
+HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", "95"))
+# Number of recent latencies an endpoint needs before its requests are hedged
+HEDGE_MIN_SAMPLES = int(os.getenv("HEDGE_MIN_SAMPLES", "20"))
+
+# Consecutive failures after which the calls to an endpoint fail fast, and for how many seconds
+CIRCUIT_FAILURES = int(os.getenv("CIRCUIT_FAILURES", "5"))
+CIRCUIT_RESET = float(os.getenv("CIRCUIT_RESET", "30"))
+
+# Absolute time (time.monotonic) by which the current request must be answered, or None
+current_deadline: contextvars.ContextVar = contextvars.ContextVar("current_deadline", default=None)
+
+
+class DeadlineExceeded(Exception):
+    """Raised when the deadline of the current request has passed."""
+
+
+@contextmanager
+def deadline(seconds: float):
+    """
+    Gives the code inside the block at most seconds to run. An enclosing deadline that ends earlier is kept.
+    """
+    end = time.monotonic() + seconds
+    enclosing = current_deadline.get()
+    token = current_deadline.set(end if enclosing is None else min(end, enclosing))
+    try:
+        yield
+    finally:
+        current_deadline.reset(token)
+
+
+def with_deadline(func):
+    """
+    Runs func under a deadline of REQUEST_DEADLINE seconds.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with deadline(REQUEST_DEADLINE):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def remaining() -> Optional[float]:
+    """
+    Returns the seconds left until the deadline of the current request, None without a deadline.
+    """
+    end = current_deadline.get()
+    return None if end is None else end - time.monotonic()
+
+
+class LatencyTracker:
+    """
+    Recent latencies of an endpoint, giving the delay after which a request is hedged.
+
+    Parameters:
+        size (int): Number of latencies kept.
+    """
+
+    def __init__(self, size: int = 200):
+        self.latencies = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float):
+        with self._lock:
+            self.latencies.append(seconds)
+
+    def hedge_delay(self) -> Optional[float]:
+        """
+        Returns the HEDGE_PERCENTILE latency, or None while there are too few samples to hedge.
+        """
+        with self._lock:
+            if len(self.latencies) < HEDGE_MIN_SAMPLES:
+                return None
+            return float(np.percentile(self.latencies, HEDGE_PERCENTILE))
+
+
+class CircuitBreaker:
+    """
+    Fails the calls to an endpoint fast after repeated failures.
+
+    After `failures` consecutive failures the circuit opens and calls are rejected without being sent.
+    After `reset_timeout` seconds a single trial call is let through (half-open): its success closes
+    the circuit, its failure opens it again.
+
+    Parameters:
+        failures (int): Consecutive failures that open the circuit.
+        reset_timeout (float): Time in seconds before a trial call is allowed.
+    """
+
+    def __init__(self, failures: int = CIRCUIT_FAILURES, reset_timeout: float = CIRCUIT_RESET):
+        self.failures = failures
+        self.reset_timeout = reset_timeout
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at < self.reset_timeout:
+            return "open"
+        return "half-open"
+
+    def allow(self) -> bool:
+        """
+        Returns True if a call may be sent now.
+        """
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half-open" and not self.trial_running:
+                self.trial_running = True
+                return True
+            return False
+
+    def success(self):
+        with self._lock:
+            self.consecutive_failures = 0
+            self.opened_at = None
+            self.trial_running = False
+
+    def release(self):
+        """
+        Ends a call allowed by allow() that was not sent, leaving the state unchanged.
+        """
+        with self._lock:
+            self.trial_running = False
+
+    def failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.trial_running or self.consecutive_failures >= self.failures:
+                self.opened_at = time.monotonic()
+            self.trial_running = False
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_trackers: Dict[str, LatencyTracker] = {}
+_lock = threading.Lock()
+
+
+def circuit_breaker(endpoint: str) -> CircuitBreaker:
+    """
+    Returns the circuit breaker of an endpoint.
+    """
+    with _lock:
+        if endpoint not in _breakers:
+            _breakers[endpoint] = CircuitBreaker()
+        return _breakers[endpoint]
+
+
+def latency_tracker(endpoint: str) -> LatencyTracker:
+    """
+    Returns the latency tracker of an endpoint.
+    """
+    with _lock:
+        if endpoint not in _trackers:
+            _trackers[endpoint] = LatencyTracker()
+        return _trackers[endpoint]
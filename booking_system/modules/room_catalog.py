@@ -0,0 +1,184 @@
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from modules.data_fetcher import fetch_rooms_and_equipments_if_modified
+from modules.instrumentation import span
+from modules.shared_store import SharedStore
+
+
+# Time in seconds during which the catalog is used without revalidating it against restapi_rooms
+CATALOG_TTL = float(os.getenv("ROOM_CATALOG_TTL", "30"))
+
+# Equipment flags, bit i of a room's equipment mask standing for EQUIPMENT_FLAGS[i]
+EQUIPMENT_FLAGS = ["projector", "blackboard", "smartboard", "microphone", "pc", "whiteboard"]
+
+
+def equipment_mask(**flags: bool) -> int:
+    """
+    Builds the bitmask of the requested equipment flags, e.g. equipment_mask(projector=True, pc=True).
+    """
+    mask = 0
+    for bit, name in enumerate(EQUIPMENT_FLAGS):
+        if flags.get(name):
+            mask |= 1 << bit
+    return mask
+
+
+class RoomCatalog:
+    """
+    In-memory index of the rooms and their equipment.
+
+    Every room has a row holding its capacity and a bitmask of its equipment flags, and the capacities
+    are also kept sorted, so lookups by room are O(1) and "has this equipment and at least N seats"
+    filters run vectorized over all rooms. The catalog revalidates itself with a conditional GET
+    (If-None-Match) once it is older than the TTL and is only rebuilt when the equipment changed.
+    With a shared store, the worker that revalidates publishes the equipment list and its ETag, and
+    the other workers take it from the store instead of asking restapi_rooms.
+
+    Parameters:
+        ttl (float): Time in seconds before the catalog is revalidated.
+        store (SharedStore): Store shared with the other worker processes, or None.
+    """
+
+    def __init__(self, ttl: float = CATALOG_TTL, store: Optional[SharedStore] = None):
+        self.ttl = ttl
+        self.store = store
+        self.etag: Optional[str] = None
+        self.rooms_and_equipments: List[Dict[str, Any]] = []
+        self.checked_at: Optional[float] = None
+        self.room_ids: List[str] = []
+        self.positions: Dict[str, int] = {}
+        self.equipments: List[Dict[str, Any]] = []
+        self.capacities = np.zeros(0, dtype=np.int64)
+        self.flags = np.zeros(0, dtype=np.uint8)
+        self.capacity_order = np.zeros(0, dtype=np.intp)
+        self.sorted_capacities = np.zeros(0, dtype=np.int64)
+        self._lock = threading.Lock()
+
+    def build(self, rooms_and_equipments: List[Dict[str, Any]]):
+        """
+        Replaces the catalog with the rooms of a /rooms/equipment response.
+        """
+        room_ids = [room_info["room"] for room_info in rooms_and_equipments]
+        # Equipment converted to the 0/1 values used in the decision matrix
+        equipments = [
+            {
+                key: (1 if value else 0) if isinstance(value, bool) else value
+                for key, value in room_info["equipment"].items()
+            }
+            for room_info in rooms_and_equipments
+        ]
+        capacities = np.array([equipment.get("capacity") or 0 for equipment in equipments], dtype=np.int64)
+        flags = np.array(
+            [equipment_mask(**{name: equipment.get(name) for name in EQUIPMENT_FLAGS}) for equipment in equipments],
+            dtype=np.uint8,
+        )
+        capacity_order = np.argsort(capacities, kind="stable")
+
+        with self._lock:
+            self.rooms_and_equipments = rooms_and_equipments
+            self.room_ids = room_ids
+            self.positions = {room_id: position for position, room_id in enumerate(room_ids)}
+            self.equipments = equipments
+            self.capacities = capacities
+            self.flags = flags
+            self.capacity_order = capacity_order
+            self.sorted_capacities = capacities[capacity_order]
+
+    def refresh(self, force: bool = False):
+        """
+        Revalidates the catalog if it is older than the TTL, rebuilding it only if the equipment changed.
+        """
+        with self._lock:
+            if not force and self.checked_at is not None and time.monotonic() - self.checked_at < self.ttl:
+                return
+            etag = self.etag if self.room_ids else None
+
+        with span("catalog_refresh"):
+            self._revalidate(etag)
+
+    def _revalidate(self, etag: Optional[str]):
+        # Another worker may have revalidated the catalog recently
+        shared = self._shared()
+        if shared is not None:
+            if shared["etag"] is None or shared["etag"] != etag:
+                self.build(shared["rooms"])
+            with self._lock:
+                self.etag = shared["etag"]
+                self.checked_at = time.monotonic()
+            return
+
+        result = fetch_rooms_and_equipments_if_modified(etag)
+        if result is None:
+            print("Room catalog refresh failed. Keeping the current catalog.")
+            return
+        rooms_and_equipments, etag = result
+        if rooms_and_equipments is not None:
+            self.build(rooms_and_equipments)
+            print(f"Room catalog loaded: {len(rooms_and_equipments)} rooms")
+        with self._lock:
+            self.etag = etag
+            self.checked_at = time.monotonic()
+        self._publish()
+
+    def _shared(self) -> Optional[Dict[str, Any]]:
+        if self.store is None:
+            return None
+        try:
+            return self.store.get("catalog", "equipment")
+        except Exception as e:
+            print(f"Shared store lookup failed: {str(e)}")
+            return None
+
+    def _publish(self):
+        if self.store is None:
+            return
+        try:
+            self.store.set("catalog", "equipment", {"etag": self.etag, "rooms": self.rooms_and_equipments}, self.ttl)
+        except Exception as e:
+            print(f"Shared store update failed: {str(e)}")
+
+    def rooms(self) -> List[str]:
+        """
+        Returns the ids of all rooms.
+        """
+        self.refresh()
+        return list(self.room_ids)
+
+    def equipment(self, room_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns a copy of the equipment of a room (booleans as 0/1), or None for an unknown room.
+        """
+        position = self.positions.get(room_id)
+        if position is None:
+            return None
+        return dict(self.equipments[position])
+
+    def capacity(self, room_id: str) -> int:
+        """
+        Returns the number of seats of a room, 0 for an unknown room.
+        """
+        position = self.positions.get(room_id)
+        return int(self.capacities[position]) if position is not None else 0
+
+    def filter(self, min_capacity: int = 0, required_equipment: int = 0) -> List[str]:
+        """
+        Lists the rooms with at least min_capacity seats and all the equipment of required_equipment.
+
+        Parameters:
+            min_capacity (int): Minimum number of seats.
+            required_equipment (int): Bitmask of the required equipment, as returned by equipment_mask.
+
+        Returns:
+            list: Room ids, in catalog order.
+        """
+        self.refresh()
+        with self._lock:
+            candidates = self.capacity_order[np.searchsorted(self.sorted_capacities, min_capacity, side="left"):]
+            mask = np.uint8(required_equipment)
+            candidates = np.sort(candidates[(self.flags[candidates] & mask) == mask])
+            return [self.room_ids[position] for position in candidates]
@@ -0,0 +1,229 @@
+import json
+import os
+import sqlite3
+import stat
+import tempfile
+import threading
+import time
+from typing import Any, Dict, Hashable, List, Optional
+
+
+def private_directory(path: str) -> str:
+    """
+    Creates a directory only the current user can access (mode 0700), or checks that an existing one is.
+
+    Raises:
+        RuntimeError: If path is a symlink, not a directory, owned by another user or accessible to others.
+    """
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        pass
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise RuntimeError(f"{path} is not a directory private to this user, set SHARED_STORE_PATH instead")
+    return path
+
+
+def default_store_path() -> str:
+    """
+    Returns the path of the store: SHARED_STORE_PATH, or a file in a private directory in /dev/shm (RAM)
+    if available, in the temporary directory otherwise.
+    """
+    path = os.getenv("SHARED_STORE_PATH")
+    if path:
+        return path
+    base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(private_directory(os.path.join(base, f"booking_system-{os.getuid()}")), "store.sqlite")
+
+
+def encode_value(value: Any) -> str:
+    """
+    Serializes a value as JSON, with NumPy scalars and arrays as plain numbers and lists. Tuples become lists.
+    """
+    return json.dumps(value, default=_plain_value)
+
+
+def _plain_value(item: Any) -> Any:
+    if hasattr(item, "tolist"):
+        return item.tolist()
+    raise TypeError(f"{type(item).__name__} cannot be stored in the shared store")
+
+
+class SharedStore:
+    """
+    Key-value store shared by the worker processes of the service.
+
+    The store is a SQLite database in shared memory (/dev/shm) in WAL mode, read through a memory
+    map, so every worker sees the entries written by the others without going through the network
+    or an extra service. Values are stored as JSON (never unpickled, so a tampered database cannot
+    run code) and expire after their TTL (wall-clock time, which is the same in every process).
+    Each process and thread uses its own connection.
+
+    Parameters:
+        path (str): Path of the database file.
+        mmap_size (int): Number of bytes of the database read through a memory map.
+    """
+
+    def __init__(self, path: Optional[str] = None, mmap_size: int = 64 * 1024 * 1024):
+        self.path = path or default_store_path()
+        self.mmap_size = mmap_size
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=OFF")
+            connection.execute(f"PRAGMA mmap_size={int(self.mmap_size)}")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, expires_at REAL NOT NULL,"
+                " PRIMARY KEY (namespace, key))"
+            )
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS versions ("
+                " namespace TEXT NOT NULL, key TEXT NOT NULL, version INTEGER NOT NULL,"
+                " PRIMARY KEY (namespace, key))"
+            )
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def _transaction(self, statement: str, parameters):
+        """
+        Runs executemany(statement, parameters) in a single write transaction.
+        """
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.executemany(statement, parameters)
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+
+    @staticmethod
+    def encode_key(key: Hashable) -> str:
+        """
+        Serializes a key (a string or a tuple of JSON values) into the text stored in the database.
+        """
+        return json.dumps(list(key) if isinstance(key, tuple) else key)
+
+    def get(self, namespace: str, key: Hashable) -> Optional[Any]:
+        """
+        Returns the value stored under key, or None if it is missing or expired.
+        """
+        row = self._connection().execute(
+            "SELECT value FROM entries WHERE namespace = ? AND key = ? AND expires_at > ?",
+            (namespace, self.encode_key(key), time.time()),
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get_many(self, namespace: str, keys: List[Hashable]) -> Dict[Hashable, tuple]:
+        """
+        Returns {key: (value, remaining_ttl)} for the keys of the list that are stored and not expired.
+        """
+        encoded = {self.encode_key(key): key for key in keys}
+        now = time.time()
+        found = {}
+        connection = self._connection()
+        items = list(encoded.items())
+        # Stay below SQLite's limit on the number of bound parameters
+        for start in range(0, len(items), 500):
+            chunk = dict(items[start:start + 500])
+            rows = connection.execute(
+                f"SELECT key, value, expires_at FROM entries WHERE namespace = ? AND expires_at > ?"
+                f" AND key IN ({','.join('?' * len(chunk))})",
+                (namespace, now, *chunk),
+            ).fetchall()
+            for key, value, expires_at in rows:
+                found[chunk[key]] = (json.loads(value), expires_at - now)
+        return found
+
+    def items(self, namespace: str) -> List[tuple]:
+        """
+        Returns the (key, value) pairs of all entries of a namespace that are not expired.
+        """
+        rows = self._connection().execute(
+            "SELECT key, value FROM entries WHERE namespace = ? AND expires_at > ?", (namespace, time.time())
+        ).fetchall()
+        return [(json.loads(key), json.loads(value)) for key, value in rows]
+
+    def set(self, namespace: str, key: Hashable, value: Any, ttl: float):
+        """
+        Stores value under key for ttl seconds (math.inf for an entry that never expires).
+        """
+        self.set_many(namespace, {key: value}, ttl)
+
+    def set_many(self, namespace: str, values: Dict[Hashable, Any], ttl: float):
+        """
+        Stores several values for ttl seconds in one transaction.
+        """
+        if not values:
+            return
+        expires_at = time.time() + ttl
+        self._transaction(
+            "INSERT OR REPLACE INTO entries (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+            [
+                (namespace, self.encode_key(key), encode_value(value), expires_at)
+                for key, value in values.items()
+            ],
+        )
+
+    def delete(self, namespace: str, key: Hashable):
+        """
+        Removes the entry stored under key.
+        """
+        self._connection().execute(
+            "DELETE FROM entries WHERE namespace = ? AND key = ?", (namespace, self.encode_key(key))
+        )
+
+    def purge(self) -> int:
+        """
+        Removes the expired entries.
+
+        Returns:
+            int: Number of removed entries.
+        """
+        return self._connection().execute("DELETE FROM entries WHERE expires_at <= ?", (time.time(),)).rowcount
+
+    def version(self, namespace: str, key: Hashable) -> int:
+        """
+        Returns the version counter of key (0 if it was never bumped).
+        """
+        row = self._connection().execute(
+            "SELECT version FROM versions WHERE namespace = ? AND key = ?", (namespace, self.encode_key(key))
+        ).fetchone()
+        return row[0] if row else 0
+
+    def bump(self, namespace: str, key: Hashable) -> int:
+        """
+        Increments the version counter of key, telling the other workers that what they derived from it is stale.
+
+        Returns:
+            int: The new version.
+        """
+        self._transaction(
+            "INSERT INTO versions (namespace, key, version) VALUES (?, ?, 1)"
+            " ON CONFLICT (namespace, key) DO UPDATE SET version = version + 1",
+            [(namespace, self.encode_key(key))],
+        )
+        return self.version(namespace, key)
+
+
+    def remove(self):
+        """
+        Deletes the database files, dropping every entry. Only safe while no other process uses the store.
+        """
+        for suffix in ("", "-wal", "-shm"):
+            try:
+                os.remove(self.path + suffix)
+            except FileNotFoundError:
+                pass
+
+
+# Store shared by all modules of the process. Only gunicorn.conf.py enables it: a single process
+# (the development server, the compliance job) has nobody to share with.
+shared_store = SharedStore() if os.getenv("SHARED_STORE_ENABLED") == "1" else None
@@ -0,0 +1,228 @@
+import threading
+import unittest
+from datetime import date
+from unittest import mock
+
+import numpy as np
+
+from modules import availability_index
+from modules.availability_index import (
+    SLOTS_PER_DAY, AvailabilityIndex, expand_slots, free_starts, search_window, slot_mask
+)
+from modules.decision_logic import MAX_SEARCH_DAYS, get_slot_search
+
+FULL_DAY = (1 << SLOTS_PER_DAY) - 1
+
+
+def bitmap(*slots):
+    return np.array([sum(1 << slot for slot in slots)], dtype=np.uint64)
+
+
+class TestSlotMask(unittest.TestCase):
+
+    def test_first_slot(self):
+        self.assertEqual(slot_mask("00:00:00", "00:30:00"), 1)
+
+    def test_last_slot(self):
+        self.assertEqual(slot_mask("23:30:00", "24:00:00"), 1 << 47)
+
+    def test_whole_day(self):
+        self.assertEqual(slot_mask("00:00:00", "24:00:00"), FULL_DAY)
+
+    def test_end_is_exclusive(self):
+        self.assertEqual(slot_mask("09:00:00", "10:00:00"), 0b11 << 18)
+
+    def test_times_inside_a_slot(self):
+        self.assertEqual(slot_mask("09:15:00", "09:45:00"), 1 << 18)
+
+    def test_empty_periods(self):
+        self.assertEqual(slot_mask("23:30:00", "23:30:00"), 0)
+        self.assertEqual(slot_mask("10:00:00", "09:00:00"), 0)
+        self.assertEqual(slot_mask("00:00:00", "00:00:00"), 0)
+
+
+class TestSearchWindow(unittest.TestCase):
+
+    def test_aligned_times(self):
+        self.assertEqual(search_window("09:00:00", "10:00:00"), slot_mask("09:00:00", "10:00:00"))
+        self.assertEqual(search_window("00:00:00", "24:00:00"), FULL_DAY)
+
+    def test_start_inside_a_slot_is_rounded_up(self):
+        self.assertEqual(search_window("09:10:00", "11:00:00"), 0b111 << 19)
+        self.assertEqual(search_window("09:00:01", "11:00:00"), 0b111 << 19)
+        self.assertEqual(search_window("23:40:00", "24:00:00"), 0)
+
+    def test_end_inside_a_slot_is_rounded_down(self):
+        self.assertEqual(search_window("09:00:00", "10:20:00"), 0b11 << 18)
+        self.assertEqual(search_window("09:10:00", "09:50:00"), 0)
+
+
+class TestSlotSearchRange(unittest.TestCase):
+
+    def search(self, start_date, end_date):
+        return get_slot_search(
+            start_date, end_date, 60, "08:00:00", "20:00:00", 10, 1,
+            False, False, False, False, False, False,
+            "normal", "normal", "normal", "moderate", 1, 1, 1, 1, 1
+        )
+
+    def test_range_longer_than_the_maximum_is_rejected(self):
+        self.assertEqual(MAX_SEARCH_DAYS, 31)
+        with self.assertRaises(ValueError):
+            self.search("2024-01-01", "2024-02-01")
+
+    def test_end_before_start_is_rejected(self):
+        with self.assertRaises(ValueError):
+            self.search("2024-01-02", "2024-01-01")
+
+
+class TestFreeStarts(unittest.TestCase):
+
+    def test_free_day(self):
+        starts = free_starts(bitmap(), 2, FULL_DAY)
+        self.assertEqual(int(starts[0]), FULL_DAY >> 1)
+
+    def test_run_at_midnight(self):
+        starts = free_starts(bitmap(2), 2, slot_mask("00:00:00", "24:00:00"))
+        self.assertTrue(expand_slots(starts)[0, 0])
+        self.assertFalse(expand_slots(starts)[0, 1])
+
+    def test_run_at_the_end_of_the_day(self):
+        window = slot_mask("23:00:00", "24:00:00")
+        self.assertEqual(int(free_starts(bitmap(), 2, window)[0]), 1 << 46)
+        self.assertEqual(int(free_starts(bitmap(), 1, window)[0]), 0b11 << 46)
+        self.assertEqual(int(free_starts(bitmap(), 3, window)[0]), 0)
+        self.assertEqual(int(free_starts(bitmap(47), 1, window)[0]), 1 << 46)
+
+    def test_last_slot_alone(self):
+        window = slot_mask("23:30:00", "24:00:00")
+        self.assertEqual(int(free_starts(bitmap(), 1, window)[0]), 1 << 47)
+        self.assertEqual(int(free_starts(bitmap(), 2, window)[0]), 0)
+        self.assertEqual(int(free_starts(bitmap(47), 1, window)[0]), 0)
+
+    def test_runs_stay_inside_the_window(self):
+        starts = free_starts(bitmap(20), 2, slot_mask("09:00:00", "12:00:00"))
+        np.testing.assert_array_equal(np.flatnonzero(expand_slots(starts)[0]), [18, 21, 22])
+
+    def test_matches_slot_by_slot_check(self):
+        rng = np.random.default_rng(0)
+        booked = rng.integers(0, 1 << 62, (4, 3), dtype=np.uint64) & np.uint64(FULL_DAY)
+        window = slot_mask("07:30:00", "20:00:00")
+        inside = expand_slots(np.array(window, dtype=np.uint64))
+        for slots in (1, 2, 3):
+            free = ~expand_slots(booked) & inside
+            expected = np.ones_like(free)
+            for offset in range(slots):
+                shifted = np.zeros_like(free)
+                shifted[..., :SLOTS_PER_DAY - offset] = free[..., offset:]
+                expected &= shifted
+            np.testing.assert_array_equal(expand_slots(free_starts(booked, slots, window)), expected)
+
+
+class CountingStore:
+    """Stands in for the shared store, counting the version lookups."""
+
+    def __init__(self):
+        self.value = 0
+        self.lookups = 0
+
+    def version(self, namespace, key):
+        self.lookups += 1
+        return self.value
+
+
+class TestAvailabilityIndexLoad(unittest.TestCase):
+
+    DAY = date(2024, 1, 1)
+
+    def test_reads_do_not_wait_for_a_reload(self):
+        index = AvailabilityIndex(horizon_days=2)
+        with mock.patch.object(availability_index, "fetch_room_bookings", return_value={"room_1": []}):
+            index.ensure(self.DAY, self.DAY)
+
+        fetching, release = threading.Event(), threading.Event()
+
+        def slow_fetch(start, days):
+            fetching.set()
+            release.wait(5)
+            return {"room_1": []}
+
+        with mock.patch.object(availability_index, "fetch_room_bookings", side_effect=slow_fetch):
+            reload = threading.Thread(target=index.ensure, args=(self.DAY, date(2024, 1, 5)))
+            reload.start()
+            self.assertTrue(fetching.wait(5))
+            # The loaded days are read and booked while the other days are fetched
+            self.assertTrue(index.book("room_1", "2024-01-01 09:00:00"))
+            self.assertEqual(index.day_masks(["room_1"], "2024-01-01", 1).tolist(), [[1 << 18]])
+            release.set()
+            reload.join(5)
+        self.assertEqual(index.days, 5)
+        self.assertEqual(index.day_masks(["room_1"], "2024-01-01", 1).tolist(), [[1 << 18]])
+
+    def test_concurrent_reloads_fetch_once(self):
+        index = AvailabilityIndex(horizon_days=2)
+        calls = []
+
+        def fetch(start, days):
+            calls.append((start, days))
+            return {"room_1": ["2024-01-02 10:00:00"]}
+
+        barrier = threading.Barrier(8)
+
+        def read():
+            barrier.wait(5)
+            index.day_masks(["room_1"], "2024-01-01", 2)
+
+        with mock.patch.object(availability_index, "fetch_room_bookings", side_effect=fetch):
+            readers = [threading.Thread(target=read) for _ in range(8)]
+            for reader in readers:
+                reader.start()
+            for reader in readers:
+                reader.join(5)
+        self.assertEqual(calls, [("2024-01-01", 2)])
+
+    def test_changes_during_a_load_are_kept(self):
+        index = AvailabilityIndex(horizon_days=1)
+
+        def fetch(start, days):
+            index.book("room_2", "2024-01-01 11:00:00")
+            index.release("room_1", "2024-01-01 09:00:00")
+            return {"room_1": ["2024-01-01 09:00:00", "2024-01-01 09:30:00"]}
+
+        with mock.patch.object(availability_index, "fetch_room_bookings", side_effect=fetch):
+            masks = index.day_masks(["room_1", "room_2"], "2024-01-01", 1)
+        self.assertEqual(masks.tolist(), [[1 << 19], [1 << 22]])
+
+    def test_failed_load_keeps_the_index(self):
+        index = AvailabilityIndex(horizon_days=1, ttl=0)
+        with mock.patch.object(availability_index, "fetch_room_bookings",
+                               return_value={"room_1": ["2024-01-01 09:00:00"]}):
+            index.ensure(self.DAY, self.DAY)
+        with mock.patch.object(availability_index, "fetch_room_bookings", return_value=None):
+            with self.assertRaises(RuntimeError):
+                index.ensure(self.DAY, self.DAY)
+        self.assertEqual(index.masks.tolist(), [[1 << 18]])
+        self.assertTrue(index.book("room_1", "2024-01-01 10:00:00"))
+        self.assertIsNone(index._changes)
+
+    def test_store_version_is_read_once_per_interval(self):
+        store = CountingStore()
+        index = AvailabilityIndex(horizon_days=1, store=store, version_interval=60)
+        with mock.patch.object(availability_index, "fetch_room_bookings", return_value={"room_1": []}) as fetch:
+            for _ in range(20):
+                index.day_masks(["room_1"], "2024-01-01", 1)
+            self.assertEqual(fetch.call_count, 1)
+            self.assertEqual(store.lookups, 2)
+
+            # A booking reported by another worker is seen once the interval is over
+            store.value = 1
+            index.day_masks(["room_1"], "2024-01-01", 1)
+            self.assertEqual(fetch.call_count, 1)
+            index._version_checked_at -= 60
+            index.day_masks(["room_1"], "2024-01-01", 1)
+            self.assertEqual(fetch.call_count, 2)
+            self.assertEqual(index.version, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
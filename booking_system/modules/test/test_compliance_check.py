@@ -0,0 +1,150 @@
+import unittest
+from concurrent.futures import Future
+
+import numpy as np
+import pandas as pd
+
+from modules.compliance_check import (
+    STAT_COLUMNS,
+    check_compliance_batch,
+    check_compliance_stats,
+    check_compliance_summary,
+    stats_from_summaries,
+    summarize_compliance_batch,
+)
+from modules.decision_logic import COMPLIANCE_FUNCTIONS, compliance_entries, evaluate_downloads
+
+# Value ranges around the thresholds of every sensor, so that rooms both pass and fail
+RANGES = {
+    "co2": (600, 1700),
+    "pm2_5": (5, 40),
+    "pm10": (10, 75),
+    "noise": (30, 90),
+    "light": (300, 1200),
+    "humidity": (25, 75),
+    "voc": (100, 450),
+    "temperature": (18, 27),
+}
+
+
+def make_measurements(rooms, seed=0):
+    rng = np.random.default_rng(seed)
+    times = pd.date_range("2024-11-01", periods=96, freq="30min", tz="UTC").strftime("%Y-%m-%dT%H:%M:%S+00:00")
+    frames = []
+    for room in range(rooms):
+        for sensor, (low, high) in RANGES.items():
+            # Shift each room towards one end of the range
+            centre = rng.uniform(low, high)
+            values = np.clip(rng.normal(centre, (high - low) / 10, len(times)), 0, None)
+            frames.append(pd.DataFrame({"room_id": f"room-{room}", "sensor": sensor, "timestamp": times, "value": values}))
+    return pd.concat(frames, ignore_index=True)
+
+
+class TestCheckComplianceBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.df = make_measurements(12)
+        self.table = check_compliance_batch(self.df)
+
+    def test_matches_per_sensor_checks(self):
+        verdicts = []
+        for (room_id, sensor), group in self.df.groupby(["room_id", "sensor"]):
+            expected = COMPLIANCE_FUNCTIONS[sensor](group[["timestamp", "value"]].reset_index(drop=True))
+            verdicts.append(expected["compliant"])
+            self.assertEqual(bool(self.table.at[room_id, f"{sensor}_compliant"]), bool(expected["compliant"]),
+                             f"{room_id} {sensor}")
+            self.assertAlmostEqual(self.table.at[room_id, sensor], group["value"].mean())
+        # The data must exercise both verdicts
+        self.assertTrue(any(verdicts) and not all(verdicts))
+
+    def test_overall_verdict(self):
+        sensor_columns = [f"{sensor}_compliant" for sensor in RANGES]
+        np.testing.assert_array_equal(self.table["compliant"], self.table[sensor_columns].all(axis=1))
+
+    def test_missing_sensor_is_not_compliant(self):
+        df = self.df[~((self.df["room_id"] == "room-0") & (self.df["sensor"] == "co2"))]
+        table = check_compliance_batch(df)
+        self.assertFalse(table.at["room-0", "co2_compliant"])
+        self.assertFalse(table.at["room-0", "compliant"])
+
+    def test_tolerances(self):
+        # CO2 also needs a majority of readings below 1000 ppm, whatever the tolerance
+        table = check_compliance_batch(self.df, {sensor: 100.0 for sensor in RANGES})
+        self.assertTrue(table[[f"{sensor}_compliant" for sensor in RANGES if sensor != "co2"]].all().all())
+
+    def test_empty(self):
+        table = check_compliance_batch(pd.DataFrame())
+        self.assertTrue(table.empty)
+        self.assertIn("compliant", table.columns)
+
+
+class TestComplianceFromSummaries(unittest.TestCase):
+
+    def test_summaries_give_the_same_verdicts_as_the_raw_data(self):
+        stats = summarize_compliance_batch(make_measurements(6, seed=1))
+        summaries = {}
+        for (room_id, sensor), row in stats.iterrows():
+            summaries.setdefault(room_id, {})[sensor] = {
+                column: value for column, value in row.items() if not pd.isna(value)
+            }
+        summaries["room-0"]["co2"] = None
+
+        table = check_compliance_stats(stats_from_summaries(summaries))
+        expected = check_compliance_stats(stats)
+        self.assertFalse(table.at["room-0", "co2_compliant"])
+        pd.testing.assert_frame_equal(table.drop(index="room-0"), expected.drop(index="room-0"), check_dtype=False)
+
+    def test_entries_match_check_compliance_summary(self):
+        stats = summarize_compliance_batch(make_measurements(6, seed=2))
+        keys = [(f"room-{room}", sensor, 14) for room in range(6) for sensor in RANGES] + [("room-9", "co2", 14)]
+        entries = compliance_entries(stats, keys)
+        for room_id, sensor, window in keys[:-1]:
+            summary = stats.loc[(room_id, sensor)].to_dict()
+            compliance_result, attributes = entries[(room_id, sensor, window)]
+            self.assertEqual(compliance_result["compliant"], bool(check_compliance_summary(sensor, summary)["compliant"]))
+            self.assertEqual(set(compliance_result) - {"compliant"}, set(STAT_COLUMNS))
+            self.assertEqual(attributes, {sensor: summary["mean"]})
+        self.assertEqual(entries[("room-9", "co2", 14)], ({"compliant": False}, {}))
+
+
+def finished(frame):
+    future = Future()
+    future.set_result(frame)
+    return future
+
+
+def readings(value):
+    times = pd.date_range("2024-11-01", periods=48, freq="30min", tz="UTC").strftime("%Y-%m-%dT%H:%M:%S+00:00")
+    return pd.DataFrame({"timestamp": times, "value": float(value)})
+
+
+class TestEvaluateDownloads(unittest.TestCase):
+
+    def test_failing_room_cancels_its_pending_downloads(self):
+        never_started = Future()
+        downloads = {
+            "room-0": {"co2": finished(readings(1800)), "temperature": never_started},
+            "room-1": {"co2": finished(readings(600)), "temperature": finished(readings(21))},
+        }
+        keys = [(room, sensor, 14) for room in downloads for sensor in ("co2", "temperature")]
+        results = evaluate_downloads(downloads, keys)
+
+        self.assertTrue(never_started.cancelled())
+        self.assertFalse(results[("room-0", "co2", 14)][0]["compliant"])
+        self.assertNotIn(("room-0", "temperature", 14), results)
+        self.assertTrue(results[("room-1", "co2", 14)][0]["compliant"])
+        self.assertEqual(results[("room-1", "temperature", 14)][1], {"temperature": 21.0})
+
+    def test_failed_and_empty_downloads(self):
+        downloads = {"room-0": {"co2": finished(None), "temperature": finished(pd.DataFrame())}}
+        results = evaluate_downloads(downloads, [("room-0", "co2", 14), ("room-0", "temperature", 14)])
+        self.assertEqual(results, {("room-0", "temperature", 14): ({"compliant": False}, {})})
+
+    def test_only_requested_keys_are_evaluated(self):
+        downloads = {"room-0": {"co2": finished(readings(600)), "temperature": finished(readings(40))}}
+        results = evaluate_downloads(downloads, [("room-0", "co2", 14)])
+        self.assertEqual(list(results), [("room-0", "co2", 14)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,168 @@
+import unittest
+from concurrent.futures import Future
+from datetime import datetime, timezone
+from unittest import mock
+
+import pandas as pd
+
+from modules import live_compliance
+from modules.live_compliance import LiveComplianceState, SensorState
+
+HOUR = 3600
+# A multiple of the sampling interval, so that interval boundaries are easy to read
+BASE = 30 * 56666666
+
+
+def iso(epoch_seconds):
+    return datetime.fromtimestamp(epoch_seconds, timezone.utc).isoformat()
+
+
+class TestSensorStateBuckets(unittest.TestCase):
+
+    def setUp(self):
+        # 2-day window of 1-hour buckets
+        self.state = SensorState({"upper": 100}, window_days=2, bucket_seconds=HOUR, sample_seconds=30)
+
+    def test_summary_of_empty_state(self):
+        self.assertIsNone(self.state.summary())
+
+    def test_statistics(self):
+        for offset, value in [(0, 50), (HOUR, 150), (2 * HOUR, 100)]:
+            self.state.add(offset, value)
+        summary = self.state.summary()
+        self.assertEqual(summary["count"], 3)
+        self.assertAlmostEqual(summary["mean"], 100)
+        self.assertEqual((summary["min"], summary["max"]), (50, 150))
+        self.assertAlmostEqual(summary["pct_above"], 100 / 3)
+
+    def test_buckets_leave_the_last_24_hours_before_the_window(self):
+        self.state.add(0, 10)
+        self.state.add(30 * HOUR, 20)
+        self.assertEqual(self.state.count, 2)
+        self.assertEqual(self.state.day_count, 1)
+        self.assertEqual(self.state.day_total, 20)
+
+    def test_buckets_expire_from_the_window(self):
+        self.state.add(0, 10)
+        self.state.add(HOUR, 500)
+        self.state.add(48 * HOUR, 20)
+        summary = self.state.summary()
+        self.assertEqual(summary["count"], 2)
+        self.assertNotIn(0, self.state.buckets)
+        self.assertEqual((summary["min"], summary["max"]), (20, 500))
+        self.assertEqual(self.state.above, 1)
+
+        self.state.add(49 * HOUR, 30)
+        summary = self.state.summary()
+        self.assertEqual(summary["count"], 2)
+        self.assertEqual((summary["min"], summary["max"]), (20, 30))
+        self.assertEqual(self.state.above, 0)
+
+    def test_samples_older_than_the_window_are_ignored(self):
+        self.state.add(48 * HOUR, 20)
+        self.state.add(0, 10)
+        self.assertEqual(self.state.summary()["count"], 1)
+
+    def test_rolling_exceedance(self):
+        state = SensorState({"rolling": 25}, window_days=2, bucket_seconds=HOUR)
+        for offset, value in [(0, 20), (HOUR, 40), (2 * HOUR, 10)]:
+            state.add(offset, value)
+        # Running 24-hour means: 20, 30, 23.3
+        self.assertAlmostEqual(state.summary()["pct_rolling_above"], 100 / 3)
+
+
+class TestSensorStateReadings(unittest.TestCase):
+
+    def setUp(self):
+        self.state = SensorState({"upper": 100}, window_days=14, sample_seconds=30)
+
+    def test_readings_are_averaged_per_interval(self):
+        for offset, value in [(0, 90), (10, 120), (20, 150)]:
+            self.state.add_reading(BASE + offset, value)
+        self.assertIsNone(self.state.summary())
+
+        self.state.add_reading(BASE + 30, 0)
+        summary = self.state.summary()
+        self.assertEqual(summary["count"], 1)
+        self.assertAlmostEqual(summary["mean"], 120)
+        self.assertEqual(summary["pct_above"], 100)
+
+    def test_late_reading_of_a_counted_interval_is_dropped(self):
+        self.state.add_reading(BASE + 30, 1)
+        self.state.add_reading(BASE + 60, 2)
+        self.state.add_reading(BASE + 35, 100)
+        self.state.add_reading(BASE + 90, 3)
+        self.assertEqual(self.state.summary()["count"], 2)
+        self.assertAlmostEqual(self.state.summary()["mean"], 1.5)
+
+    def test_readings_of_backfilled_intervals_are_dropped(self):
+        self.state.add(BASE + 60, 10)
+        self.state.mark_backfilled(BASE + 60)
+        self.state.add_reading(BASE + 59, 1000)
+        self.state.add_reading(BASE + 60, 20)
+        self.state.add_reading(BASE + 90, 30)
+        summary = self.state.summary()
+        self.assertEqual(summary["count"], 2)
+        self.assertAlmostEqual(summary["mean"], 15)
+
+    def test_partial_last_interval_is_not_counted_twice(self):
+        # The history runs up to now, in the middle of an interval
+        self.state.add(BASE + 75, 10)
+        self.state.mark_backfilled(BASE + 75)
+        self.state.add_reading(BASE + 80, 1000)
+        self.state.add_reading(BASE + 90, 30)
+        self.state.add_reading(BASE + 120, 0)
+        summary = self.state.summary()
+        self.assertEqual(summary["count"], 2)
+        self.assertAlmostEqual(summary["mean"], 20)
+
+    def test_mark_backfilled_discards_pending_readings_it_covers(self):
+        self.state.add_reading(BASE + 65, 1000)
+        self.state.mark_backfilled(BASE + 90)
+        self.state.add_reading(BASE + 95, 20)
+        self.state.add_reading(BASE + 120, 0)
+        self.assertEqual(self.state.summary()["count"], 1)
+        self.assertAlmostEqual(self.state.summary()["mean"], 20)
+
+
+class TestBackfillHandover(unittest.TestCase):
+
+    def backfill(self, state, history):
+        future = Future()
+        future.set_result(history)
+        with mock.patch.object(live_compliance, "fetch_rooms_and_equipments", return_value=[]), \
+                mock.patch.object(live_compliance, "fetch_rooms", return_value=["room"]), \
+                mock.patch.object(live_compliance, "submit_sensor_downloads", return_value={"room": {"co2": future}}):
+            state.backfill(["co2"])
+
+    def test_buffered_readings_covered_by_the_history_are_dropped(self):
+        state = LiveComplianceState(window_days=14)
+        # Received while the history is downloaded: the first two overlap it
+        for offset, value in [(270, 5000), (290, 5000), (300, 1200), (310, 1200), (320, 1200)]:
+            state.add_reading("room", "co2", iso(BASE + offset), value)
+        self.assertIsNone(state.summary("room", "co2"))
+
+        history = pd.DataFrame({
+            "timestamp": [iso(BASE + 30 * n) for n in range(1, 11)],
+            "value": [900.0] * 10,
+        })
+        self.backfill(state, history)
+        self.assertTrue(state.ready)
+        self.assertEqual(state.summary("room", "co2")["count"], 10)
+
+        state.add_reading("room", "co2", iso(BASE + 330), 1200)
+        summary = state.summary("room", "co2")
+        self.assertEqual(summary["count"], 11)
+        self.assertAlmostEqual(summary["mean"], (900 * 10 + 1200) / 11)
+        self.assertEqual(summary["max"], 1200)
+
+    def test_failed_download_still_applies_the_buffer(self):
+        state = LiveComplianceState(window_days=14)
+        state.add_reading("room", "co2", iso(BASE + 10), 800)
+        self.backfill(state, None)
+        state.add_reading("room", "co2", iso(BASE + 40), 800)
+        self.assertEqual(state.summary("room", "co2")["count"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,146 @@
+import threading
+import time
+import unittest
+from unittest import mock
+
+import requests
+
+from modules import data_fetcher, resilience
+from modules.resilience import CircuitBreaker, DeadlineExceeded, current_deadline, deadline, remaining, with_deadline
+
+
+class TestCircuitBreaker(unittest.TestCase):
+
+    def setUp(self):
+        self.breaker = CircuitBreaker(failures=3, reset_timeout=0.05)
+
+    def open_circuit(self):
+        for _ in range(3):
+            self.assertTrue(self.breaker.allow())
+            self.breaker.failure()
+
+    def test_opens_after_consecutive_failures(self):
+        for _ in range(2):
+            self.assertTrue(self.breaker.allow())
+            self.breaker.failure()
+        self.assertEqual(self.breaker.state, "closed")
+        self.breaker.failure()
+        self.assertEqual(self.breaker.state, "open")
+        self.assertFalse(self.breaker.allow())
+
+    def test_success_resets_failure_count(self):
+        self.breaker.failure()
+        self.breaker.failure()
+        self.breaker.success()
+        self.breaker.failure()
+        self.assertEqual(self.breaker.state, "closed")
+
+    def test_half_open_allows_a_single_trial(self):
+        self.open_circuit()
+        time.sleep(0.06)
+        self.assertEqual(self.breaker.state, "half-open")
+        self.assertTrue(self.breaker.allow())
+        self.assertFalse(self.breaker.allow())
+
+    def test_trial_success_closes(self):
+        self.open_circuit()
+        time.sleep(0.06)
+        self.assertTrue(self.breaker.allow())
+        self.breaker.success()
+        self.assertEqual(self.breaker.state, "closed")
+        self.assertTrue(self.breaker.allow())
+
+    def test_trial_failure_opens_again(self):
+        self.open_circuit()
+        time.sleep(0.06)
+        self.assertTrue(self.breaker.allow())
+        self.breaker.failure()
+        self.assertEqual(self.breaker.state, "open")
+        self.assertFalse(self.breaker.allow())
+
+    def test_release_ends_trial_unchanged(self):
+        self.open_circuit()
+        time.sleep(0.06)
+        self.assertTrue(self.breaker.allow())
+        self.breaker.release()
+        self.assertEqual(self.breaker.state, "half-open")
+        self.assertTrue(self.breaker.allow())
+
+
+class TestDeadline(unittest.TestCase):
+
+    def test_no_deadline(self):
+        self.assertIsNone(current_deadline.get())
+        self.assertIsNone(remaining())
+
+    def test_deadline_is_reset_after_block(self):
+        with deadline(5):
+            self.assertAlmostEqual(remaining(), 5, delta=0.1)
+        self.assertIsNone(remaining())
+
+    def test_earlier_enclosing_deadline_is_kept(self):
+        with deadline(1):
+            with deadline(10):
+                self.assertLessEqual(remaining(), 1)
+            with deadline(0.5):
+                self.assertLessEqual(remaining(), 0.5)
+            self.assertGreater(remaining(), 0.5)
+
+    def test_with_deadline(self):
+        @with_deadline
+        def budget():
+            return remaining()
+
+        self.assertAlmostEqual(budget(), resilience.REQUEST_DEADLINE, delta=0.1)
+        self.assertIsNone(remaining())
+
+    def test_deadline_is_per_thread(self):
+        seen = []
+        with deadline(5):
+            thread = threading.Thread(target=lambda: seen.append(remaining()))
+            thread.start()
+            thread.join()
+        self.assertEqual(seen, [None])
+
+
+class TestFetchResponse(unittest.TestCase):
+    """The accounting of upstream calls in the circuit breaker of data_fetcher._fetch_response."""
+
+    def setUp(self):
+        self.endpoint = f"test-{self.id()}"
+        self.breaker = resilience.circuit_breaker(self.endpoint)
+
+    def fetch(self, error, retries=1):
+        with mock.patch.object(data_fetcher, "_hedged_get", side_effect=error):
+            return data_fetcher._fetch_response("http://upstream/x", retries, 0.0, self.endpoint, {})
+
+    def test_full_timeout_is_a_failure(self):
+        self.assertIsNone(self.fetch(requests.exceptions.ReadTimeout()))
+        self.assertEqual(self.breaker.consecutive_failures, 1)
+
+    def test_timeout_shortened_by_deadline_is_not_a_failure(self):
+        with deadline(data_fetcher.UPSTREAM_TIMEOUT / 2):
+            self.assertIsNone(self.fetch(requests.exceptions.ReadTimeout()))
+        self.assertEqual(self.breaker.consecutive_failures, 0)
+
+    def test_connection_and_server_errors_are_failures(self):
+        with deadline(data_fetcher.UPSTREAM_TIMEOUT / 2):
+            self.fetch(requests.exceptions.ConnectionError())
+            self.fetch(requests.exceptions.HTTPError())
+        self.assertEqual(self.breaker.consecutive_failures, 2)
+
+    def test_unexpected_error_ends_half_open_trial(self):
+        self.breaker.opened_at = time.monotonic() - self.breaker.reset_timeout
+        with self.assertRaises(RuntimeError):
+            self.fetch(RuntimeError("cannot schedule new futures after shutdown"))
+        self.assertFalse(self.breaker.trial_running)
+        self.assertTrue(self.breaker.allow())
+
+    def test_deadline_exceeded_leaves_breaker_unchanged(self):
+        self.assertIsNone(self.fetch(DeadlineExceeded()))
+        self.assertEqual(self.breaker.consecutive_failures, 0)
+        self.assertEqual(self.breaker.state, "closed")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,178 @@
+import json
+import math
+import multiprocessing
+import os
+import shutil
+import stat
+import tempfile
+import time
+import unittest
+
+import numpy as np
+
+from modules.instrumentation import Metrics
+from modules.shared_store import SharedStore, private_directory
+
+
+def run_in_process(target, *args):
+    """Runs target(*args) in a child process and fails the test if it does not exit cleanly."""
+    process = multiprocessing.get_context("fork").Process(target=target, args=args)
+    process.start()
+    process.join(timeout=30)
+    if process.exitcode != 0:
+        raise AssertionError(f"{target.__name__} failed in the child process (exit code {process.exitcode})")
+
+
+def write_entries(path):
+    store = SharedStore(path)
+    store.set_many("cache", {("room", "co2", 14): {"compliant": True}, "plain": [1, 2]}, ttl=60)
+    store.set("cache", "expired", 1, ttl=-1)
+
+
+def read_entries(path, expected):
+    store = SharedStore(path)
+    found = store.get_many("cache", [("room", "co2", 14), "plain", "expired", "missing"])
+    if {key: value for key, (value, _) in found.items()} != expected:
+        os._exit(1)
+
+
+def bump_versions(path, times):
+    store = SharedStore(path)
+    for _ in range(times):
+        store.bump("catalog", "rooms")
+
+
+class TestSharedStore(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "store.sqlite")
+        self.store = SharedStore(self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_set_many_is_visible_to_another_process(self):
+        run_in_process(write_entries, self.path)
+        found = self.store.get_many("cache", [("room", "co2", 14), "plain", "expired", "missing"])
+        self.assertEqual(set(found), {("room", "co2", 14), "plain"})
+        value, remaining_ttl = found[("room", "co2", 14)]
+        self.assertEqual(value, {"compliant": True})
+        self.assertTrue(0 < remaining_ttl <= 60)
+
+    def test_get_many_sees_the_entries_of_another_process(self):
+        self.store.set_many("cache", {("room", "co2", 14): "a", "plain": "b"}, ttl=60)
+        run_in_process(read_entries, self.path, {("room", "co2", 14): "a", "plain": "b"})
+
+    def test_get_many_in_chunks(self):
+        self.store.set_many("cache", {f"key-{index}": index for index in range(1200)}, ttl=60)
+        found = self.store.get_many("cache", [f"key-{index}" for index in range(0, 1300, 7)])
+        self.assertEqual({key: value for key, (value, _) in found.items()},
+                         {f"key-{index}": index for index in range(0, 1200, 7)})
+
+    def test_bump_from_two_processes(self):
+        self.assertEqual(self.store.version("catalog", "rooms"), 0)
+        run_in_process(bump_versions, self.path, 5)
+        self.assertEqual(self.store.version("catalog", "rooms"), 5)
+        self.assertEqual(self.store.bump("catalog", "rooms"), 6)
+        run_in_process(bump_versions, self.path, 1)
+        self.assertEqual(self.store.version("catalog", "rooms"), 7)
+        self.assertEqual(self.store.version("catalog", "other"), 0)
+
+    def test_purge(self):
+        self.store.set("cache", "old", 1, ttl=-1)
+        self.store.set("cache", "new", 2, ttl=60)
+        self.store.set("cache", "forever", 3, ttl=math.inf)
+        self.assertEqual(self.store.purge(), 1)
+        self.assertEqual(sorted(key for key, _ in self.store.items("cache")), ["forever", "new"])
+
+    def test_values_are_stored_as_json(self):
+        value = ({"compliant": np.bool_(True), "avg": np.float64(1.5), "count": np.int64(3)}, {"co2": np.array([1, 2])})
+        self.store.set("cache", ("room", "co2", 14), value, ttl=60)
+        self.assertEqual(self.store.get("cache", ("room", "co2", 14)),
+                         [{"compliant": True, "avg": 1.5, "count": 3}, {"co2": [1, 2]}])
+        stored = self.store._connection().execute("SELECT value FROM entries").fetchone()[0]
+        self.assertEqual(json.loads(stored)[0]["avg"], 1.5)
+
+    def test_other_objects_are_rejected(self):
+        with self.assertRaises(TypeError):
+            self.store.set("cache", "key", object(), ttl=60)
+
+    def test_remove(self):
+        self.store.set("cache", "key", 1, ttl=60)
+        self.store.remove()
+        self.assertFalse(os.path.exists(self.path))
+        self.assertIsNone(SharedStore(self.path).get("cache", "key"))
+
+
+class TestStorePath(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_private_directory_is_created_with_mode_0700(self):
+        path = private_directory(os.path.join(self.directory, "store"))
+        self.assertEqual(stat.S_IMODE(os.stat(path).st_mode), 0o700)
+        self.assertEqual(private_directory(path), path)
+
+    def test_directory_accessible_to_others_is_rejected(self):
+        path = os.path.join(self.directory, "store")
+        os.mkdir(path)
+        os.chmod(path, 0o777)
+        with self.assertRaises(RuntimeError):
+            private_directory(path)
+
+    def test_symlink_is_rejected(self):
+        target = private_directory(os.path.join(self.directory, "target"))
+        link = os.path.join(self.directory, "link")
+        os.symlink(target, link)
+        with self.assertRaises(RuntimeError):
+            private_directory(link)
+
+
+class TestMetricsStore(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.store = SharedStore(os.path.join(self.directory, "store.sqlite"))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_snapshot_does_not_expire(self):
+        metrics = Metrics(store=self.store)
+        metrics.inc("booking_upstream_hedged_total", endpoint="rooms")
+        metrics.flush(force=True)
+        self.store._connection().execute("UPDATE entries SET expires_at = expires_at - 10 * 86400")
+        [(_, snapshot)] = self.store.items("metrics")
+        self.assertEqual(snapshot["counters"], [["booking_upstream_hedged_total", [["endpoint", "rooms"]], 1]])
+        self.assertIn('booking_upstream_hedged_total{endpoint="rooms"} 1', metrics.render())
+
+    def test_flush_purges_expired_entries(self):
+        metrics = Metrics(store=self.store, purge_interval=0.5)
+        self.store.set("cache", "old", 1, ttl=-1)
+        metrics.flush(force=True)
+        self.assertEqual(self.store.purge(), 0)
+
+        self.store.set("cache", "old", 1, ttl=-1)
+        metrics.flush(force=True)
+        self.assertEqual(self.store.purge(), 1)
+
+        self.store.set("cache", "old", 1, ttl=-1)
+        time.sleep(0.5)
+        metrics.flush(force=True)
+        self.assertEqual(self.store.purge(), 0)
+
+    def test_discard_removes_the_snapshot_of_the_worker(self):
+        metrics = Metrics(store=self.store)
+        metrics.flush(force=True)
+        self.assertEqual([key for key, _ in self.store.items("metrics")], [str(os.getpid())])
+        metrics.discard()
+        self.assertEqual(self.store.items("metrics"), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
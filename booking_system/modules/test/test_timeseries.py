@@ -0,0 +1,87 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from modules.compliance_check import (
+    SUMMARY_THRESHOLDS,
+    calculate_percentage,
+    check_compliance_pm10,
+    check_compliance_pm25,
+    check_compliance_summary,
+    summarize_compliance_batch,
+)
+from modules.timeseries import NS_PER_DAY, parse_timestamps, rolling_exceedance, rolling_mean, sort_by_time
+
+
+def make_series(hours, step_minutes=30, seed=0, gaps=False):
+    """PM readings around the 25 µg/m^3 limit, optionally with irregular gaps and NaN values."""
+    rng = np.random.default_rng(seed)
+    times = pd.date_range("2024-11-01", periods=hours * 60 // step_minutes, freq=f"{step_minutes}min", tz="UTC")
+    if gaps:
+        times = times[np.sort(rng.choice(len(times), len(times) * 2 // 3, replace=False))]
+    values = rng.uniform(5, 50, len(times))
+    if gaps:
+        values[rng.choice(len(values), 5, replace=False)] = np.nan
+    return pd.DataFrame({"timestamp": times.strftime("%Y-%m-%dT%H:%M:%S+00:00"), "value": values})
+
+
+def pandas_exceedance(df, limit):
+    """The 24h rolling check with pandas, as the compliance checks used to compute it."""
+    series = df.assign(timestamp=pd.to_datetime(df["timestamp"])).set_index("timestamp").sort_index()
+    return calculate_percentage(series["value"].rolling("24h").mean() > limit)
+
+
+class TestRollingMean(unittest.TestCase):
+
+    def test_matches_pandas_rolling_24h(self):
+        for gaps in (False, True):
+            df = make_series(72, gaps=gaps)
+            times = parse_timestamps(df["timestamp"])
+            expected = pd.Series(df["value"].to_numpy(), index=pd.to_datetime(times)).rolling("24h").mean()
+            np.testing.assert_allclose(rolling_mean(times, df["value"].to_numpy(), NS_PER_DAY), expected.to_numpy())
+
+    def test_window_excludes_its_start(self):
+        times = np.array([0, NS_PER_DAY, NS_PER_DAY + 1], dtype=np.int64)
+        np.testing.assert_allclose(rolling_mean(times, np.array([10.0, 20.0, 30.0]), NS_PER_DAY), [10, 20, 25])
+
+    def test_window_without_values(self):
+        means = rolling_mean(np.array([0, 2 * NS_PER_DAY], dtype=np.int64), np.array([np.nan, 5.0]), NS_PER_DAY)
+        self.assertTrue(np.isnan(means[0]))
+        self.assertEqual(means[1], 5.0)
+
+    def test_unsorted_series(self):
+        df = make_series(48)
+        shuffled = df.sample(frac=1, random_state=1)
+        times, values = sort_by_time(parse_timestamps(shuffled["timestamp"]), shuffled["value"].to_numpy())
+        self.assertAlmostEqual(rolling_exceedance(times, values, NS_PER_DAY, 25), pandas_exceedance(df, 25))
+
+    def test_empty_series(self):
+        self.assertTrue(np.isnan(rolling_exceedance(np.array([], dtype=np.int64), np.array([]), NS_PER_DAY, 25)))
+
+
+class TestRollingExceedance(unittest.TestCase):
+
+    def test_per_sensor_checks_match_pandas(self):
+        for seed in range(3):
+            df = make_series(96, seed=seed, gaps=bool(seed))
+            self.assertAlmostEqual(check_compliance_pm25(df)["pm2_5_non_compliant"], pandas_exceedance(df, 25))
+            self.assertAlmostEqual(check_compliance_pm10(df)["pm10_non_compliant"], pandas_exceedance(df, 50))
+
+    def test_summary_matches_pandas(self):
+        pm25, pm10 = make_series(96, seed=1, gaps=True), make_series(96, seed=2)
+        long = pd.concat([
+            pm25.assign(room_id="room-1", sensor="pm2_5"),
+            pm10.assign(room_id="room-1", sensor="pm10"),
+            pm25.assign(room_id="room-2", sensor="pm10"),
+        ], ignore_index=True)
+        stats = summarize_compliance_batch(long)
+        for room_id, sensor, df in (("room-1", "pm2_5", pm25), ("room-1", "pm10", pm10), ("room-2", "pm10", pm25)):
+            summary = stats.loc[(room_id, sensor)].to_dict()
+            expected = pandas_exceedance(df, SUMMARY_THRESHOLDS[sensor]["rolling"])
+            self.assertAlmostEqual(summary["pct_rolling_above"], expected)
+            self.assertEqual(check_compliance_summary(sensor, summary)["compliant"], expected <= 5.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
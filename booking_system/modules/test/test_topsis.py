@@ -0,0 +1,102 @@
+import unittest
+
+import numpy as np
+
+from benchmarks.bench_topsis import WEIGHT_COLUMNS, legacy_topsis, make_matrix
+from modules.decision_logic import build_weights, create_user_prefs, get_lower_better_cols
+from modules.topsis import average_ranks, top_k_order, topsis_closeness, topsis_closeness_batch
+
+
+class TestTopsisCloseness(unittest.TestCase):
+
+    def setUp(self):
+        self.user_prefs = create_user_prefs(20, True, False, True, False, True, False, "high", "silent", "bright", "cool")
+        self.weights = build_weights(True, False, True, False, True, False, 5, 3, 2, 1, 1)
+        self.lower_better_cols = get_lower_better_cols("cool")
+
+    def kernel_arguments(self, matrix):
+        prefs = {col: self.user_prefs[col] for col in matrix.columns}
+        weights = [self.weights[WEIGHT_COLUMNS.index(col)] for col in matrix.columns]
+        return prefs, weights
+
+    def test_matches_legacy_implementation(self):
+        for rooms in (2, 5, 50):
+            matrix = make_matrix(rooms, seed=rooms)
+            prefs, weights = self.kernel_arguments(matrix)
+            expected = legacy_topsis(matrix, prefs, weights, self.lower_better_cols)["score"].reindex(matrix.index)
+            closeness = topsis_closeness(
+                matrix.to_numpy(dtype=np.float64),
+                np.array([prefs[col] for col in matrix.columns], dtype=np.float64),
+                np.array(weights, dtype=np.float64),
+                matrix.columns.isin(self.lower_better_cols),
+            )
+            np.testing.assert_allclose(closeness, expected.to_numpy())
+
+    def test_matches_legacy_without_preferences(self):
+        matrix = make_matrix(20, seed=3)
+        _, weights = self.kernel_arguments(matrix)
+        expected = legacy_topsis(matrix, {}, weights, self.lower_better_cols)["score"].reindex(matrix.index)
+        closeness = topsis_closeness(
+            matrix.to_numpy(dtype=np.float64),
+            np.full(len(matrix.columns), np.nan),
+            np.array(weights, dtype=np.float64),
+            matrix.columns.isin(self.lower_better_cols),
+        )
+        np.testing.assert_allclose(closeness, expected.to_numpy())
+
+    def test_single_room(self):
+        np.testing.assert_array_equal(topsis_closeness(np.array([[1.0, 2.0]]), [np.nan, 3.0], [1, 1], [False, True]), [1.0])
+
+    def test_batch_matches_single_profile(self):
+        matrix = make_matrix(30, seed=4)
+        prefs, weights = self.kernel_arguments(matrix)
+        values = matrix.to_numpy(dtype=np.float64)
+        prefs = np.array([prefs[col] for col in matrix.columns], dtype=np.float64)
+        lower_better = matrix.columns.isin(self.lower_better_cols)
+        valid = np.ones((2, len(matrix)), dtype=bool)
+        valid[1, ::3] = False
+
+        closeness = topsis_closeness_batch(values, valid, np.stack([prefs, prefs]), np.stack([weights, weights]),
+                                           np.stack([lower_better, lower_better]))
+        for profile in range(2):
+            expected = topsis_closeness(values[valid[profile]], prefs, weights, lower_better)
+            np.testing.assert_allclose(closeness[profile, valid[profile]], expected)
+            self.assertTrue(np.isnan(closeness[profile, ~valid[profile]]).all())
+
+
+class TestTopKOrder(unittest.TestCase):
+
+    def test_ties_keep_position_order(self):
+        scores = np.array([0.5, 0.9, 0.5, 0.9, 0.1, 0.5])
+        np.testing.assert_array_equal(top_k_order(scores), [1, 3, 0, 2, 5, 4])
+        np.testing.assert_array_equal(top_k_order(scores, 1), [1])
+        np.testing.assert_array_equal(top_k_order(scores, 3), [1, 3, 0])
+        np.testing.assert_array_equal(top_k_order(scores, 4), [1, 3, 0, 2])
+
+    def test_all_tied(self):
+        np.testing.assert_array_equal(top_k_order(np.full(5, 0.3), 2), [0, 1])
+
+    def test_nan_last(self):
+        scores = np.array([np.nan, 0.2, np.nan, 0.7])
+        np.testing.assert_array_equal(top_k_order(scores), [3, 1, 0, 2])
+        np.testing.assert_array_equal(top_k_order(scores, 3), [3, 1, 0])
+
+    def test_k_out_of_range(self):
+        scores = np.array([0.1, 0.2])
+        np.testing.assert_array_equal(top_k_order(scores, 0), [])
+        np.testing.assert_array_equal(top_k_order(scores, 10), [1, 0])
+
+    def test_matches_stable_sort(self):
+        scores = np.random.default_rng(0).integers(0, 5, 200) / 4
+        expected = np.argsort(-scores, kind="stable")
+        for k in (1, 7, 50, 200):
+            np.testing.assert_array_equal(top_k_order(scores, k), expected[:k])
+
+    def test_average_ranks_of_ties(self):
+        scores = np.array([0.5, 0.9, 0.5, np.nan])
+        np.testing.assert_array_equal(average_ranks(scores, np.array([1, 0, 2])), [1.0, 2.5, 2.5])
+        self.assertTrue(np.isnan(average_ranks(scores, np.array([3]))[0]))
+
+
+if __name__ == '__main__':
+    unittest.main()
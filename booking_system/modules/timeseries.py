@@ -0,0 +1,115 @@
+import numpy as np
+import pandas as pd
+
+
+NS_PER_SECOND = 1_000_000_000
+NS_PER_DAY = 86400 * NS_PER_SECOND
+
+
+def parse_timestamps(timestamps) -> np.ndarray:
+    """
+    Parses ISO-8601 timestamps into nanoseconds since the epoch (UTC) in one vectorized call.
+
+    Parameters:
+        timestamps (array-like): ISO-8601 strings (with or without fractional seconds and offset),
+            datetime64 values or already parsed int64 epoch nanoseconds.
+
+    Returns:
+        np.ndarray: int64 array of epoch nanoseconds.
+    """
+    if isinstance(timestamps, (pd.Series, pd.Index)):
+        timestamps = timestamps.to_numpy()
+    timestamps = np.asarray(timestamps)
+    if timestamps.dtype.kind in "iu":
+        return timestamps.astype(np.int64, copy=False)
+    if timestamps.dtype.kind == "M":
+        return timestamps.astype("datetime64[ns]").astype(np.int64)
+    parsed = pd.to_datetime(timestamps, utc=True, format="ISO8601")
+    return pd.DatetimeIndex(parsed).as_unit("ns").asi8
+
+
+def sort_by_time(times: np.ndarray, values: np.ndarray):
+    """
+    Sorts a series by time, keeping the original order of equal timestamps.
+
+    Returns:
+        tuple: The sorted (times, values) arrays.
+    """
+    if len(times) > 1 and np.any(times[1:] < times[:-1]):
+        order = np.argsort(times, kind="stable")
+        return times[order], values[order]
+    return times, values
+
+
+def rolling_mean(times: np.ndarray, values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Computes the trailing time-based rolling mean at every point of a series sorted by time.
+
+    The window of a point at time t covers (t - window, t], like pandas' time-based rolling windows.
+    The means are computed from cumulative sums with one binary search per point instead of a
+    Python-level loop. NaN values are ignored; a window without any value gives NaN.
+
+    Parameters:
+        times (np.ndarray): int64 epoch nanoseconds, sorted in ascending order.
+        values (np.ndarray): Values of the series.
+        window (int): Length of the window in nanoseconds.
+
+    Returns:
+        np.ndarray: float64 array with the rolling mean at every point.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    valid = ~np.isnan(values)
+    sums = np.concatenate(([0.0], np.cumsum(np.where(valid, values, 0.0))))
+    counts = np.concatenate(([0], np.cumsum(valid)))
+
+    end = np.arange(1, len(times) + 1)
+    start = np.searchsorted(times, times - window, side="right")
+    window_counts = counts[end] - counts[start]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(window_counts > 0, (sums[end] - sums[start]) / window_counts, np.nan)
+
+
+def rolling_exceedance(times: np.ndarray, values: np.ndarray, window: int, limit: float) -> float:
+    """
+    Computes the percentage of points whose trailing rolling mean is strictly above limit.
+
+    Parameters:
+        times (np.ndarray): int64 epoch nanoseconds, sorted in ascending order.
+        values (np.ndarray): Values of the series.
+        window (int): Length of the window in nanoseconds.
+        limit (float): Limit of the rolling mean.
+
+    Returns:
+        float: Percentage of points above the limit, NaN for an empty series.
+    """
+    if len(times) == 0:
+        return np.nan
+    return float(np.mean(rolling_mean(times, values, window) > limit) * 100)
+
+
+def grouped_rolling_mean(groups: np.ndarray, times: np.ndarray, values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Computes trailing rolling means independently for every group of a long-format series.
+
+    Parameters:
+        groups (np.ndarray): Integer group code of every point.
+        times (np.ndarray): int64 epoch nanoseconds of every point, in any order.
+        values (np.ndarray): Values of the series.
+        window (int): Length of the window in nanoseconds.
+
+    Returns:
+        np.ndarray: float64 array with the rolling mean of every point, in the input order.
+    """
+    order = np.lexsort((times, groups))
+    sorted_groups = groups[order]
+    sorted_times = times[order]
+    sorted_values = np.asarray(values, dtype=np.float64)[order]
+
+    result = np.empty(len(order), dtype=np.float64)
+    boundaries = np.flatnonzero(sorted_groups[1:] != sorted_groups[:-1]) + 1
+    for start, end in zip(np.concatenate(([0], boundaries)), np.concatenate((boundaries, [len(order)]))):
+        result[start:end] = rolling_mean(sorted_times[start:end], sorted_values[start:end], window)
+
+    means = np.empty_like(result)
+    means[order] = result
+    return means
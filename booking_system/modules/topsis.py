@@ -0,0 +1,177 @@
+import warnings
+
+import numpy as np
+
+
+def _column_stats(has_nan: bool):
+    """Returns the (std, sum, min, max) reductions, NaN-aware if the matrix contains NaN values."""
+    if has_nan:
+        return np.nanstd, np.nansum, np.nanmin, np.nanmax
+    return np.std, np.sum, np.min, np.max
+
+
+def topsis_closeness(
+    room_data: np.ndarray,
+    user_prefs: np.ndarray,
+    weights: np.ndarray,
+    lower_better: np.ndarray
+) -> np.ndarray:
+    """
+    Computes the TOPSIS closeness coefficients of a decision matrix.
+
+    The preference adjustment, column normalization and weighting are folded into one scaling factor
+    per column, so the matrix is only traversed a few times without intermediate DataFrames.
+    NaN values are ignored in the column statistics, like pandas does.
+
+    Parameters:
+        room_data (np.ndarray): Decision matrix of shape (rooms, criteria).
+        user_prefs (np.ndarray): Preferred value of each criterion, NaN if there is no preference.
+        weights (np.ndarray): Weight of each criterion (normalized to sum to 1).
+        lower_better (np.ndarray): Boolean mask of the criteria where lower values are better.
+
+    Returns:
+        np.ndarray: Closeness coefficient of every room.
+    """
+    room_data = np.ascontiguousarray(room_data, dtype=np.float64)
+    user_prefs = np.asarray(user_prefs, dtype=np.float64)
+    weights = np.asarray(weights, dtype=np.float64)
+    lower_better = np.asarray(lower_better, dtype=bool)
+    if len(room_data) == 1:
+        return np.ones(1)
+
+    std, total, _, _ = _column_stats(bool(np.isnan(room_data).any()))
+    has_pref = ~np.isnan(user_prefs)
+
+    with warnings.catch_warnings(), np.errstate(invalid="ignore", divide="ignore"):
+        warnings.simplefilter("ignore", RuntimeWarning)
+
+        # Adjust the criteria with a preference to the negative z-distance from the preferred value
+        adjusted = room_data.copy()
+        if has_pref.any():
+            scale = std(room_data[:, has_pref], axis=0, ddof=1) + 1e-9
+            adjusted[:, has_pref] = -np.abs((room_data[:, has_pref] - user_prefs[has_pref]) / scale)
+
+        # Normalize by the column norms and apply the weights in a single scaling
+        norms = np.sqrt(total(adjusted * adjusted, axis=0))
+        weighted = adjusted * (weights / np.sum(weights) / norms)
+
+        # Columns with a zero norm (e.g. equipment all rooms have) become NaN and are ignored
+        _, total, minimum, maximum = _column_stats(bool(np.isnan(weighted).any()))
+
+        # Positive and negative ideal solutions, swapped for the lower-is-better criteria
+        column_max = maximum(weighted, axis=0)
+        column_min = minimum(weighted, axis=0)
+        ideal_best = np.where(lower_better, column_min, column_max)
+        ideal_worst = np.where(lower_better, column_max, column_min)
+
+        dist_pis = np.sqrt(total((weighted - ideal_best) ** 2, axis=1))
+        dist_nis = np.sqrt(total((weighted - ideal_worst) ** 2, axis=1))
+        return dist_nis / (dist_pis + dist_nis)
+
+
+def topsis_closeness_batch(
+    room_data: np.ndarray,
+    valid: np.ndarray,
+    user_prefs: np.ndarray,
+    weights: np.ndarray,
+    lower_better: np.ndarray
+) -> np.ndarray:
+    """
+    Computes TOPSIS closeness coefficients for several preference profiles on a shared decision matrix.
+
+    Every profile is scored exactly as topsis_closeness would score its valid rooms, but all profiles
+    are evaluated together as one broadcast computation of shape profiles x rooms x criteria.
+
+    Parameters:
+        room_data (np.ndarray): Decision matrix of shape (rooms, criteria).
+        valid (np.ndarray): Boolean mask of shape (profiles, rooms) of the rooms each profile ranks.
+        user_prefs (np.ndarray): Preferred value of each criterion, shape (profiles, criteria).
+            NaN means that the profile has no preference for the criterion.
+        weights (np.ndarray): Weights of shape (profiles, criteria).
+        lower_better (np.ndarray): Boolean mask of shape (profiles, criteria) of the criteria where
+            lower values are better.
+
+    Returns:
+        np.ndarray: Closeness coefficients of shape (profiles, rooms), NaN for the rooms a profile does not rank.
+    """
+    room_data = np.ascontiguousarray(room_data, dtype=np.float64)
+    valid = np.asarray(valid, dtype=bool)
+    weights = np.asarray(weights, dtype=np.float64)
+    lower_better = np.asarray(lower_better, dtype=bool)
+
+    # profiles x rooms x criteria, with the rooms a profile does not rank masked out as NaN
+    values = np.where(valid[:, :, None], room_data[None, :, :], np.nan)
+    prefs = np.asarray(user_prefs, dtype=np.float64)[:, None, :]
+    has_pref = ~np.isnan(prefs)
+
+    with warnings.catch_warnings(), np.errstate(invalid="ignore", divide="ignore"):
+        # Profiles with fewer than two rooms give all-NaN or zero-degree-of-freedom slices
+        warnings.simplefilter("ignore", RuntimeWarning)
+
+        std = np.nanstd(values, axis=1, ddof=1, keepdims=True)
+        adjusted = np.where(has_pref, -np.abs((values - prefs) / (std + 1e-9)), values)
+
+        norms = np.sqrt(np.nansum(adjusted * adjusted, axis=1, keepdims=True))
+        weighted = adjusted * ((weights / np.sum(weights, axis=1, keepdims=True))[:, None, :] / norms)
+
+        column_max = np.nanmax(weighted, axis=1, keepdims=True)
+        column_min = np.nanmin(weighted, axis=1, keepdims=True)
+        ideal_best = np.where(lower_better[:, None, :], column_min, column_max)
+        ideal_worst = np.where(lower_better[:, None, :], column_max, column_min)
+
+        dist_pis = np.sqrt(np.nansum((weighted - ideal_best) ** 2, axis=2))
+        dist_nis = np.sqrt(np.nansum((weighted - ideal_worst) ** 2, axis=2))
+        closeness = dist_nis / (dist_pis + dist_nis)
+
+    # A profile ranking a single room gives it the full score
+    closeness[valid.sum(axis=1) == 1] = 1.0
+    return np.where(valid, closeness, np.nan)
+
+
+def top_k_order(scores: np.ndarray, k: int = None) -> np.ndarray:
+    """
+    Returns the positions of the k highest scores, best first, NaN scores last and ties in position order.
+
+    Only the k selected scores are sorted: they are found in linear time with a partial selection
+    (np.partition), so taking the top 10 of thousands of rooms costs about one pass over the scores.
+
+    Parameters:
+        scores (np.ndarray): Score of every room.
+        k (int): Number of positions to return, all if None.
+
+    Returns:
+        np.ndarray: Positions into scores, of length min(k, len(scores)).
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    key = np.where(np.isnan(scores), np.inf, -scores)
+    if k is None or k >= len(key):
+        candidates = np.arange(len(key))
+    elif k <= 0:
+        candidates = np.arange(0)
+    else:
+        # Everything better than the k-th best key, completed by its ties in position order
+        threshold = np.partition(key, k - 1)[k - 1]
+        better = np.flatnonzero(key < threshold)
+        tied = np.flatnonzero(key == threshold)[:k - len(better)]
+        candidates = np.concatenate([better, tied])
+    return candidates[np.lexsort((candidates, key[candidates]))]
+
+
+def average_ranks(scores: np.ndarray, positions: np.ndarray) -> np.ndarray:
+    """
+    Returns the rank of the rooms at positions among all scores, highest score first and ties sharing
+    their average rank, as pandas Series.rank(ascending=False) does for the whole array.
+
+    Parameters:
+        scores (np.ndarray): Score of every room.
+        positions (np.ndarray): Positions of the rooms to rank.
+
+    Returns:
+        np.ndarray: Float ranks, NaN for NaN scores.
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    selected = scores[positions]
+    with np.errstate(invalid="ignore"):
+        greater = (scores[None, :] > selected[:, None]).sum(axis=1)
+        equal = (scores[None, :] == selected[:, None]).sum(axis=1)
+    return np.where(np.isnan(selected), np.nan, greater + (equal + 1) / 2)
@@ -3,13 +3,20 @@
 import connexion
 
 from swagger_server import encoder
+from modules import instrumentation
 
 
-def main():
+def create_app():
     app = connexion.App(__name__, specification_dir='./swagger/')
     app.app.json_encoder = encoder.JSONEncoder
     app.add_api('swagger.yaml', arguments={'title': 'Room Booking API'}, pythonic_params=True)
-    app.run(port=8081)
+    instrumentation.install(app.app)
+    return app
+
+
+def main():
+    # Development server (single process); production runs gunicorn with swagger_server.wsgi
+    create_app().run(port=8081)
 
 
 if __name__ == '__main__':
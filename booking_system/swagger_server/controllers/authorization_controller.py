@@ -1,6 +1,18 @@
+import hmac
+import os
 from typing import List
 """
 controller generated to handled auth operation described at:
 https://connexion.readthedocs.io/en/latest/security.html
 """
 
+
+def check_booking_events_token(api_key, required_scopes=None):
+    """Accepts the requests of restapi_rooms to /booking-events, which carry the shared BOOKING_EVENTS_TOKEN.
+
+    Without a configured token every request is rejected.
+    """
+    token = os.getenv("BOOKING_EVENTS_TOKEN", "")
+    if not token or not hmac.compare_digest(api_key.encode(), token.encode()):
+        return None
+    return {"sub": "restapi_rooms"}
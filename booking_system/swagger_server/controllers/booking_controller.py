@@ -0,0 +1,23 @@
+import connexion
+import six
+
+from swagger_server import util
+from modules.decision_logic import record_booking
+from flask import jsonify
+
+
+def booking_created(body):  # noqa: E501
+    """Report a new booking
+
+    Called by restapi_rooms after a room was booked. Marks the slot as booked and drops the cached rankings of its date. # noqa: E501
+
+    :param body: The booked room and slot
+    :type body: dict | bytes
+
+    :rtype: BookingEventResult
+    """
+    try:
+        invalidated = record_booking(body["room_id"], body["start_timestamp"])
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 400
+    return jsonify({"invalidated": invalidated})
@@ -0,0 +1,17 @@
+import connexion
+import six
+
+from swagger_server import util
+from modules.instrumentation import metrics
+from flask import Response
+
+
+def get_metrics():  # noqa: E501
+    """Get the latency metrics of the service
+
+    Request, pipeline stage and upstream call latency histograms and upstream call counters of all worker processes, in the Prometheus text format. # noqa: E501
+
+
+    :rtype: str
+    """
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
@@ -3,11 +3,11 @@ import six
 
 from swagger_server.models.room import Room  # noqa: E501
 from swagger_server import util
-from modules.decision_logic import get_ranking
+from modules.decision_logic import get_ranking_page, get_batch_ranking, get_slot_search
 from flask import jsonify
 
 
-def rank_rooms(date, start_time, end_time, seating_capacity, projector, blackboard, smartboard, microphone, pc, whiteboard, air_quality_preference, noise_level, lighting, temperature, equipment_weight, air_quality_weight, temperature_weight, noise_weight, light_weight):  # noqa: E501
+def rank_rooms(date, start_time, end_time, seating_capacity, projector, blackboard, smartboard, microphone, pc, whiteboard, air_quality_preference, noise_level, lighting, temperature, equipment_weight, air_quality_weight, temperature_weight, noise_weight, light_weight, strict_equipment=None, top_k=None, cursor=None):  # noqa: E501
     """Get a ranked list of available rooms based on preferences
 
      # noqa: E501
@@ -50,11 +50,20 @@ def rank_rooms(date, start_time, end_time, seating_capacity, projector, blackboa
     :type noise_weight: int
     :param light_weight: 
     :type light_weight: int
+    :param strict_equipment: 
+    :type strict_equipment: bool
+    :param top_k: 
+    :type top_k: int
+    :param cursor: 
+    :type cursor: str
 
     :rtype: List[Room]
     """
-    ranking = get_ranking(
+    try:
+        ranking, next_cursor = get_ranking_page(
         date=date,
+        top_k=top_k,
+        cursor=cursor,
         start_time=start_time,
         end_time=end_time,
         seating_capacity=seating_capacity,
@@ -72,6 +81,135 @@ def rank_rooms(date, start_time, end_time, seating_capacity, projector, blackboa
         air_quality_weight=air_quality_weight,
         temperature_weight=temperature_weight,
         noise_weight=noise_weight,
+        light_weight=light_weight,
+        strict_equipment=bool(strict_equipment)
+        )
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 400
+    response = jsonify(ranking)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return response
+
+
+# Defaults of the optional profile fields, as for the query parameters of rank_rooms
+PROFILE_DEFAULTS = {
+    "projector": False,
+    "blackboard": False,
+    "smartboard": False,
+    "microphone": False,
+    "pc": False,
+    "whiteboard": False,
+    "air_quality_preference": "normal",
+    "noise_level": "normal",
+    "lighting": "normal",
+    "temperature": "moderate",
+    "equipment_weight": 1,
+    "air_quality_weight": 1,
+    "temperature_weight": 1,
+    "noise_weight": 1,
+    "light_weight": 1,
+}
+
+
+def rank_rooms_batch(body):  # noqa: E501
+    """Get ranked lists of available rooms for several preference profiles
+
+     # noqa: E501
+
+    :param body: Date and preference profiles to rank the rooms for
+    :type body: dict | bytes
+
+    :rtype: List[ProfileRanking]
+    """
+    profiles = []
+    for index, profile in enumerate(body.get("profiles", [])):
+        profile = {**PROFILE_DEFAULTS, **profile}
+        profile.setdefault("id", str(index))
+        profile["temperature_preference"] = profile.pop("temperature")
+        profiles.append(profile)
+
+    rankings = get_batch_ranking(date=body["date"], profiles=profiles)
+    return jsonify(rankings)
+
+
+def search_slots(start_date, end_date, duration, earliest_time, latest_time, top_k, seating_capacity, projector, blackboard, smartboard, microphone, pc, whiteboard, air_quality_preference, noise_level, lighting, temperature, equipment_weight, air_quality_weight, temperature_weight, noise_weight, light_weight):  # noqa: E501
+    """Find the best rooms and start times for a booking within a date range
+
+     # noqa: E501
+
+    :param start_date: 
+    :type start_date: str
+    :param end_date: 
+    :type end_date: str
+    :param duration: 
+    :type duration: int
+    :param earliest_time: 
+    :type earliest_time: str
+    :param latest_time: 
+    :type latest_time: str
+    :param top_k: 
+    :type top_k: int
+    :param seating_capacity: 
+    :type seating_capacity: int
+    :param projector: 
+    :type projector: bool
+    :param blackboard: 
+    :type blackboard: bool
+    :param smartboard: 
+    :type smartboard: bool
+    :param microphone: 
+    :type microphone: bool
+    :param pc: 
+    :type pc: bool
+    :param whiteboard: 
+    :type whiteboard: bool
+    :param air_quality_preference: 
+    :type air_quality_preference: str
+    :param noise_level: 
+    :type noise_level: str
+    :param lighting: 
+    :type lighting: str
+    :param temperature: 
+    :type temperature: str
+    :param equipment_weight: 
+    :type equipment_weight: int
+    :param air_quality_weight: 
+    :type air_quality_weight: int
+    :param temperature_weight: 
+    :type temperature_weight: int
+    :param noise_weight: 
+    :type noise_weight: int
+    :param light_weight: 
+    :type light_weight: int
+
+    :rtype: List[SlotRanking]
+    """
+    try:
+        ranking = get_slot_search(
+        start_date=start_date,
+        end_date=end_date,
+        duration=duration,
+        earliest_time=earliest_time,
+        latest_time=latest_time,
+        top_k=top_k,
+        seating_capacity=seating_capacity,
+        projector=projector,
+        blackboard=blackboard,
+        smartboard=smartboard,
+        microphone=microphone,
+        pc=pc,
+        whiteboard=whiteboard,
+        air_quality_preference=air_quality_preference,
+        noise_level=noise_level,
+        lighting=lighting,
+        temperature_preference=temperature,
+        equipment_weight=equipment_weight,
+        air_quality_weight=air_quality_weight,
+        temperature_weight=temperature_weight,
+        noise_weight=noise_weight,
         light_weight=light_weight
-    )
+        )
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 400
     return jsonify(ranking)
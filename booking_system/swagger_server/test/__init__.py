@@ -4,6 +4,7 @@ import connexion
 from flask_testing import TestCase
 
 from swagger_server.encoder import JSONEncoder
+from modules import instrumentation
 
 
 class BaseTestCase(TestCase):
@@ -13,4 +14,5 @@ class BaseTestCase(TestCase):
         app = connexion.App(__name__, specification_dir='../swagger/')
         app.app.json_encoder = JSONEncoder
         app.add_api('swagger.yaml')
+        instrumentation.install(app.app)
         return app.app
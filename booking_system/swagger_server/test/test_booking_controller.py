@@ -0,0 +1,52 @@
+# coding: utf-8
+
+from __future__ import absolute_import
+
+import os
+from unittest import mock
+
+from flask import json
+from six import BytesIO
+
+from swagger_server.test import BaseTestCase
+
+
+class TestBookingController(BaseTestCase):
+    """BookingController integration test stubs"""
+
+    def test_booking_created(self):
+        """Test case for booking_created
+
+        Report a new booking
+        """
+        body = {'room_id': 'room_id_example',
+                'start_timestamp': '2013-10-20 09:00:00'}
+        with mock.patch.dict(os.environ, {'BOOKING_EVENTS_TOKEN': 'secret'}):
+            response = self.client.open(
+                '/booking-events',
+                method='POST',
+                headers={'X-Booking-Events-Token': 'secret'},
+                data=json.dumps(body),
+                content_type='application/json')
+        self.assert200(response,
+                       'Response body is : ' + response.data.decode('utf-8'))
+
+    def test_booking_created_without_token(self):
+        """Test case for booking_created without the shared token
+        """
+        body = {'room_id': 'room_id_example',
+                'start_timestamp': '2013-10-20 09:00:00'}
+        with mock.patch.dict(os.environ, {'BOOKING_EVENTS_TOKEN': 'secret'}):
+            response = self.client.open(
+                '/booking-events',
+                method='POST',
+                headers={'X-Booking-Events-Token': 'wrong'},
+                data=json.dumps(body),
+                content_type='application/json')
+        self.assert401(response,
+                       'Response body is : ' + response.data.decode('utf-8'))
+
+
+if __name__ == '__main__':
+    import unittest
+    unittest.main()
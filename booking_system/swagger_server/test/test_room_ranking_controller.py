@@ -35,7 +35,9 @@ class TestRoomRankingController(BaseTestCase):
                         ('air_quality_weight', 1),
                         ('temperature_weight', 1),
                         ('noise_weight', 1),
-                        ('light_weight', 1)]
+                        ('light_weight', 1),
+                        ('strict_equipment', false),
+                        ('top_k', 10)]
         response = self.client.open(
             '/rank-rooms',
             method='GET',
@@ -43,6 +45,57 @@ class TestRoomRankingController(BaseTestCase):
         self.assert200(response,
                        'Response body is : ' + response.data.decode('utf-8'))
 
+    def test_rank_rooms_batch(self):
+        """Test case for rank_rooms_batch
+
+        Get ranked lists of available rooms for several preference profiles
+        """
+        body = {'date': '2013-10-20',
+                'profiles': [{'id': 'course-1',
+                              'start_time': '09:00:00',
+                              'end_time': '11:00:00',
+                              'seating_capacity': 2}]}
+        response = self.client.open(
+            '/rank-rooms/batch',
+            method='POST',
+            data=json.dumps(body),
+            content_type='application/json')
+        self.assert200(response,
+                       'Response body is : ' + response.data.decode('utf-8'))
+
+
+    def test_search_slots(self):
+        """Test case for search_slots
+
+        Find the best rooms and start times for a booking within a date range
+        """
+        query_string = [('start_date', '2013-10-20'),
+                        ('end_date', '2013-10-25'),
+                        ('duration', 90),
+                        ('top_k', 10),
+                        ('seating_capacity', 2),
+                        ('projector', false),
+                        ('blackboard', false),
+                        ('smartboard', false),
+                        ('microphone', false),
+                        ('pc', false),
+                        ('whiteboard', false),
+                        ('air_quality_preference', 'normal'),
+                        ('noise_level', 'normal'),
+                        ('lighting', 'normal'),
+                        ('temperature', 'moderate'),
+                        ('equipment_weight', 1),
+                        ('air_quality_weight', 1),
+                        ('temperature_weight', 1),
+                        ('noise_weight', 1),
+                        ('light_weight', 1)]
+        response = self.client.open(
+            '/search-slots',
+            method='GET',
+            query_string=query_string)
+        self.assert200(response,
+                       'Response body is : ' + response.data.decode('utf-8'))
+
 
 if __name__ == '__main__':
     import unittest
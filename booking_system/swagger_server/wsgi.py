@@ -0,0 +1,4 @@
+# WSGI entry point for gunicorn, see gunicorn.conf.py
+from swagger_server.__main__ import create_app
+
+application = create_app()
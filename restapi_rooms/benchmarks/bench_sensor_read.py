@@ -0,0 +1,143 @@
+"""
+Microbenchmark of the read path of the sensor endpoints.
+
+Compares, on the response of a synthetic all-rooms, all-sensors query (GET /rooms/sensor):
+
+    per-record  annotated CSV parsed into FluxTable/FluxRecord objects by the client, then one dict
+                per reading with record.get_time().isoformat() and record.get_value(), then JSON
+    raw CSV     plain CSV rows grouped into columns by csv_tables, timestamps formatted and the JSON
+                written column by column, as the handlers do now
+
+No InfluxDB is needed: the CSV InfluxDB would send is generated and read from memory. Both outputs
+are checked to hold the same readings.
+
+Run from the restapi_rooms directory:
+    python -m benchmarks.bench_sensor_read --rooms 10 --days 1 14 --repeat 3
+"""
+import argparse
+import codecs
+import csv
+import io
+import json
+import random
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+from influxdb_client.client.flux_csv_parser import FluxCsvParser, FluxSerializationMode
+
+from swagger_server.controllers.get_funcs.flux_csv import csv_tables
+from swagger_server.controllers.get_funcs.get_sensor_data import collect_columns, room_data_json
+
+
+# InfluxDB fields of the sensors and their names in the API
+SENSOR_MAP = {
+    "air_quality_pm2_5": "pm2_5", "air_quality_pm10": "pm10", "co2": "co2", "voc": "voc",
+    "sound": "noise", "temp": "temperature", "light": "light", "humidity": "humidity",
+}
+
+COLUMNS = ["", "result", "table", "_start", "_stop", "_time", "_value", "_field", "_measurement", "room_id"]
+ANNOTATIONS = [
+    ["#datatype", "string", "long", "dateTime:RFC3339", "dateTime:RFC3339", "dateTime:RFC3339", "double",
+     "string", "string", "string"],
+    ["#group", "false", "false", "true", "true", "false", "false", "true", "true", "true"],
+    ["#default", "mean", "", "", "", "", "", "", "", ""],
+]
+
+
+def flux_csv(rooms: int, days: int, annotated: bool, seed: int = 0) -> bytes:
+    """
+    Returns the CSV of a query grouped by room and field over days of 30-second means.
+    """
+    rng = random.Random(seed)
+    stop = datetime(2024, 11, 20, tzinfo=timezone.utc)
+    start = stop - timedelta(days=days)
+    times = [(start + timedelta(seconds=30 * (i + 1))).strftime("%Y-%m-%dT%H:%M:%SZ")
+             for i in range(days * 2880)]
+    bounds = [start.strftime("%Y-%m-%dT%H:%M:%SZ"), stop.strftime("%Y-%m-%dT%H:%M:%SZ")]
+
+    output = io.StringIO()
+    writer = csv.writer(output, lineterminator="\r\n")
+    writer.writerows(ANNOTATIONS if annotated else [])
+    writer.writerow(COLUMNS)
+    table = 0
+    for room in range(rooms):
+        for field in SENSOR_MAP:
+            level = rng.uniform(20, 800)
+            for stamp in times:
+                writer.writerow(["", "" if annotated else "mean", table, *bounds, stamp,
+                                 repr(round(level + rng.gauss(0, 5), 3)), field, "room_data", f"room_{room}"])
+            table += 1
+    return output.getvalue().encode("utf-8")
+
+
+def per_record(body: bytes) -> str:
+    """
+    The read path before the raw CSV one, as in get_all_room_all_sensor.
+    """
+    parser = FluxCsvParser(response=io.BytesIO(body), serialization_mode=FluxSerializationMode.tables)
+    with parser:
+        list(parser.generator())
+    rooms_data = {}
+    for table in parser.table_list():
+        for record in table.records:
+            room_id = record.values.get("room_id")
+            if room_id not in rooms_data:
+                rooms_data[room_id] = {"room": room_id, **{sensor: [] for sensor in SENSOR_MAP.values()}}
+            mapped_sensor = SENSOR_MAP.get(record.get_field())
+            if mapped_sensor:
+                rooms_data[room_id][mapped_sensor].append({
+                    "timestamp": record.get_time().isoformat(),
+                    "value": record.get_value(),
+                })
+    return json.dumps(list(rooms_data.values()))
+
+
+def raw_csv(body: bytes) -> str:
+    rows = csv.reader(codecs.iterdecode(io.BytesIO(body), "utf-8"))
+    rooms_sensors = {}
+    for (room_id, field), columns in collect_columns(csv_tables(rows, ["room_id", "_field"])).items():
+        if field in SENSOR_MAP:
+            rooms_sensors.setdefault(room_id, {})[SENSOR_MAP[field]] = columns
+    return "[" + ", ".join(room_data_json(room_id, sensors) for room_id, sensors in rooms_sensors.items()) + "]"
+
+
+def measure(func, body: bytes, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(body)
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    func(body)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return min(timings), peak, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rooms", type=int, default=10, help="Number of rooms")
+    parser.add_argument("--days", type=int, nargs="+", default=[1, 14], help="Days of 30-second data")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per path (best is reported)")
+    args = parser.parse_args()
+
+    print(f"{'days':>4} {'points':>9} {'path':>10} {'time':>10} {'points/s':>10} {'peak memory':>12}")
+    for days in args.days:
+        points = args.rooms * len(SENSOR_MAP) * days * 2880
+        paths = {
+            "per-record": (per_record, flux_csv(args.rooms, days, annotated=True)),
+            "raw CSV": (raw_csv, flux_csv(args.rooms, days, annotated=False)),
+        }
+        outputs = []
+        for name, (func, body) in paths.items():
+            best, peak, output = measure(func, body, args.repeat)
+            outputs.append(output)
+            print(f"{days:>4} {points:>9} {name:>10} {best * 1000:7.0f} ms {points / best:10.0f} "
+                  f"{peak / 2 ** 20:9.0f} MB")
+        if json.loads(outputs[0]) != json.loads(outputs[1]):
+            raise AssertionError("The read paths return different readings")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,17 @@
+import json
 import os
+import threading
+import time
+from datetime import datetime, timedelta
+from urllib.parse import urlparse
+
+import google_auth_httplib2
+import httplib2
+import urllib3
 from google.oauth2 import service_account
-from googleapiclient.discovery import build
+from google_auth_httplib2 import AuthorizedHttp
+from googleapiclient.discovery import build_from_document
+from googleapiclient.http import HttpRequest
 from influxdb_client import InfluxDBClient, Point
 
 
@@ -19,19 +30,190 @@ def authenticate():
     return credentials
 
 
+# Fetched when the client library has no copy of the Calendar API discovery document
+CALENDAR_DISCOVERY_URL = 'https://www.googleapis.com/discovery/v1/apis/calendar/v3/rest'
+# Seconds before its expiry at which the access token is refreshed
+CALENDAR_TOKEN_REFRESH_MARGIN = float(os.getenv('CALENDAR_TOKEN_REFRESH_MARGIN', '300'))
+
+_credentials = None
+_credentials_lock = threading.Lock()
+_calendar_service = None
+_calendar_lock = threading.Lock()
+_local = threading.local()
+
+
+def get_credentials():
+    """ Returns the service account credentials of the process, loaded once
+
+    The access token is only refreshed when it is missing or expires within
+    CALENDAR_TOKEN_REFRESH_MARGIN seconds, by one thread at a time.
+    """
+    global _credentials
+    with _credentials_lock:
+        if _credentials is None:
+            _credentials = authenticate()
+        expiry = _credentials.expiry
+        if not _credentials.token or expiry is None \
+                or expiry - datetime.utcnow() < timedelta(seconds=CALENDAR_TOKEN_REFRESH_MARGIN):
+            _credentials.refresh(google_auth_httplib2.Request(httplib2.Http(timeout=30)))
+        return _credentials
+
+
+def load_discovery_document():
+    """ Returns the Calendar API discovery document shipped with the client library,
+    or fetched from Google when the library has no copy of it
+
+    The document is only read once per process, when the service is built, and is
+    rejected unless its rootUrl points to googleapis.com.
+    """
+    document = None
+    try:
+        from googleapiclient.discovery_cache import get_static_doc
+        document = get_static_doc('calendar', 'v3')
+    except ImportError:
+        pass
+    if document is None:
+        response, content = httplib2.Http(timeout=30).request(CALENDAR_DISCOVERY_URL)
+        if response.status != 200:
+            raise RuntimeError(f"Fetching the Calendar API discovery document failed: {response.status}")
+        document = content.decode('utf-8')
+
+    root_url = urlparse(json.loads(document).get('rootUrl', ''))
+    if root_url.scheme != 'https' or not (root_url.hostname == 'googleapis.com'
+                                          or (root_url.hostname or '').endswith('.googleapis.com')):
+        raise RuntimeError(f"Unexpected rootUrl in the Calendar API discovery document: {root_url.geturl()}")
+    return document
+
+
+def build_request(http, *args, **kwargs):
+    """ Sends every Calendar API request over a connection of the calling thread,
+    as httplib2 connections must not be shared between threads
+    """
+    if getattr(_local, 'http', None) is None:
+        _local.http = httplib2.Http(timeout=30)
+    return HttpRequest(AuthorizedHttp(get_credentials(), http=_local.http), *args, **kwargs)
+
+
 def get_calendar_service():
-    credentials = authenticate()
-    service = build('calendar', 'v3', credentials=credentials)
-    return service
+    """ Returns the Calendar API service of the process, built once and safe to use from any thread
+    """
+    global _calendar_service
+    with _calendar_lock:
+        if _calendar_service is None:
+            _calendar_service = build_from_document(
+                load_discovery_document(), credentials=get_credentials(), requestBuilder=build_request
+            )
+        return _calendar_service
 
 
-def get_influx_client():
+# Connections kept open to InfluxDB, i.e. the number of queries running at once without waiting
+INFLUXDB_POOL_SIZE = int(os.getenv('INFLUXDB_POOL_SIZE', '32'))
+# Seconds between two health checks of the shared client
+INFLUXDB_HEALTH_INTERVAL = float(os.getenv('INFLUXDB_HEALTH_INTERVAL', '30'))
+# Timeout of a query in milliseconds
+INFLUXDB_TIMEOUT = int(os.getenv('INFLUXDB_TIMEOUT', '30000'))
 
-    url = os.getenv('INFLUXDB_URL', 'http://localhost:8086')
-    token = os.getenv('INFLUXDB_TOKEN')
 
-    client = InfluxDBClient(url=url, token=token)
+class InfluxConnection(object):
+    """ InfluxDB client and query API shared by all requests of the process
 
-    return client
+    The client is created on first use and keeps its connection pool open between
+    requests instead of being built and closed by every handler. Before a query it
+    is pinged, at most every health_interval seconds; when the ping or a query fails
+    with a connection error, a new client replaces it, and the query is retried
+    once.
+    """
+
+    def __init__(self, url, token, pool_size=INFLUXDB_POOL_SIZE,
+                 health_interval=INFLUXDB_HEALTH_INTERVAL, timeout=INFLUXDB_TIMEOUT):
+        self.url = url
+        self.token = token
+        self.pool_size = pool_size
+        self.health_interval = health_interval
+        self.timeout = timeout
+        self._client = None
+        self._query_api = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        self._client = InfluxDBClient(url=self.url, token=self.token, timeout=self.timeout,
+                                      connection_pool_maxsize=self.pool_size)
+        self._query_api = self._client.query_api()
+        self._checked_at = time.monotonic()
+
+    def query_api(self):
+        """ Returns the shared query API, reconnecting if the periodic health check fails
+
+        Only one thread pings the client when a check is due, and it does so outside
+        the lock, so that other threads keep using the client in the meantime.
+        """
+        with self._lock:
+            if self._client is None:
+                self._connect()
+                return self._query_api
+            query_api = self._query_api
+            if time.monotonic() - self._checked_at <= self.health_interval:
+                return query_api
+            self._checked_at = time.monotonic()
+            client = self._client
+
+        try:
+            alive = client.ping()
+        except Exception:
+            alive = False
+        if alive:
+            return query_api
+        print("InfluxDB health check failed, reconnecting")
+        return self.reset(query_api)
+
+    def reset(self, query_api):
+        """ Replaces the client of query_api, unless another thread already did, and
+        returns the current query API
+
+        The old client is not closed, as other threads may still be reading responses
+        from its connections; it is released once they are done with it.
+        """
+        with self._lock:
+            if self._query_api is query_api:
+                self._connect()
+            return self._query_api
+
+    def query(self, query, org):
+        """ Runs a Flux query on the shared client and returns its tables
+        """
+        query_api = self.query_api()
+        try:
+            return query_api.query(org=org, query=query)
+        except (urllib3.exceptions.HTTPError, OSError) as e:
+            print(f"InfluxDB query failed ({e}), reconnecting")
+            return self.reset(query_api).query(org=org, query=query)
+
+    def query_csv(self, query, org, dialect):
+        """ Runs a Flux query on the shared client and returns the HTTP response of its CSV
+
+        The response is read while the rows are parsed, so they are never all in
+        memory; the caller must close it, also when it stops reading early. Only the
+        request itself is retried on a connection error, since a partly consumed
+        response cannot be replayed.
+        """
+        query_api = self.query_api()
+        try:
+            return query_api.query_raw(query, org=org, dialect=dialect)
+        except (urllib3.exceptions.HTTPError, OSError) as e:
+            print(f"InfluxDB query failed ({e}), reconnecting")
+            return self.reset(query_api).query_raw(query, org=org, dialect=dialect)
+
+
+influx = InfluxConnection(
+    url=os.getenv('INFLUXDB_URL', 'http://localhost:8086'),
+    token=os.getenv('INFLUXDB_TOKEN'),
+)
+
+
+def get_influx():
+    """ Returns the InfluxDB connection shared by all sensor endpoints
+    """
+    return influx
 
     
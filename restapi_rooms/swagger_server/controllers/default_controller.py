@@ -23,6 +23,7 @@ from .get_funcs.get_sensor_data import get_spec_room_spec_sensor, get_all_room_s
 from .get_funcs.get_sensor_data import get_spec_room_all_sensor, get_all_room_all_sensor
 from .get_funcs.get_booking import get_spec_room_bookings, get_all_room_bookings
 from .get_funcs.get_equipment import get_equipment_by_room, get_equipment_all_rooms
+from .get_funcs.get_compliance_summary import get_compliance_summary
 from .post_funcs.post_book_room import post_book_room_id
 
 
@@ -62,15 +63,42 @@ def rooms_bookings_get(start_date=None, days=None):  # noqa: E501
     return get_all_room_bookings(start_date, days)
 
 
-def rooms_co2_get():  # noqa: E501
+def rooms_co2_get(start=None, stop=None, every=None, fn=None, max_points=None):  # noqa: E501
     """Retrieve CO2 level data for all rooms.
 
     Provides the CO2 concentration measurements in parts per million (ppm) for monitoring air quality in various rooms # noqa: E501
 
+    :param start: Start of the time range, as an RFC3339 timestamp or relative to now (e.g. -6h); 14 days before stop if omitted
+    :type start: str
+    :param stop: End of the time range, as an RFC3339 timestamp or relative to now; now if omitted
+    :type stop: str
+    :param every: Aggregation window (e.g. 30s, 5m, 1h), the smallest window used with max_points; 30s if omitted
+    :type every: str
+    :param fn: Aggregate function of a window
+    :type fn: str
+    :param max_points: Maximum number of points per series
+    :type max_points: int
 
     :rtype: List[RoomCo2]
     """
-    return get_all_room_spec_sensor("co2", 14)
+    return get_all_room_spec_sensor("co2", 14, start, stop, every, fn, max_points)
+
+
+def rooms_compliance_summary_get(rooms=None, sensors=None, days=None):  # noqa: E501
+    """Get compliance statistics for several rooms and sensors
+
+    Computes mean, max, min, count and threshold exceedance percentages of the requested sensors inside InfluxDB, so that the compliance checks do not need the raw measurements # noqa: E501
+
+    :param rooms: Room identifiers to summarise (all rooms if omitted)
+    :type rooms: List[str]
+    :param sensors: Sensors to summarise (all sensors if omitted)
+    :type sensors: List[str]
+    :param days: Length of the history window in days
+    :type days: int
+
+    :rtype: List[RoomComplianceSummary]
+    """
+    return get_compliance_summary(rooms, sensors, days or 14)
 
 
 def rooms_equipment_get():  # noqa: E501
@@ -84,59 +112,109 @@ def rooms_equipment_get():  # noqa: E501
     return get_equipment_all_rooms()
 
 
-def rooms_humidity_get():  # noqa: E501
+def rooms_humidity_get(start=None, stop=None, every=None, fn=None, max_points=None):  # noqa: E501
     """Retrieve humidity data for all rooms
 
     Fetches relative humidity measurements in percentage (%) to assess moisture levels in different rooms # noqa: E501
 
+    :param start: Start of the time range, as an RFC3339 timestamp or relative to now (e.g. -6h); 14 days before stop if omitted
+    :type start: str
+    :param stop: End of the time range, as an RFC3339 timestamp or relative to now; now if omitted
+    :type stop: str
+    :param every: Aggregation window (e.g. 30s, 5m, 1h), the smallest window used with max_points; 30s if omitted
+    :type every: str
+    :param fn: Aggregate function of a window
+    :type fn: str
+    :param max_points: Maximum number of points per series
+    :type max_points: int
 
     :rtype: List[RoomHumidity]
     """
-    return get_all_room_spec_sensor("humidity", 14)
+    return get_all_room_spec_sensor("humidity", 14, start, stop, every, fn, max_points)
 
 
-def rooms_light_get():  # noqa: E501
+def rooms_light_get(start=None, stop=None, every=None, fn=None, max_points=None):  # noqa: E501
     """Retrieve light intensity data for all rooms
 
     Fetches the light intensity measurements in lux (lx) for all rooms to assess illumination levels # noqa: E501
 
+    :param start: Start of the time range, as an RFC3339 timestamp or relative to now (e.g. -6h); 14 days before stop if omitted
+    :type start: str
+    :param stop: End of the time range, as an RFC3339 timestamp or relative to now; now if omitted
+    :type stop: str
+    :param every: Aggregation window (e.g. 30s, 5m, 1h), the smallest window used with max_points; 30s if omitted
+    :type every: str
+    :param fn: Aggregate function of a window
+    :type fn: str
+    :param max_points: Maximum number of points per series
+    :type max_points: int
 
     :rtype: List[RoomLight]
     """
-    return get_all_room_spec_sensor("light", 14)
+    return get_all_room_spec_sensor("light", 14, start, stop, every, fn, max_points)
 
 
-def rooms_noise_get():  # noqa: E501
+def rooms_noise_get(start=None, stop=None, every=None, fn=None, max_points=None):  # noqa: E501
     """Retrieve sound level data for all rooms.
 
     Provides sound level measurements in decibels (dB) to monitor noise levels in different rooms. # noqa: E501
 
+    :param start: Start of the time range, as an RFC3339 timestamp or relative to now (e.g. -6h); 14 days before stop if omitted
+    :type start: str
+    :param stop: End of the time range, as an RFC3339 timestamp or relative to now; now if omitted
+    :type stop: str
+    :param every: Aggregation window (e.g. 30s, 5m, 1h), the smallest window used with max_points; 30s if omitted
+    :type every: str
+    :param fn: Aggregate function of a window
+    :type fn: str
+    :param max_points: Maximum number of points per series
+    :type max_points: int
 
     :rtype: List[RoomNoise]
     """
-    return get_all_room_spec_sensor("noise", 14)
+    return get_all_room_spec_sensor("noise", 14, start, stop, every, fn, max_points)
 
 
-def rooms_pm10_get():  # noqa: E501
+def rooms_pm10_get(start=None, stop=None, every=None, fn=None, max_points=None):  # noqa: E501
     """Retrieve air quality data (pm10)
 
     Fetches the air quality measurement, including particulate matter (μg/m³) for smaller particles(i.e. pm10) for all rooms # noqa: E501
 
+    :param start: Start of the time range, as an RFC3339 timestamp or relative to now (e.g. -6h); 14 days before stop if omitted
+    :type start: str
+    :param stop: End of the time range, as an RFC3339 timestamp or relative to now; now if omitted
+    :type stop: str
+    :param every: Aggregation window (e.g. 30s, 5m, 1h), the smallest window used with max_points; 30s if omitted
+    :type every: str
+    :param fn: Aggregate function of a window
+    :type fn: str
+    :param max_points: Maximum number of points per series
+    :type max_points: int
 
     :rtype: List[RoomAirQuality10]
     """
-    return get_all_room_spec_sensor("pm10", 14)
+    return get_all_room_spec_sensor("pm10", 14, start, stop, every, fn, max_points)
 
 
-def rooms_pm2_5_get():  # noqa: E501
+def rooms_pm2_5_get(start=None, stop=None, every=None, fn=None, max_points=None):  # noqa: E501
     """Retrieve air quality data (pm2.5)
 
     Fetches the air quality measurement, including particulate matter (μg/m³) for smaller particles(i.e. pm2.5) for all rooms # noqa: E501
 
+    :param start: Start of the time range, as an RFC3339 timestamp or relative to now (e.g. -6h); 14 days before stop if omitted
+    :type start: str
+    :param stop: End of the time range, as an RFC3339 timestamp or relative to now; now if omitted
+    :type stop: str
+    :param every: Aggregation window (e.g. 30s, 5m, 1h), the smallest window used with max_points; 30s if omitted
+    :type every: str
+    :param fn: Aggregate function of a window
+    :type fn: str
+    :param max_points: Maximum number of points per series
+    :type max_points: int
 
     :rtype: List[RoomAirQuality25]
     """
-    return get_all_room_spec_sensor("pm2_5", 14)
+    return get_all_room_spec_sensor("pm2_5", 14, start, stop, every, fn, max_points)
 
 
 def rooms_room_id_bookings_get(room_id, start_date=None, days=None):  # noqa: E501
@@ -156,17 +234,27 @@ def rooms_room_id_bookings_get(room_id, start_date=None, days=None):  # noqa: E5
     return get_spec_room_bookings(room_id, start_date, days)
 
 
-def rooms_room_id_co2_get(room_id):  # noqa: E501
+def rooms_room_id_co2_get(room_id, start=None, stop=None, every=None, fn=None, max_points=None):  # noqa: E501
     """Get co2 data for a specific room
 
     Retrieve co2 measurements for a specific room # noqa: E501
 
     :param room_id: Unique identifier for the room
     :type room_id: str
+    :param start: Start of the time range, as an RFC3339 timestamp or relative to now (e.g. -6h); 14 days before stop if omitted
+    :type start: str
+    :param stop: End of the time range, as an RFC3339 timestamp or relative to now; now if omitted
+    :type stop: str
+    :param every: Aggregation window (e.g. 30s, 5m, 1h), the smallest window used with max_points; 30s if omitted
+    :type every: str
+    :param fn: Aggregate function of a window
+    :type fn: str
+    :param max_points: Maximum number of points per series
+    :type max_points: int
 
     :rtype: RoomCo2
     """
-    return get_spec_room_spec_sensor("co2", room_id, 14)
+    return get_spec_room_spec_sensor("co2", room_id, 14, start, stop, every, fn, max_points)
 
 
 def rooms_room_id_equipment_get(room_id):  # noqa: E501
@@ -182,139 +270,249 @@ def rooms_room_id_equipment_get(room_id):  # noqa: E501
     return get_equipment_by_room(room_id)
 
 
-def rooms_room_id_humidity_get(room_id):  # noqa: E501
+def rooms_room_id_humidity_get(room_id, start=None, stop=None, every=None, fn=None, max_points=None):  # noqa: E501
     """Retrieve humidity data for a specific room.
 
     Fetches relative humidity measurements in percentage (%) to assess moisture level in a specific room. # noqa: E501
 
     :param room_id: Unique identifier for the room
     :type room_id: str
+    :param start: Start of the time range, as an RFC3339 timestamp or relative to now (e.g. -6h); 14 days before stop if omitted
+    :type start: str
+    :param stop: End of the time range, as an RFC3339 timestamp or relative to now; now if omitted
+    :type stop: str
+    :param every: Aggregation window (e.g. 30s, 5m, 1h), the smallest window used with max_points; 30s if omitted
+    :type every: str
+    :param fn: Aggregate function of a window
+    :type fn: str
+    :param max_points: Maximum number of points per series
+    :type max_points: int
 
     :rtype: RoomHumidity
     """
-    return get_spec_room_spec_sensor("humidity", room_id, 14)
+    return get_spec_room_spec_sensor("humidity", room_id, 14, start, stop, every, fn, max_points)
 
 
-def rooms_room_id_light_get(room_id):  # noqa: E501
+def rooms_room_id_light_get(room_id, start=None, stop=None, every=None, fn=None, max_points=None):  # noqa: E501
     """Get light data for a specific room
 
     Retrieve light measurements for a specific room # noqa: E501
 
     :param room_id: Unique identifier for the room
     :type room_id: str
+    :param start: Start of the time range, as an RFC3339 timestamp or relative to now (e.g. -6h); 14 days before stop if omitted
+    :type start: str
+    :param stop: End of the time range, as an RFC3339 timestamp or relative to now; now if omitted
+    :type stop: str
+    :param every: Aggregation window (e.g. 30s, 5m, 1h), the smallest window used with max_points; 30s if omitted
+    :type every: str
+    :param fn: Aggregate function of a window
+    :type fn: str
+    :param max_points: Maximum number of points per series
+    :type max_points: int
 
     :rtype: RoomLight
     """
-    return get_spec_room_spec_sensor("light", room_id, 14)
+    return get_spec_room_spec_sensor("light", room_id, 14, start, stop, every, fn, max_points)
 
 
 
-def rooms_room_id_noise_get(room_id):  # noqa: E501
+def rooms_room_id_noise_get(room_id, start=None, stop=None, every=None, fn=None, max_points=None):  # noqa: E501
     """Get noise/sound data for a specific room
 
     Retrieve noise/sound measurements for a specific room # noqa: E501
 
     :param room_id: Unique identifier for the room
     :type room_id: str
+    :param start: Start of the time range, as an RFC3339 timestamp or relative to now (e.g. -6h); 14 days before stop if omitted
+    :type start: str
+    :param stop: End of the time range, as an RFC3339 timestamp or relative to now; now if omitted
+    :type stop: str
+    :param every: Aggregation window (e.g. 30s, 5m, 1h), the smallest window used with max_points; 30s if omitted
+    :type every: str
+    :param fn: Aggregate function of a window
+    :type fn: str
+    :param max_points: Maximum number of points per series
+    :type max_points: int
 
     :rtype: RoomNoise
     """
-    return get_spec_room_spec_sensor("noise", room_id, 14)
+    return get_spec_room_spec_sensor("noise", room_id, 14, start, stop, every, fn, max_points)
 
 
-def rooms_room_id_pm10_get(room_id):  # noqa: E501
+def rooms_room_id_pm10_get(room_id, start=None, stop=None, every=None, fn=None, max_points=None):  # noqa: E501
     """Get air quality data for a specific room (i.e. pm10)
 
     Fetches the air quality measurements, including particulate matter (μg/m³) for smaller particles (i.e. pm10) of a single room # noqa: E501
 
     :param room_id: Unique identifier for the room
     :type room_id: str
+    :param start: Start of the time range, as an RFC3339 timestamp or relative to now (e.g. -6h); 14 days before stop if omitted
+    :type start: str
+    :param stop: End of the time range, as an RFC3339 timestamp or relative to now; now if omitted
+    :type stop: str
+    :param every: Aggregation window (e.g. 30s, 5m, 1h), the smallest window used with max_points; 30s if omitted
+    :type every: str
+    :param fn: Aggregate function of a window
+    :type fn: str
+    :param max_points: Maximum number of points per series
+    :type max_points: int
 
     :rtype: RoomAirQuality10
     """
-    return get_spec_room_spec_sensor("pm10", room_id, 14)
+    return get_spec_room_spec_sensor("pm10", room_id, 14, start, stop, every, fn, max_points)
 
 
-def rooms_room_id_pm2_5_get(room_id):  # noqa: E501
+def rooms_room_id_pm2_5_get(room_id, start=None, stop=None, every=None, fn=None, max_points=None):  # noqa: E501
     """Get air quality data for a specific room (i.e. pm2.5)
 
     Fetches the air quality measurements, including particulate matter (μg/m³) for smaller particles (i.e. pm2.5) of a single room # noqa: E501
 
     :param room_id: Unique identifier for the room
     :type room_id: str
+    :param start: Start of the time range, as an RFC3339 timestamp or relative to now (e.g. -6h); 14 days before stop if omitted
+    :type start: str
+    :param stop: End of the time range, as an RFC3339 timestamp or relative to now; now if omitted
+    :type stop: str
+    :param every: Aggregation window (e.g. 30s, 5m, 1h), the smallest window used with max_points; 30s if omitted
+    :type every: str
+    :param fn: Aggregate function of a window
+    :type fn: str
+    :param max_points: Maximum number of points per series
+    :type max_points: int
 
     :rtype: RoomAirQuality25
     """
-    return get_spec_room_spec_sensor("pm2_5", room_id, 14)
+    return get_spec_room_spec_sensor("pm2_5", room_id, 14, start, stop, every, fn, max_points)
 
 
-def rooms_room_id_sensor_get(room_id):  # noqa: E501
+def rooms_room_id_sensor_get(room_id, start=None, stop=None, every=None, fn=None, max_points=None):  # noqa: E501
     """Get sensor data for a specific room
 
     Retrieve all sensor data for a specific room # noqa: E501
 
     :param room_id: Unique identifier for the room
     :type room_id: str
+    :param start: Start of the time range, as an RFC3339 timestamp or relative to now (e.g. -6h); 14 days before stop if omitted
+    :type start: str
+    :param stop: End of the time range, as an RFC3339 timestamp or relative to now; now if omitted
+    :type stop: str
+    :param every: Aggregation window (e.g. 30s, 5m, 1h), the smallest window used with max_points; 30s if omitted
+    :type every: str
+    :param fn: Aggregate function of a window
+    :type fn: str
+    :param max_points: Maximum number of points per series
+    :type max_points: int
 
     :rtype: RoomData
     """
-    return get_spec_room_all_sensor(room_id, 14)
+    return get_spec_room_all_sensor(room_id, 14, start, stop, every, fn, max_points)
 
 
-def rooms_room_id_temperature_get(room_id):  # noqa: E501
+def rooms_room_id_temperature_get(room_id, start=None, stop=None, every=None, fn=None, max_points=None):  # noqa: E501
     """Retrieve temperature data for a specific room
 
     Provides temperature measurements in degrees Celsius (°C) to monitor indoor climate conditions for a specific room. # noqa: E501
 
     :param room_id: Unique identifier for the room
     :type room_id: str
+    :param start: Start of the time range, as an RFC3339 timestamp or relative to now (e.g. -6h); 14 days before stop if omitted
+    :type start: str
+    :param stop: End of the time range, as an RFC3339 timestamp or relative to now; now if omitted
+    :type stop: str
+    :param every: Aggregation window (e.g. 30s, 5m, 1h), the smallest window used with max_points; 30s if omitted
+    :type every: str
+    :param fn: Aggregate function of a window
+    :type fn: str
+    :param max_points: Maximum number of points per series
+    :type max_points: int
 
     :rtype: RoomTemperature
     """
-    return get_spec_room_spec_sensor("temperature", room_id, 14)
+    return get_spec_room_spec_sensor("temperature", room_id, 14, start, stop, every, fn, max_points)
 
 
-def rooms_room_id_voc_get(room_id):  # noqa: E501
+def rooms_room_id_voc_get(room_id, start=None, stop=None, every=None, fn=None, max_points=None):  # noqa: E501
     """Get voc data for a specific room
 
     Retrieve voc measurements for a specific room # noqa: E501
 
     :param room_id: Unique identifier for the room
     :type room_id: str
+    :param start: Start of the time range, as an RFC3339 timestamp or relative to now (e.g. -6h); 14 days before stop if omitted
+    :type start: str
+    :param stop: End of the time range, as an RFC3339 timestamp or relative to now; now if omitted
+    :type stop: str
+    :param every: Aggregation window (e.g. 30s, 5m, 1h), the smallest window used with max_points; 30s if omitted
+    :type every: str
+    :param fn: Aggregate function of a window
+    :type fn: str
+    :param max_points: Maximum number of points per series
+    :type max_points: int
 
     :rtype: RoomVoc
     """
-    return get_spec_room_spec_sensor("voc", room_id, 14)
+    return get_spec_room_spec_sensor("voc", room_id, 14, start, stop, every, fn, max_points)
 
 
-def rooms_sensor_get():  # noqa: E501
+def rooms_sensor_get(start=None, stop=None, every=None, fn=None, max_points=None):  # noqa: E501
     """Get sensor data for all rooms
 
     Retrieve all sensor data for all rooms # noqa: E501
 
+    :param start: Start of the time range, as an RFC3339 timestamp or relative to now (e.g. -6h); 14 days before stop if omitted
+    :type start: str
+    :param stop: End of the time range, as an RFC3339 timestamp or relative to now; now if omitted
+    :type stop: str
+    :param every: Aggregation window (e.g. 30s, 5m, 1h), the smallest window used with max_points; 30s if omitted
+    :type every: str
+    :param fn: Aggregate function of a window
+    :type fn: str
+    :param max_points: Maximum number of points per series
+    :type max_points: int
 
     :rtype: List[RoomData]
     """
-    return get_all_room_all_sensor(14)
+    return get_all_room_all_sensor(14, start, stop, every, fn, max_points)
 
 
-def rooms_temperature_get():  # noqa: E501
+def rooms_temperature_get(start=None, stop=None, every=None, fn=None, max_points=None):  # noqa: E501
     """Retrieve temperature data for all rooms.
 
     Provides temperature measurements in degrees Celsius (°C) to monitor indoor climate conditions # noqa: E501
 
+    :param start: Start of the time range, as an RFC3339 timestamp or relative to now (e.g. -6h); 14 days before stop if omitted
+    :type start: str
+    :param stop: End of the time range, as an RFC3339 timestamp or relative to now; now if omitted
+    :type stop: str
+    :param every: Aggregation window (e.g. 30s, 5m, 1h), the smallest window used with max_points; 30s if omitted
+    :type every: str
+    :param fn: Aggregate function of a window
+    :type fn: str
+    :param max_points: Maximum number of points per series
+    :type max_points: int
 
     :rtype: List[RoomTemperature]
     """
-    return get_all_room_spec_sensor("temperature", 14)
+    return get_all_room_spec_sensor("temperature", 14, start, stop, every, fn, max_points)
 
 
-def rooms_voc_get():  # noqa: E501
+def rooms_voc_get(start=None, stop=None, every=None, fn=None, max_points=None):  # noqa: E501
     """Retrieve VOC concentration data for all rooms.
 
     Fetches the volatile organic compounds (VOC) concentration in micrograms per cubic meter (μg/m³) to evaluate indoor air pollution. # noqa: E501
 
+    :param start: Start of the time range, as an RFC3339 timestamp or relative to now (e.g. -6h); 14 days before stop if omitted
+    :type start: str
+    :param stop: End of the time range, as an RFC3339 timestamp or relative to now; now if omitted
+    :type stop: str
+    :param every: Aggregation window (e.g. 30s, 5m, 1h), the smallest window used with max_points; 30s if omitted
+    :type every: str
+    :param fn: Aggregate function of a window
+    :type fn: str
+    :param max_points: Maximum number of points per series
+    :type max_points: int
 
     :rtype: List[RoomVoc]
     """
-    return get_all_room_spec_sensor("voc", 14)
+    return get_all_room_spec_sensor("voc", 14, start, stop, every, fn, max_points)
@@ -0,0 +1,126 @@
+import calendar
+import math
+import time
+
+from influxdb_client import Dialect
+from influxdb_client.client.flux_table import CSVIterator
+
+from ..authenticate import get_influx
+
+
+# Plain CSV without annotation rows: a header row per table schema, then one row of strings per point
+CSV_DIALECT = Dialect(header=True, annotations=[], date_time_format="RFC3339")
+
+READING_FORMAT = '{{"timestamp": "{}", "value": {}}}'
+
+
+def read_tables(flux_query, org, key_columns=(), chunk_size=None):
+    """Runs a Flux query and yields its tables as columns while InfluxDB sends them, see csv_tables.
+
+    The HTTP response is closed when the generator ends, is closed or fails, so a
+    reader that stops early (e.g. a disconnected client) does not keep it open.
+    """
+    response = get_influx().query_csv(flux_query, org=org, dialect=CSV_DIALECT)
+    try:
+        yield from csv_tables(CSVIterator(response), key_columns, chunk_size)
+    finally:
+        response.close()
+
+
+def csv_tables(rows, key_columns=(), chunk_size=None):
+    """Groups the raw CSV rows of a Flux query into tables, without a FluxRecord per point.
+
+    Yields (key, times, values) per table: key holds the values of key_columns, times
+    and values the _time and _value columns as the strings sent by InfluxDB. With
+    chunk_size, a table is yielded in parts of at most chunk_size rows, so that it is
+    never held in memory at once.
+    """
+    header = None
+    table_index = None
+    table = None
+    rows_of_table = []
+    for row in rows:
+        # An empty line ends a block of tables with the same columns, the next row is the header
+        # of another block, or of the error InfluxDB sends when a query fails while running
+        if not row:
+            if rows_of_table:
+                yield table_columns(rows_of_table, header, key_columns)
+                rows_of_table = []
+            header = None
+            continue
+        if header is None or row[table_index] == "table":
+            if "_time" not in row:
+                raise RuntimeError(f"InfluxDB query failed: {row}")
+            if rows_of_table:
+                yield table_columns(rows_of_table, header, key_columns)
+                rows_of_table = []
+            header = {name: index for index, name in enumerate(row)}
+            table_index = header["table"]
+            table = None
+            continue
+        if row[table_index] != table or (chunk_size and len(rows_of_table) >= chunk_size):
+            if rows_of_table:
+                yield table_columns(rows_of_table, header, key_columns)
+            table = row[table_index]
+            rows_of_table = []
+        rows_of_table.append(row)
+    if rows_of_table:
+        yield table_columns(rows_of_table, header, key_columns)
+
+
+def table_columns(rows, header, key_columns):
+    columns = list(zip(*rows))
+    key = tuple(rows[0][header[column]] for column in key_columns)
+    return key, columns[header["_time"]], columns[header["_value"]]
+
+
+def isoformat_times(times):
+    """Formats RFC3339 times of InfluxDB as datetime.isoformat() does, for a whole column.
+
+    Whole seconds ("2024-01-01T10:00:30Z") only need a new suffix; fractions are cut
+    to microseconds like the datetime objects the endpoints used to format.
+    """
+    return [
+        stamp[:19] + "+00:00" if len(stamp) == 20 else isoformat_fraction(stamp)
+        for stamp in times
+    ]
+
+
+def isoformat_fraction(stamp):
+    fraction = stamp[20:-1][:6].ljust(6, "0")
+    return stamp[:19] + ("" if fraction == "000000" else "." + fraction) + "+00:00"
+
+
+def epoch_millis(times):
+    """Converts a column of RFC3339 UTC times to epoch milliseconds, computing each day only once."""
+    days = {}
+    millis = []
+    for stamp in times:
+        day = stamp[:10]
+        if day not in days:
+            days[day] = calendar.timegm(time.strptime(day, "%Y-%m-%d")) * 1000
+        millis.append(
+            days[day] + int(stamp[11:13]) * 3600000 + int(stamp[14:16]) * 60000 + int(stamp[17:19]) * 1000
+            + (int(stamp[20:-1][:3].ljust(3, "0")) if len(stamp) > 20 else 0)
+        )
+    return millis
+
+
+def json_numbers(values):
+    """Returns the numbers of a _value column as JSON, with null for empty, NaN and infinite values."""
+    return [value if value[-1:].isdigit() else "null" for value in values]
+
+
+def float_values(values):
+    """Converts a _value column to floats, with None for empty, NaN and infinite values so that it stays valid JSON."""
+    return [finite_float(value) for value in values]
+
+
+def finite_float(value):
+    number = float(value) if value else math.nan
+    return number if math.isfinite(number) else None
+
+
+def readings_json(times, values):
+    """Serializes the columns as a JSON list of {"timestamp", "value"} objects, without a dict per reading."""
+    return "[" + ",".join(map(READING_FORMAT.format, isoformat_times(times), json_numbers(values))) + "]"
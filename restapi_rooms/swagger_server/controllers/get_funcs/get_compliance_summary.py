@@ -0,0 +1,126 @@
+from ..authenticate import get_influx
+
+import os
+import json
+from flask import jsonify
+
+
+aggr_window = "30s"
+
+sensor_map_influx = {"pm2_5": "air_quality_pm2_5",
+                     "pm10": "air_quality_pm10",
+                     "co2": "co2",
+                     "voc": "voc",
+                     "noise": "sound",
+                     "temperature": "temp",
+                     "light": "light",
+                     "humidity": "humidity"
+}
+
+# Thresholds of the rules in booking_system/modules/compliance_check.py.
+# "upper"/"lower" give the percentage of points strictly above/below the value,
+# "rolling" the percentage of 24h rolling means strictly above the value.
+compliance_thresholds = {"co2": {"upper": 1500, "lower": 1000},
+                         "pm2_5": {"rolling": 25},
+                         "pm10": {"rolling": 50},
+                         "noise": {"upper": 85},
+                         "light": {"lower": 500},
+                         "humidity": {"upper": 70, "lower": 30},
+                         "voc": {"upper": 400},
+                         "temperature": {"upper": 26, "lower": 19}
+}
+
+
+def build_summary_query(bucket, sensor_type, room_ids, days):
+    """Builds the Flux statements reducing one sensor to its compliance statistics.
+
+    Every statistic is emitted as its own yield named "<sensor>:<stat>" so that a
+    single query can carry the summaries of all requested sensors.
+    """
+    room_filter = ""
+    if room_ids:
+        condition = " or ".join(f'r["room_id"] == {json.dumps(room_id)}' for room_id in room_ids)
+        room_filter = f"\n          |> filter(fn: (r) => {condition})"
+
+    name = f"data_{sensor_type}"
+    statements = [f'''
+        {name} = from(bucket: "{bucket}")
+          |> range(start: -{days}d)
+          |> filter(fn: (r) => r["_measurement"] == "room_data")
+          |> filter(fn: (r) => r["_field"] == "{sensor_map_influx[sensor_type]}"){room_filter}
+          |> group(columns: ["room_id"])
+          |> aggregateWindow(every: {aggr_window}, fn: mean, createEmpty: false)
+    ''']
+
+    for stat in ("mean", "max", "min", "count"):
+        statements.append(f'{name} |> {stat}() |> yield(name: "{sensor_type}:{stat}")')
+
+    thresholds = compliance_thresholds.get(sensor_type, {})
+    if "upper" in thresholds:
+        statements.append(
+            f'{name} |> map(fn: (r) => ({{r with _value: if r._value > {float(thresholds["upper"])} then 100.0 else 0.0}}))'
+            f' |> mean() |> yield(name: "{sensor_type}:pct_above")'
+        )
+    if "lower" in thresholds:
+        statements.append(
+            f'{name} |> map(fn: (r) => ({{r with _value: if r._value < {float(thresholds["lower"])} then 100.0 else 0.0}}))'
+            f' |> mean() |> yield(name: "{sensor_type}:pct_below")'
+        )
+    if "rolling" in thresholds:
+        statements.append(
+            f'{name} |> timedMovingAverage(every: {aggr_window}, period: 24h)'
+            f' |> map(fn: (r) => ({{r with _value: if r._value > {float(thresholds["rolling"])} then 100.0 else 0.0}}))'
+            f' |> mean() |> yield(name: "{sensor_type}:pct_rolling_above")'
+        )
+
+    return "\n".join(statements)
+
+
+def get_compliance_summary(room_ids, sensor_types, days):
+    """Get the compliance statistics of several rooms and sensors
+
+    Reduces the sensor history inside InfluxDB to the handful of numbers the
+    compliance checks of the booking system need (mean, max, min, count and the
+    threshold exceedance percentages), instead of shipping every data point.
+
+    :param room_ids: Rooms to summarise, all rooms if empty
+    :type room_ids: List[str]
+    :param sensor_types: Sensors to summarise, all sensors if empty
+    :type sensor_types: List[str]
+    :param days: Length of the history window in days
+    :type days: int
+
+    :rtype: List[RoomComplianceSummary]
+    """
+    sensor_types = sensor_types or list(sensor_map_influx.keys())
+    unknown = [sensor for sensor in sensor_types if sensor not in sensor_map_influx]
+    if unknown:
+        return jsonify({"error": f"Unknown sensor(s): {', '.join(unknown)}"}), 400
+
+    org = os.getenv('INFLUXDB_ORG', 'myorg')
+    bucket = os.getenv('INFLUXDB_BUCKET', 'room_sensors')
+
+    flux_query = "\n".join(
+        build_summary_query(bucket, sensor_type, room_ids, days) for sensor_type in sensor_types
+    )
+
+    result = get_influx().query(flux_query, org=org)
+
+    rooms_data = {}
+    for table in result:
+        for record in table.records:
+            room_id = record.values.get("room_id")
+            sensor_type, stat = record.values.get("result").split(":", 1)
+
+            if room_id not in rooms_data:
+                rooms_data[room_id] = {
+                    "room": room_id,
+                    "sensors": {}
+                }
+
+            rooms_data[room_id]["sensors"].setdefault(sensor_type, {})[stat] = record.get_value()
+
+    if not rooms_data:
+        return jsonify({"error": "No sensor data found for the given rooms"}), 404
+
+    return jsonify(list(rooms_data.values()))
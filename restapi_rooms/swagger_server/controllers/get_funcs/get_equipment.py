@@ -1,4 +1,4 @@
-from flask import jsonify
+from flask import jsonify, request
 from sqlalchemy.orm import sessionmaker
 from ..db import engine  # Assuming you have a db.py file for engine setup
 from ..models import Room, Equipment  # Import the new models
@@ -36,7 +36,8 @@ def get_equipment_by_room(room_name):
 def get_equipment_all_rooms():
     session = Session()  # Create a session
 
-    rooms = session.query(Room).all()
+    # Ordered by name so that the ETag only changes when the equipment does
+    rooms = session.query(Room).order_by(Room.name).all()
 
     rooms_list = []
     for room in rooms:
@@ -55,4 +56,9 @@ def get_equipment_all_rooms():
         rooms_list.append(room_data)
 
     session.close()  # Close session
-    return jsonify(rooms_list)
+
+    # Tag the response with a hash of its content and answer 304 Not Modified
+    # if the client already holds this version (If-None-Match)
+    response = jsonify(rooms_list)
+    response.add_etag()
+    return response.make_conditional(request)
@@ -1,16 +1,224 @@
-from ..authenticate import get_influx_client
+from .flux_csv import epoch_millis, float_values, read_tables, readings_json
 
+import itertools
+import json
+import math
 import os
-from flask import abort, jsonify
-
-from influxdb_client.client.query_api import QueryApi
+import re
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+from flask import Response, abort, jsonify, request
 
 
 aggr_window = "30s"
 
-def get_spec_room_spec_sensor(sensor_type, room_id, days):
+# Aggregation windows to choose from for max_points, finest first
+AGGREGATION_WINDOWS = ["30s", "1m", "2m", "5m", "10m", "15m", "30m", "1h", "2h", "3h", "6h", "12h", "1d", "7d"]
+
+# Most points a series may have; a range needing more gets a coarser window, also without max_points
+SERIES_MAX_POINTS = int(os.getenv("SERIES_MAX_POINTS", "50000"))
+
+# Aggregate functions accepted for the fn parameter
+AGGREGATE_FUNCTIONS = ["mean", "median", "min", "max", "sum", "count", "first", "last"]
+
+DURATION_SECONDS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+DURATION_PATTERN = re.compile(r"^(\d+)([smhdw])$")
+# RFC3339 timestamp (fractions of seconds are dropped) or a plain date
+TIME_PATTERN = re.compile(r"^(\d{4}-\d{2}-\d{2})(?:[Tt ](\d{2}:\d{2}:\d{2})(?:\.\d+)?(Z|z|[+-]\d{2}:\d{2}))?$")
+
+# Time range and aggregation of a series query; start and stop are RFC3339 UTC timestamps
+SeriesWindow = namedtuple("SeriesWindow", ["start", "stop", "every", "fn"])
+
+
+def parse_duration(value):
+    """Returns the seconds of a duration such as "30s", "5m", "2h", "14d" or "1w"."""
+    match = DURATION_PATTERN.match(value or "")
+    if not match or int(match.group(1)) == 0:
+        raise ValueError(f"Invalid duration: {value}")
+    return int(match.group(1)) * DURATION_SECONDS[match.group(2)]
+
+
+def parse_time(value, now):
+    """Parses an RFC3339 timestamp, a date, or a duration relative to now such as "-6h"."""
+    if value.startswith("-"):
+        return now - timedelta(seconds=parse_duration(value[1:]))
+    match = TIME_PATTERN.match(value)
+    if not match:
+        raise ValueError(f"Invalid time: {value}")
+    date, clock, offset = match.groups()
+    try:
+        moment = datetime.strptime(f"{date}T{clock or '00:00:00'}", "%Y-%m-%dT%H:%M:%S")
+    except ValueError:
+        raise ValueError(f"Invalid time: {value}")
+    if offset and offset.upper() != "Z":
+        sign = -1 if offset[0] == "-" else 1
+        moment -= sign * timedelta(hours=int(offset[1:3]), minutes=int(offset[4:6]))
+    return moment.replace(tzinfo=timezone.utc)
+
+
+def format_duration(seconds):
+    """Formats seconds as the largest exact Flux duration unit."""
+    for unit in ("w", "d", "h", "m"):
+        if seconds % DURATION_SECONDS[unit] == 0:
+            return f"{seconds // DURATION_SECONDS[unit]}{unit}"
+    return f"{seconds}s"
+
+
+def series_window(days, start=None, stop=None, every=None, fn=None, max_points=None):
+    """Resolves the range and aggregation of a sensor series query.
+
+    The range is [start, stop), the last days days by default. Without every and
+    max_points the data is aggregated into aggr_window buckets as before. With
+    max_points, the finest window of AGGREGATION_WINDOWS (and at least every)
+    returning no more than max_points points is used, like Grafana's maxDataPoints,
+    so the size of the series no longer grows with the length of the range.
+    max_points is at most SERIES_MAX_POINTS, which also applies when it is omitted,
+    and every may not be finer than aggr_window.
+
+    Raises ValueError on invalid parameters.
+    """
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    stop_time = parse_time(stop, now) if stop else now
+    start_time = parse_time(start, now) if start else stop_time - timedelta(days=days)
+    if start_time >= stop_time:
+        raise ValueError("start must be before stop")
+    if fn is not None and fn not in AGGREGATE_FUNCTIONS:
+        raise ValueError(f"Invalid aggregate function: {fn}")
+    if max_points is not None and max_points < 1:
+        raise ValueError("max_points must be positive")
+
+    window = parse_duration(every) if every else parse_duration(aggr_window)
+    if window < parse_duration(aggr_window):
+        raise ValueError(f"every must be at least {aggr_window}")
+    max_points = min(max_points or SERIES_MAX_POINTS, SERIES_MAX_POINTS)
+    # Buckets are aligned to the epoch, so a range may touch one bucket more than it spans
+    needed = (stop_time - start_time).total_seconds() / max(max_points - 1, 1)
+    if window < needed:
+        window = next(
+            (seconds for seconds in map(parse_duration, AGGREGATION_WINDOWS) if seconds >= needed),
+            int(math.ceil(needed)),
+        )
+
+    return SeriesWindow(
+        start=start_time.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        stop=stop_time.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        every=format_duration(window),
+        fn=fn or "mean",
+    )
+
+
+# Media type of the columnar representation of a sensor series, requested with the Accept header
+COLUMNAR_MEDIA_TYPE = "application/vnd.rooms.columnar+json"
+
+
+def wants_columnar():
+    """Returns True if the client prefers the columnar representation over the list of readings."""
+    return request.accept_mimetypes.best_match(["application/json", COLUMNAR_MEDIA_TYPE]) == COLUMNAR_MEDIA_TYPE
+
+
+def columnar_series(room_id, sensor_type, times, values):
+    """Encodes the _time and _value columns of a series as parallel columns instead of one object per reading.
+
+    Times are epoch milliseconds. On the regular grid of aggregateWindow they are
+    sent as a start and a step; with gaps, as a "times" array.
+    """
+    times = epoch_millis(times)
+    series = {
+        "room": room_id,
+        "sensor": sensor_type,
+        "count": len(times),
+        "values": float_values(values),
+    }
+    step = times[1] - times[0] if len(times) > 1 else 0
+    if all(later - earlier == step for earlier, later in zip(times, times[1:])):
+        series["start"] = times[0] if times else None
+        series["step"] = step
+    else:
+        series["times"] = times
+    return series
+
+
+def columnar_response(body):
+    response = jsonify(body)
+    response.mimetype = COLUMNAR_MEDIA_TYPE
+    return response
+
+
+def json_response(body):
+    """Returns JSON text that was serialized column by column instead of through jsonify."""
+    return Response(body, mimetype="application/json")
+
+
+def collect_columns(tables):
+    """Concatenates the columns of the tables of each key, in the order the keys first appear."""
+    columns = {}
+    for key, times, values in tables:
+        key_times, key_values = columns.setdefault(key, ([], []))
+        key_times.extend(times)
+        key_values.extend(values)
+    return columns
+
+
+# Sensors of a RoomData object, in the order of the response
+ROOM_DATA_SENSORS = ["pm2_5", "pm10", "voc", "noise", "temperature", "co2", "light", "humidity"]
+
+
+def room_data_json(room_id, sensors):
+    """Serializes a RoomData object from the (times, values) columns of its sensors."""
+    parts = [f'"room": {json.dumps(room_id)}']
+    for sensor_type in ROOM_DATA_SENSORS:
+        times, values = sensors.get(sensor_type, ((), ()))
+        parts.append(f'"{sensor_type}": {readings_json(times, values)}')
+    return "{" + ", ".join(parts) + "}"
+
+
+# Media type of the streamed representation, one JSON object per line, requested with the Accept header
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Maximum number of readings in one streamed line
+NDJSON_CHUNK_SIZE = int(os.getenv("NDJSON_CHUNK_SIZE", "1000"))
+
+
+def wants_ndjson():
+    """Returns True if the client prefers the streamed representation over a single JSON document."""
+    return request.accept_mimetypes.best_match(["application/json", NDJSON_MEDIA_TYPE]) == NDJSON_MEDIA_TYPE
+
+
+def ndjson_lines(tables, sensor_map):
+    """Encodes streamed (room_id, field) table chunks as lines of {"room", "sensor", "readings"}.
+
+    The tables are read with a chunk size of NDJSON_CHUNK_SIZE rows, so that only one
+    line is held in memory at a time.
+    """
+    for (room_id, field), times, values in tables:
+        sensor_type = sensor_map.get(field)
+        if sensor_type is not None:
+            yield f'{{"room": {json.dumps(room_id)}, "sensor": "{sensor_type}", ' \
+                  f'"readings": {readings_json(times, values)}}}\n'
+
+
+def ndjson_response(tables, sensor_map):
+    """Streams table chunks as NDJSON, or returns None if there are none.
+
+    The first chunk is read before the response starts, so that a query error or
+    an empty result can still be answered with an error status. The tables are
+    closed with the response, also when the client disconnects before the end.
+    """
+    first = next(tables, None)
+    if first is None:
+        return None
+    response = Response(ndjson_lines(itertools.chain([first], tables), sensor_map), mimetype=NDJSON_MEDIA_TYPE)
+    response.call_on_close(tables.close)
+    return response
+
+
+def get_spec_room_spec_sensor(sensor_type, room_id, days, start=None, stop=None, every=None, fn=None, max_points=None):
+
+    try:
+        window = series_window(days, start, stop, every, fn, max_points)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
-    client = get_influx_client()
     org = os.getenv('INFLUXDB_ORG', 'myorg')
     bucket = os.getenv('INFLUXDB_BUCKET', 'room_sensors')
 
@@ -25,55 +233,42 @@ def get_spec_room_spec_sensor(sensor_type, room_id, days):
     }
 
     
-    try:
-        # Get the Query API
-        query_api: QueryApi = client.query_api()
+    # Flux query to retrieve data for the specific room
+    flux_query = f'''
+    from(bucket: "{bucket}")
+      |> range(start: {window.start}, stop: {window.stop})
+      |> filter(fn: (r) => r["_measurement"] == "room_data")
+      |> filter(fn: (r) => r["_field"] == "{sensor_map_influx[sensor_type]}")
+      |> filter(fn: (r) => r["room_id"] == "{room_id}")
+      |> aggregateWindow(every: {window.every}, fn: {window.fn}, createEmpty: false)
+      |> yield(name: "{window.fn}")
+    '''
 
-        # Flux query to retrieve data for the specific room
-        flux_query = f'''
-        from(bucket: "{bucket}")
-          |> range(start: -{days}d)
-          |> filter(fn: (r) => r["_measurement"] == "room_data")
-          |> filter(fn: (r) => r["_field"] == "{sensor_map_influx[sensor_type]}")
-          |> filter(fn: (r) => r["room_id"] == "{room_id}")
-          |> aggregateWindow(every: {aggr_window}, fn: mean, createEmpty: false)
-          |> yield(name: "mean")
-        '''
+    # Execute the query, all tables of the room make up one series
+    times, values = collect_columns(read_tables(flux_query, org)).get((), ((), ()))
 
-        # Execute the query
-        result = query_api.query(org=org, query=flux_query)
+    if not times:
+        return jsonify({"error": f"No {sensor_type} data found for the given room"}), 404
 
-        
-        # Prepare the air quality data in the desired format
-        data = []
-        for table in result:
-            for record in table.records:
-                data.append({
-                    'timestamp': record.get_time().isoformat(),
-                    'value': record.get_value()
-                })
+    if wants_columnar():
+        return columnar_response(columnar_series(room_id, sensor_type, times, values))
 
-        if not data:
-            return jsonify({"error": f"No {sensor_type} data found for the given room"}), 404
+    # Return the data in the desired format
+    return json_response(f'{{"room": {json.dumps(room_id)}, "{sensor_type}": {readings_json(times, values)}}}')
 
-        # Return the data in the desired format
-        return jsonify({
-            "room": room_id,
-            sensor_type: data
-        })
 
-    finally:
-        # Close the client
-        client.close()
 
 
 
 
 
+def get_all_room_spec_sensor(sensor_type, days, start=None, stop=None, every=None, fn=None, max_points=None):
 
-def get_all_room_spec_sensor(sensor_type, days):
+    try:
+        window = series_window(days, start, stop, every, fn, max_points)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
-    client = get_influx_client()
     org = os.getenv('INFLUXDB_ORG', 'myorg')
     bucket = os.getenv('INFLUXDB_BUCKET', 'room_sensors')
 
@@ -88,218 +283,145 @@ def get_all_room_spec_sensor(sensor_type, days):
     }
 
 
-    try:
-        query_api: QueryApi = client.query_api()
-        flux_query = f'''
-        from(bucket: "{bucket}")
-          |> range(start: -{days}d)
-          |> filter(fn: (r) => r["_measurement"] == "room_data")
-          |> filter(fn: (r) => r["_field"] == "{sensor_map_influx[sensor_type]}")
-          |> group(columns: ["room_id"])
-          |> aggregateWindow(every: {aggr_window}, fn: mean, createEmpty: false)
-          |> yield(name: "mean")
-        '''
-        
-        result = query_api.query(org=org, query=flux_query)
-        
-        # Dictionary to store data for each room
-        rooms_data = {}
-        
-        # Process the results
-        for table in result:
-            for record in table.records:
-                room_id = record.values.get("room_id")
-                
-                # Initialize room data if not exists
-                if room_id not in rooms_data:
-                    rooms_data[room_id] = {
-                        "room": room_id,
-                        sensor_type: []
-                    }
-                
-                # Add light measurement
-                rooms_data[room_id][sensor_type].append({
-                    'timestamp': record.get_time().isoformat(),
-                    'value': record.get_value()
-                })
-        
-        if not rooms_data:
-            return jsonify({"error": f"No {sensor_type} data found for any rooms"}), 404
-            
-        # Convert dictionary to list for response
-        response_data = list(rooms_data.values())
-        
-        return jsonify(response_data)
-        
-    finally:
-        client.close()
-
-
-
-
-def get_spec_room_all_sensor(room_id, days):  # noqa: E501
+    flux_query = f'''
+    from(bucket: "{bucket}")
+      |> range(start: {window.start}, stop: {window.stop})
+      |> filter(fn: (r) => r["_measurement"] == "room_data")
+      |> filter(fn: (r) => r["_field"] == "{sensor_map_influx[sensor_type]}")
+      |> group(columns: ["room_id"])
+      |> aggregateWindow(every: {window.every}, fn: {window.fn}, createEmpty: false)
+      |> yield(name: "{window.fn}")
+    '''
+    
+    # Columns of each room
+    rooms_columns = collect_columns(read_tables(flux_query, org, ["room_id"]))
+
+    if not rooms_columns:
+        return jsonify({"error": f"No {sensor_type} data found for any rooms"}), 404
+
+    if wants_columnar():
+        return columnar_response([
+            columnar_series(room_id, sensor_type, times, values)
+            for (room_id,), (times, values) in rooms_columns.items()
+        ])
+
+    return json_response("[" + ", ".join(
+        f'{{"room": {json.dumps(room_id)}, "{sensor_type}": {readings_json(times, values)}}}'
+        for (room_id,), (times, values) in rooms_columns.items()
+    ) + "]")
+
+
+
+
+
+def get_spec_room_all_sensor(room_id, days, start=None, stop=None, every=None, fn=None, max_points=None):  # noqa: E501
     """Get sensor data for a specific room
 
     Retrieve all sensor data for a specific room # noqa: E501
 
     :param room_id: Unique identifier for the room
     :type room_id: str
+    :param start, stop, every, fn, max_points: Range and aggregation, see series_window
 
     :rtype: RoomData
     """
 
-    
-    client = get_influx_client()
+    try:
+        window = series_window(days, start, stop, every, fn, max_points)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
     org = os.getenv('INFLUXDB_ORG', 'myorg')
     bucket = os.getenv('INFLUXDB_BUCKET', 'room_sensors')
     
-    try:
-        query_api: QueryApi = client.query_api()
-        flux_query = f'''
-        from(bucket: "{bucket}")
-          |> range(start: -{days}d)
-          |> filter(fn: (r) => r["_measurement"] == "room_data")
-          |> filter(fn: (r) => r["room_id"] == "{room_id}")
-          |> group(columns: ["room_id", "_field"])
-          |> aggregateWindow(every: {aggr_window}, fn: mean, createEmpty: false)
-          |> yield(name: "mean")
-        '''
-
-        # maps from influx terms to restapi terms
-        sensor_map = {"air_quality_pm2_5": "pm2_5",
-                      "air_quality_pm10": "pm10",
-                      "co2":"co2",
-                      "voc":"voc",
-                      "sound":"noise",
-                      "temp":"temperature",
-                      "light":"light",
-                      "humidity":"humidity"
-        }
-        
-        result = query_api.query(org=org, query=flux_query)
-        
-        # Dictionary to store data for each room
-        rooms_data = {}
-        
-        # Process the results
-        for table in result:
-            for record in table.records:
-                roomid = record.values.get("room_id")
-                sensor_type = record.get_field()
-                
-                # Initialize room data if not exists
-                if room_id not in rooms_data:
-                    rooms_data[roomid] = {
-                        "room": roomid,
-                        "pm2_5": [],
-                        "pm10": [],
-                        "voc": [],
-                        "noise": [],
-                        "temperature": [],
-                        "co2": [],
-                        "light": [],
-                        "humidity": []
-                    }
-                
-                
-                
-                mapped_sensor = sensor_map[sensor_type]
-                if mapped_sensor:
-                    rooms_data[room_id][mapped_sensor].append({
-                        'timestamp': record.get_time().isoformat(),
-                        'value': record.get_value()
-                    })
-        
-        if not rooms_data:
-            return jsonify({"error": f"No sensor data found for room {room_id}"}), 404
-            
-        # Convert dictionary to list for response
-        response_data = list(rooms_data.values())
-        
-        return jsonify(response_data)
-        
-    finally:
-        client.close()
-
-
-
-def get_all_room_all_sensor(days):  # noqa: E501
+    flux_query = f'''
+    from(bucket: "{bucket}")
+      |> range(start: {window.start}, stop: {window.stop})
+      |> filter(fn: (r) => r["_measurement"] == "room_data")
+      |> filter(fn: (r) => r["room_id"] == "{room_id}")
+      |> group(columns: ["room_id", "_field"])
+      |> aggregateWindow(every: {window.every}, fn: {window.fn}, createEmpty: false)
+      |> yield(name: "{window.fn}")
+    '''
+
+    # maps from influx terms to restapi terms
+    sensor_map = {"air_quality_pm2_5": "pm2_5",
+                  "air_quality_pm10": "pm10",
+                  "co2":"co2",
+                  "voc":"voc",
+                  "sound":"noise",
+                  "temp":"temperature",
+                  "light":"light",
+                  "humidity":"humidity"
+    }
+    
+    # Columns of each sensor of the room
+    sensors = {
+        sensor_map[field]: columns
+        for (field,), columns in collect_columns(read_tables(flux_query, org, ["_field"])).items()
+        if field in sensor_map
+    }
+
+    if not sensors:
+        return jsonify({"error": f"No sensor data found for room {room_id}"}), 404
+
+    return json_response("[" + room_data_json(room_id, sensors) + "]")
+
+
+
+
+def get_all_room_all_sensor(days, start=None, stop=None, every=None, fn=None, max_points=None):  # noqa: E501
     """Get sensor data for all rooms
 
     Retrieve all sensor data (temperature, air quality, etc.) for all rooms # noqa: E501
 
+    :param start, stop, every, fn, max_points: Range and aggregation, see series_window
 
     :rtype: List[RoomData]
     """
 
-    client = get_influx_client()
+    try:
+        window = series_window(days, start, stop, every, fn, max_points)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
     org = os.getenv('INFLUXDB_ORG', 'myorg')
     bucket = os.getenv('INFLUXDB_BUCKET', 'room_sensors')
     
-    try:
-        query_api: QueryApi = client.query_api()
-        flux_query = f'''
-        from(bucket: "{bucket}")
-          |> range(start: -{days}d)
-          |> filter(fn: (r) => r["_measurement"] == "room_data")
-          |> group(columns: ["room_id", "_field"])
-          |> aggregateWindow(every: {aggr_window}, fn: mean, createEmpty: false)
-          |> yield(name: "mean")
-        '''
-        sensor_map = {"air_quality_pm2_5": "pm2_5",
-                      "air_quality_pm10": "pm10",
-                      "co2":"co2",
-                      "voc":"voc",
-                      "sound":"noise",
-                      "temp":"temperature",
-                      "light":"light",
-                      "humidity":"humidity"
-        }
-
-        result = query_api.query(org=org, query=flux_query)
-        
-        # Dictionary to store data for each room
-        rooms_data = {}
-        
-        # Process the results
-        for table in result:
-            for record in table.records:
-                room_id = record.values.get("room_id")
-                sensor_type = record.get_field()
-                
-                # Initialize room data if not exists
-                if room_id not in rooms_data:
-                    rooms_data[room_id] = {
-                        "room": room_id,
-                        "pm2_5": [],
-                        "pm10": [],
-                        "voc": [],
-                        "noise": [],
-                        "temperature": [],
-                        "co2": [],
-                        "light": [],
-                        "humidity": []
-                    }
-                
-                
-                mapped_sensor = sensor_map.get(sensor_type)
-                if mapped_sensor:
-                    rooms_data[room_id][mapped_sensor].append({
-                        'timestamp': record.get_time().isoformat(),
-                        'value': record.get_value()
-                    })
-        
-        if not rooms_data:
-            return jsonify({"error": "No sensor data found for any rooms"}), 404
-            
-        # Convert dictionary to list for response
-        response_data = list(rooms_data.values())
-        
-        return jsonify(response_data)
-        
-    finally:
-        client.close()
+    flux_query = f'''
+    from(bucket: "{bucket}")
+      |> range(start: {window.start}, stop: {window.stop})
+      |> filter(fn: (r) => r["_measurement"] == "room_data")
+      |> group(columns: ["room_id", "_field"])
+      |> aggregateWindow(every: {window.every}, fn: {window.fn}, createEmpty: false)
+      |> yield(name: "{window.fn}")
+    '''
+    sensor_map = {"air_quality_pm2_5": "pm2_5",
+                  "air_quality_pm10": "pm10",
+                  "co2":"co2",
+                  "voc":"voc",
+                  "sound":"noise",
+                  "temp":"temperature",
+                  "light":"light",
+                  "humidity":"humidity"
+    }
 
+    if wants_ndjson():
+        tables = read_tables(flux_query, org, ["room_id", "_field"], chunk_size=NDJSON_CHUNK_SIZE)
+        response = ndjson_response(tables, sensor_map)
+        if response is None:
+            return jsonify({"error": "No sensor data found for any rooms"}), 404
+        return response
 
+    # Columns of each sensor of each room
+    rooms_sensors = {}
+    for (room_id, field), columns in collect_columns(read_tables(flux_query, org, ["room_id", "_field"])).items():
+        if field in sensor_map:
+            rooms_sensors.setdefault(room_id, {})[sensor_map[field]] = columns
 
+    if not rooms_sensors:
+        return jsonify({"error": "No sensor data found for any rooms"}), 404
 
+    return json_response("[" + ", ".join(
+        room_data_json(room_id, sensors) for room_id, sensors in rooms_sensors.items()
+    ) + "]")
@@ -1,4 +1,8 @@
+import json
+import os
 import re
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
 
 def translate_room_id(room_id):
     # Use regex to insert a space between the letters and numbers
@@ -8,3 +12,30 @@ def translate_room_id(room_id):
     transformed_id = re.sub(r'(\d{1,3})(\d{3})$', r'\1.\2', transformed_id)
     
     return transformed_id
+
+
+# Single background thread posting the booking events in order, so that a booking does not wait for them
+_notifier = ThreadPoolExecutor(max_workers=1, thread_name_prefix='booking-events')
+
+
+def notify_booking_system(room_id, start_timestamp):
+    """ Report a new booking to the booking system, which drops its cached
+    rankings of that date. The event is sent from a background thread and
+    failures are only logged: the cache entries then expire after their TTL.
+    """
+    _notifier.submit(post_booking_event, room_id, start_timestamp)
+
+
+def post_booking_event(room_id, start_timestamp):
+    url = os.getenv('BOOKING_SYSTEM_URL', 'http://booking_system:8081') + '/booking-events'
+    payload = json.dumps({"room_id": room_id, "start_timestamp": start_timestamp}).encode()
+    headers = {
+        "Content-Type": "application/json",
+        "X-Booking-Events-Token": os.getenv('BOOKING_EVENTS_TOKEN', ''),
+    }
+    request = urllib.request.Request(url, data=payload, headers=headers, method="POST")
+    try:
+        with urllib.request.urlopen(request, timeout=2) as response:
+            response.read()
+    except Exception as error:
+        print(f"Could not notify the booking system: {error}")
@@ -6,7 +6,7 @@ import pytz
 import traceback
 
 from ..authenticate import get_calendar_service
-from ..helper_funcs import translate_room_id
+from ..helper_funcs import translate_room_id, notify_booking_system
 
 
 
@@ -84,6 +84,8 @@ def post_book_room_id(body, room_id):
         
         service.events().insert(calendarId=calendar_id, body=event).execute()
         print("Arrived 6")
+
+        notify_booking_system(room_id, start_time.strftime('%Y-%m-%d %H:%M:%S'))
         
         return {
             "status": "success",
@@ -60,9 +60,30 @@ class TestDefaultController(BaseTestCase):
 
         Retrieve CO2 level data for all rooms.
         """
+        query_string = [('start', '-2d'),
+                        ('stop', '2013-10-20T19:20:30+01:00'),
+                        ('every', '5m'),
+                        ('fn', 'mean'),
+                        ('max_points', 56)]
         response = self.client.open(
             '/rooms/co2',
-            method='GET')
+            method='GET',
+            query_string=query_string)
+        self.assert200(response,
+                       'Response body is : ' + response.data.decode('utf-8'))
+
+    def test_rooms_compliance_summary_get(self):
+        """Test case for rooms_compliance_summary_get
+
+        Get compliance statistics for several rooms and sensors
+        """
+        query_string = [('rooms', 'rooms_example'),
+                        ('sensors', 'co2'),
+                        ('days', 14)]
+        response = self.client.open(
+            '/rooms/compliance-summary',
+            method='GET',
+            query_string=query_string)
         self.assert200(response,
                        'Response body is : ' + response.data.decode('utf-8'))
 
@@ -82,9 +103,15 @@ class TestDefaultController(BaseTestCase):
 
         Retrieve humidity data for all rooms
         """
+        query_string = [('start', '-2d'),
+                        ('stop', '2013-10-20T19:20:30+01:00'),
+                        ('every', '5m'),
+                        ('fn', 'mean'),
+                        ('max_points', 56)]
         response = self.client.open(
             '/rooms/humidity',
-            method='GET')
+            method='GET',
+            query_string=query_string)
         self.assert200(response,
                        'Response body is : ' + response.data.decode('utf-8'))
 
@@ -93,9 +120,15 @@ class TestDefaultController(BaseTestCase):
 
         Retrieve light intensity data for all rooms
         """
+        query_string = [('start', '-2d'),
+                        ('stop', '2013-10-20T19:20:30+01:00'),
+                        ('every', '5m'),
+                        ('fn', 'mean'),
+                        ('max_points', 56)]
         response = self.client.open(
             '/rooms/light',
-            method='GET')
+            method='GET',
+            query_string=query_string)
         self.assert200(response,
                        'Response body is : ' + response.data.decode('utf-8'))
 
@@ -104,9 +137,15 @@ class TestDefaultController(BaseTestCase):
 
         Retrieve sound level data for all rooms.
         """
+        query_string = [('start', '-2d'),
+                        ('stop', '2013-10-20T19:20:30+01:00'),
+                        ('every', '5m'),
+                        ('fn', 'mean'),
+                        ('max_points', 56)]
         response = self.client.open(
             '/rooms/noise',
-            method='GET')
+            method='GET',
+            query_string=query_string)
         self.assert200(response,
                        'Response body is : ' + response.data.decode('utf-8'))
 
@@ -115,9 +154,15 @@ class TestDefaultController(BaseTestCase):
 
         Retrieve air quality data (pm10)
         """
+        query_string = [('start', '-2d'),
+                        ('stop', '2013-10-20T19:20:30+01:00'),
+                        ('every', '5m'),
+                        ('fn', 'mean'),
+                        ('max_points', 56)]
         response = self.client.open(
             '/rooms/pm10',
-            method='GET')
+            method='GET',
+            query_string=query_string)
         self.assert200(response,
                        'Response body is : ' + response.data.decode('utf-8'))
 
@@ -126,9 +171,15 @@ class TestDefaultController(BaseTestCase):
 
         Retrieve air quality data (pm2.5)
         """
+        query_string = [('start', '-2d'),
+                        ('stop', '2013-10-20T19:20:30+01:00'),
+                        ('every', '5m'),
+                        ('fn', 'mean'),
+                        ('max_points', 56)]
         response = self.client.open(
             '/rooms/pm2_5',
-            method='GET')
+            method='GET',
+            query_string=query_string)
         self.assert200(response,
                        'Response body is : ' + response.data.decode('utf-8'))
 
@@ -151,9 +202,15 @@ class TestDefaultController(BaseTestCase):
 
         Get co2 data for a specific room
         """
+        query_string = [('start', '-2d'),
+                        ('stop', '2013-10-20T19:20:30+01:00'),
+                        ('every', '5m'),
+                        ('fn', 'mean'),
+                        ('max_points', 56)]
         response = self.client.open(
             '/rooms/{room_id}/co2'.format(room_id='room_id_example'),
-            method='GET')
+            method='GET',
+            query_string=query_string)
         self.assert200(response,
                        'Response body is : ' + response.data.decode('utf-8'))
 
@@ -173,9 +230,15 @@ class TestDefaultController(BaseTestCase):
 
         Retrieve humidity data for a specific room.
         """
+        query_string = [('start', '-2d'),
+                        ('stop', '2013-10-20T19:20:30+01:00'),
+                        ('every', '5m'),
+                        ('fn', 'mean'),
+                        ('max_points', 56)]
         response = self.client.open(
             '/rooms/{room_id}/humidity'.format(room_id='room_id_example'),
-            method='GET')
+            method='GET',
+            query_string=query_string)
         self.assert200(response,
                        'Response body is : ' + response.data.decode('utf-8'))
 
@@ -184,9 +247,15 @@ class TestDefaultController(BaseTestCase):
 
         Get light data for a specific room
         """
+        query_string = [('start', '-2d'),
+                        ('stop', '2013-10-20T19:20:30+01:00'),
+                        ('every', '5m'),
+                        ('fn', 'mean'),
+                        ('max_points', 56)]
         response = self.client.open(
             '/rooms/{room_id}/light'.format(room_id='room_id_example'),
-            method='GET')
+            method='GET',
+            query_string=query_string)
         self.assert200(response,
                        'Response body is : ' + response.data.decode('utf-8'))
 
@@ -195,9 +264,15 @@ class TestDefaultController(BaseTestCase):
 
         Get noise/sound data for a specific room
         """
+        query_string = [('start', '-2d'),
+                        ('stop', '2013-10-20T19:20:30+01:00'),
+                        ('every', '5m'),
+                        ('fn', 'mean'),
+                        ('max_points', 56)]
         response = self.client.open(
             '/rooms/{room_id}/noise'.format(room_id='room_id_example'),
-            method='GET')
+            method='GET',
+            query_string=query_string)
         self.assert200(response,
                        'Response body is : ' + response.data.decode('utf-8'))
 
@@ -206,9 +281,15 @@ class TestDefaultController(BaseTestCase):
 
         Get air quality data for a specific room (i.e. pm10)
         """
+        query_string = [('start', '-2d'),
+                        ('stop', '2013-10-20T19:20:30+01:00'),
+                        ('every', '5m'),
+                        ('fn', 'mean'),
+                        ('max_points', 56)]
         response = self.client.open(
             '/rooms/{room_id}/pm10'.format(room_id='room_id_example'),
-            method='GET')
+            method='GET',
+            query_string=query_string)
         self.assert200(response,
                        'Response body is : ' + response.data.decode('utf-8'))
 
@@ -217,9 +298,15 @@ class TestDefaultController(BaseTestCase):
 
         Get air quality data for a specific room (i.e. pm2.5)
         """
+        query_string = [('start', '-2d'),
+                        ('stop', '2013-10-20T19:20:30+01:00'),
+                        ('every', '5m'),
+                        ('fn', 'mean'),
+                        ('max_points', 56)]
         response = self.client.open(
             '/rooms/{room_id}/pm2_5'.format(room_id='room_id_example'),
-            method='GET')
+            method='GET',
+            query_string=query_string)
         self.assert200(response,
                        'Response body is : ' + response.data.decode('utf-8'))
 
@@ -228,9 +315,15 @@ class TestDefaultController(BaseTestCase):
 
         Get sensor data for a specific room
         """
+        query_string = [('start', '-2d'),
+                        ('stop', '2013-10-20T19:20:30+01:00'),
+                        ('every', '5m'),
+                        ('fn', 'mean'),
+                        ('max_points', 56)]
         response = self.client.open(
             '/rooms/{room_id}/sensor'.format(room_id='room_id_example'),
-            method='GET')
+            method='GET',
+            query_string=query_string)
         self.assert200(response,
                        'Response body is : ' + response.data.decode('utf-8'))
 
@@ -239,9 +332,15 @@ class TestDefaultController(BaseTestCase):
 
         Retrieve temperature data for a specific room
         """
+        query_string = [('start', '-2d'),
+                        ('stop', '2013-10-20T19:20:30+01:00'),
+                        ('every', '5m'),
+                        ('fn', 'mean'),
+                        ('max_points', 56)]
         response = self.client.open(
             '/rooms/{room_id}/temperature'.format(room_id='room_id_example'),
-            method='GET')
+            method='GET',
+            query_string=query_string)
         self.assert200(response,
                        'Response body is : ' + response.data.decode('utf-8'))
 
@@ -250,9 +349,15 @@ class TestDefaultController(BaseTestCase):
 
         Get voc data for a specific room
         """
+        query_string = [('start', '-2d'),
+                        ('stop', '2013-10-20T19:20:30+01:00'),
+                        ('every', '5m'),
+                        ('fn', 'mean'),
+                        ('max_points', 56)]
         response = self.client.open(
             '/rooms/{room_id}/voc'.format(room_id='room_id_example'),
-            method='GET')
+            method='GET',
+            query_string=query_string)
         self.assert200(response,
                        'Response body is : ' + response.data.decode('utf-8'))
 
@@ -261,9 +366,15 @@ class TestDefaultController(BaseTestCase):
 
         Get sensor data for all rooms
         """
+        query_string = [('start', '-2d'),
+                        ('stop', '2013-10-20T19:20:30+01:00'),
+                        ('every', '5m'),
+                        ('fn', 'mean'),
+                        ('max_points', 56)]
         response = self.client.open(
             '/rooms/sensor',
-            method='GET')
+            method='GET',
+            query_string=query_string)
         self.assert200(response,
                        'Response body is : ' + response.data.decode('utf-8'))
 
@@ -272,9 +383,15 @@ class TestDefaultController(BaseTestCase):
 
         Retrieve temperature data for all rooms.
         """
+        query_string = [('start', '-2d'),
+                        ('stop', '2013-10-20T19:20:30+01:00'),
+                        ('every', '5m'),
+                        ('fn', 'mean'),
+                        ('max_points', 56)]
         response = self.client.open(
             '/rooms/temperature',
-            method='GET')
+            method='GET',
+            query_string=query_string)
         self.assert200(response,
                        'Response body is : ' + response.data.decode('utf-8'))
 
@@ -283,9 +400,15 @@ class TestDefaultController(BaseTestCase):
 
         Retrieve VOC concentration data for all rooms.
         """
+        query_string = [('start', '-2d'),
+                        ('stop', '2013-10-20T19:20:30+01:00'),
+                        ('every', '5m'),
+                        ('fn', 'mean'),
+                        ('max_points', 56)]
         response = self.client.open(
             '/rooms/voc',
-            method='GET')
+            method='GET',
+            query_string=query_string)
         self.assert200(response,
                        'Response body is : ' + response.data.decode('utf-8'))
 
@@ -0,0 +1,169 @@
+# coding: utf-8
+
+import calendar
+import csv
+import io
+import json
+import unittest
+
+from influxdb_client.client.flux_csv_parser import FluxCsvParser, FluxSerializationMode
+
+from swagger_server.controllers.get_funcs.flux_csv import (
+    csv_tables, epoch_millis, float_values, isoformat_times, json_numbers, readings_json
+)
+
+COLUMNS = ["", "result", "table", "_start", "_stop", "_time", "_value", "_field", "_measurement", "room_id"]
+ANNOTATIONS = [
+    ["#datatype", "string", "long", "dateTime:RFC3339", "dateTime:RFC3339", "dateTime:RFC3339", "double",
+     "string", "string", "string"],
+    ["#group", "false", "false", "true", "true", "false", "false", "true", "true", "true"],
+    ["#default", "_result", "", "", "", "", "", "", "", ""],
+]
+START = "2024-01-01T00:00:00Z"
+STOP = "2024-01-02T00:00:00Z"
+
+# Times as InfluxDB writes them in RFC3339: whole seconds, or fractions of up to nine digits without trailing zeros
+TIMES = [
+    "2024-01-01T10:00:30Z",
+    "2024-01-01T10:00:30.5Z",
+    "2024-01-01T10:00:30.05Z",
+    "2024-01-01T10:00:30.123Z",
+    "2024-01-01T10:00:30.123456Z",
+    "2024-01-01T10:00:30.1234567Z",
+    "2024-01-01T10:00:30.123456789Z",
+    "2024-01-01T10:00:30.000000001Z",
+    "2024-01-01T23:59:59.999999999Z",
+    "2024-02-29T00:00:00Z",
+]
+
+
+def rows(text):
+    return csv.reader(io.StringIO(text))
+
+
+def table_rows(table, field, room_id, times, values):
+    return [["", "_result", str(table), START, STOP, stamp, value, field, "room_data", room_id]
+            for stamp, value in zip(times, values)]
+
+
+def write_csv(*blocks, annotated=False):
+    """Writes blocks of table rows, each with its header, separated by an empty line as InfluxDB does."""
+    output = io.StringIO()
+    writer = csv.writer(output, lineterminator="\r\n")
+    for index, block in enumerate(blocks):
+        if index:
+            output.write("\r\n")
+        writer.writerows(ANNOTATIONS if annotated else [])
+        writer.writerow(COLUMNS)
+        writer.writerows(block)
+    return output.getvalue()
+
+
+class TestCsvTables(unittest.TestCase):
+
+    def test_tables(self):
+        text = write_csv(
+            table_rows(0, "co2", "room_1", TIMES[:2], ["400", "410"])
+            + table_rows(1, "co2", "room_2", TIMES[2:5], ["500", "", "520"])
+        )
+        tables = list(csv_tables(rows(text), ["room_id", "_field"]))
+        self.assertEqual(tables, [
+            (("room_1", "co2"), tuple(TIMES[:2]), ("400", "410")),
+            (("room_2", "co2"), tuple(TIMES[2:5]), ("500", "", "520")),
+        ])
+
+    def test_blocks_with_their_own_header(self):
+        # A second block starts with the table numbers of the first one and other columns
+        second = [
+            ["", "_result", "0", START, STOP, "room_data", "room_3", TIMES[0], "21.5", "temperature"],
+        ]
+        text = write_csv(table_rows(0, "co2", "room_1", TIMES[:2], ["400", "410"]))
+        text += "\r\n" + ",".join(["", "result", "table", "_start", "_stop", "_measurement", "room_id",
+                                   "_time", "_value", "_field"]) + "\r\n"
+        text += "\r\n".join(",".join(row) for row in second) + "\r\n"
+        tables = list(csv_tables(rows(text), ["room_id", "_field"]))
+        self.assertEqual(tables, [
+            (("room_1", "co2"), tuple(TIMES[:2]), ("400", "410")),
+            (("room_3", "temperature"), (TIMES[0],), ("21.5",)),
+        ])
+
+    def test_chunks(self):
+        text = write_csv(table_rows(0, "co2", "room_1", TIMES[:5], ["1", "2", "3", "4", "5"])
+                         + table_rows(1, "co2", "room_2", TIMES[:1], ["6"]))
+        tables = list(csv_tables(rows(text), ["room_id"], chunk_size=2))
+        self.assertEqual([(key, values) for key, _, values in tables], [
+            (("room_1",), ("1", "2")),
+            (("room_1",), ("3", "4")),
+            (("room_1",), ("5",)),
+            (("room_2",), ("6",)),
+        ])
+
+    def test_empty_result(self):
+        self.assertEqual(list(csv_tables(rows(""))), [])
+        self.assertEqual(list(csv_tables(rows(write_csv([])))), [])
+
+    def test_error_row(self):
+        text = "error,reference\r\nfailed to execute query,897\r\n"
+        with self.assertRaises(RuntimeError):
+            list(csv_tables(rows(text)))
+
+    def test_error_after_tables(self):
+        text = write_csv(table_rows(0, "co2", "room_1", TIMES[:1], ["400"]))
+        text += "\r\nerror,reference\r\nquery timed out,\r\n"
+        tables = csv_tables(rows(text), ["room_id"])
+        with self.assertRaises(RuntimeError):
+            list(tables)
+
+
+class TestTimes(unittest.TestCase):
+
+    def records(self):
+        """Parses the times with the FluxRecord parser the endpoints used before the raw CSV."""
+        text = write_csv(table_rows(0, "co2", "room_1", TIMES, ["1"] * len(TIMES)), annotated=True)
+        parser = FluxCsvParser(response=io.BytesIO(text.encode("utf-8")),
+                               serialization_mode=FluxSerializationMode.tables)
+        with parser:
+            list(parser.generator())
+        return [record for table in parser.table_list() for record in table.records]
+
+    def test_isoformat_times_match_flux_records(self):
+        expected = [record.get_time().isoformat() for record in self.records()]
+        self.assertEqual(isoformat_times(TIMES), expected)
+
+    def test_fractions_are_cut_to_microseconds(self):
+        self.assertEqual(isoformat_times(["2024-01-01T10:00:30.5Z", "2024-01-01T10:00:30.123456789Z"]),
+                         ["2024-01-01T10:00:30.500000+00:00", "2024-01-01T10:00:30.123456+00:00"])
+
+    def test_epoch_millis_match_flux_records(self):
+        expected = [calendar.timegm(record.get_time().utctimetuple()) * 1000 + record.get_time().microsecond // 1000
+                    for record in self.records()]
+        self.assertEqual(epoch_millis(TIMES), expected)
+
+    def test_epoch_millis(self):
+        self.assertEqual(epoch_millis(["1970-01-01T00:00:00Z", "1970-01-02T00:00:01.25Z"]), [0, 86401250])
+
+
+class TestValues(unittest.TestCase):
+
+    VALUES = ["21.5", "-3", "0", "1e+21", "4.5e-07", "", "NaN", "+Inf", "-Inf"]
+
+    def test_json_numbers(self):
+        self.assertEqual(json_numbers(self.VALUES),
+                         ["21.5", "-3", "0", "1e+21", "4.5e-07", "null", "null", "null", "null"])
+
+    def test_float_values(self):
+        self.assertEqual(float_values(self.VALUES), [21.5, -3.0, 0.0, 1e21, 4.5e-07, None, None, None, None])
+        json.dumps(float_values(self.VALUES), allow_nan=False)
+
+    def test_readings_json(self):
+        body = readings_json(TIMES[:3], ["400.5", "NaN", ""])
+        self.assertEqual(json.loads(body), [
+            {"timestamp": "2024-01-01T10:00:30+00:00", "value": 400.5},
+            {"timestamp": "2024-01-01T10:00:30.500000+00:00", "value": None},
+            {"timestamp": "2024-01-01T10:00:30.050000+00:00", "value": None},
+        ])
+        self.assertEqual(json.loads(readings_json((), ())), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+# coding: utf-8
+
+import math
+import random
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from swagger_server.controllers.get_funcs import get_sensor_data
+from swagger_server.controllers.get_funcs.get_sensor_data import parse_duration, parse_time, series_window
+
+NOW = datetime(2024, 6, 1, 12, 0, 0, tzinfo=timezone.utc)
+
+
+def utc(text):
+    return datetime.strptime(text, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
+
+
+class TestParseDuration(unittest.TestCase):
+
+    def test_units(self):
+        self.assertEqual(parse_duration("30s"), 30)
+        self.assertEqual(parse_duration("5m"), 300)
+        self.assertEqual(parse_duration("2h"), 7200)
+        self.assertEqual(parse_duration("14d"), 14 * 86400)
+        self.assertEqual(parse_duration("1w"), 604800)
+
+    def test_invalid(self):
+        for value in ("0s", "5", "m", "5x", "-5m", "1.5h", "", None):
+            with self.assertRaises(ValueError, msg=value):
+                parse_duration(value)
+
+
+class TestParseTime(unittest.TestCase):
+
+    def test_date(self):
+        self.assertEqual(parse_time("2024-01-01", NOW), datetime(2024, 1, 1, tzinfo=timezone.utc))
+
+    def test_utc_time(self):
+        self.assertEqual(parse_time("2024-01-01T10:00:30Z", NOW), datetime(2024, 1, 1, 10, 0, 30, tzinfo=timezone.utc))
+
+    def test_fraction_is_dropped(self):
+        self.assertEqual(parse_time("2024-01-01T10:00:30.999Z", NOW),
+                         datetime(2024, 1, 1, 10, 0, 30, tzinfo=timezone.utc))
+
+    def test_offset(self):
+        self.assertEqual(parse_time("2024-01-01T10:00:00+02:00", NOW), datetime(2024, 1, 1, 8, tzinfo=timezone.utc))
+        self.assertEqual(parse_time("2024-01-01T23:30:00-01:30", NOW), datetime(2024, 1, 2, 1, tzinfo=timezone.utc))
+
+    def test_relative(self):
+        self.assertEqual(parse_time("-6h", NOW), NOW - timedelta(hours=6))
+        self.assertEqual(parse_time("-2w", NOW), NOW - timedelta(weeks=2))
+
+    def test_invalid(self):
+        for value in ("yesterday", "2024-13-01", "2024-02-30", "2024-01-01T25:00:00Z", "-0h", "-6x", "2024-01-01T10:00"):
+            with self.assertRaises(ValueError, msg=value):
+                parse_time(value, NOW)
+
+
+class TestSeriesWindow(unittest.TestCase):
+
+    def test_default(self):
+        window = series_window(14)
+        self.assertEqual(utc(window.stop) - utc(window.start), timedelta(days=14))
+        self.assertEqual((window.every, window.fn), ("30s", "mean"))
+
+    def test_relative_start(self):
+        window = series_window(14, start="-6h")
+        self.assertEqual(utc(window.stop) - utc(window.start), timedelta(hours=6))
+
+    def test_absolute_range(self):
+        window = series_window(14, start="2024-01-01T01:00:00+01:00", stop="2024-01-02", every="5m", fn="max")
+        self.assertEqual(window, get_sensor_data.SeriesWindow(
+            start="2024-01-01T00:00:00Z", stop="2024-01-02T00:00:00Z", every="5m", fn="max"
+        ))
+
+    def test_max_points_picks_the_finest_window(self):
+        day = {"start": "2024-01-01", "stop": "2024-01-02"}
+        self.assertEqual(series_window(14, max_points=100, **day).every, "15m")
+        self.assertEqual(series_window(14, max_points=2881, **day).every, "30s")
+        self.assertEqual(series_window(14, max_points=2880, **day).every, "1m")
+        self.assertEqual(series_window(14, max_points=2, **day).every, "1d")
+        self.assertEqual(series_window(14, max_points=1, **day).every, "1d")
+
+    def test_every_is_the_smallest_window(self):
+        window = series_window(14, start="2024-01-01", stop="2024-01-02", every="1h", max_points=1000)
+        self.assertEqual(window.every, "1h")
+
+    def test_range_longer_than_the_windows(self):
+        window = series_window(14, start="2000-01-01", stop="2024-01-01", max_points=10)
+        self.assertEqual(window.every, "974d")
+
+    def test_points_stay_within_max_points(self):
+        rng = random.Random(0)
+        for _ in range(200):
+            seconds = rng.randint(60, 400 * 86400)
+            max_points = rng.randint(2, 5000)
+            window = series_window(14, start=f"-{seconds}s", max_points=max_points)
+            buckets = math.ceil(seconds / parse_duration(window.every)) + 1
+            self.assertLessEqual(buckets, max_points, (seconds, max_points, window.every))
+
+    def test_points_are_capped_without_max_points(self):
+        window = series_window(14, start="2023-01-01", stop="2024-01-01")
+        self.assertEqual(window.every, "15m")
+        cap = series_window(14, start="2023-01-01", stop="2024-01-01", max_points=10 ** 9)
+        self.assertEqual(cap.every, "15m")
+        self.assertLessEqual(365 * 86400 / parse_duration(window.every) + 1, get_sensor_data.SERIES_MAX_POINTS)
+
+    def test_invalid(self):
+        for kwargs in (
+            {"start": "2024-01-02", "stop": "2024-01-01"},
+            {"start": "2024-01-01", "stop": "2024-01-01"},
+            {"fn": "average"},
+            {"max_points": 0},
+            {"every": "1s"},
+            {"every": "29s"},
+            {"every": "0m"},
+            {"start": "soon"},
+        ):
+            with self.assertRaises(ValueError, msg=kwargs):
+                series_window(14, **kwargs)
+
+
+if __name__ == '__main__':
+    unittest.main()
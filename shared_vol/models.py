@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine, Column, Integer, String, ForeignKey, UniqueConstraint, Float
+from sqlalchemy import create_engine, Column, Integer, String, ForeignKey, UniqueConstraint, Float, Boolean, DateTime, JSON
 from sqlalchemy.orm import declarative_base, sessionmaker, relationship
 
 Base = declarative_base()
@@ -10,6 +10,7 @@ class Room(Base):
     name = Column(String, unique=True, nullable=False)
     equipment = relationship("Equipment", back_populates="room")
     sensors = relationship("Sensor", back_populates="room")
+    compliance = relationship("RoomCompliance", back_populates="room")
     
     
 class Sensor(Base):
@@ -44,5 +45,24 @@ class Equipment(Base):
     def __repr__(self):
         return (f"<Equipment(id={self.id}, room_id={self.room_id}, "
                 f"name='{self.name}', value='{self.value}', type='{self.type}')>")
-    
-    
+
+
+class RoomCompliance(Base):
+    __tablename__ = 'room_compliance'
+
+    # Also the index of the lookups by room and window
+    __table_args__ = (UniqueConstraint('room_id', 'window_days', 'sensor', name='_room_id_window_sensor_compliance_uc'),)
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    room_id = Column(Integer, ForeignKey('rooms.id', ondelete="CASCADE"), nullable=False)
+    sensor = Column(String, nullable=False)
+    window_days = Column(Integer, nullable=False)
+    compliant = Column(Boolean, nullable=False)
+    result = Column(JSON, nullable=False)
+    attributes = Column(JSON, nullable=False)
+    evaluated_at = Column(DateTime(timezone=True), nullable=False)
+    room = relationship("Room", back_populates="compliance")
+
+    def __repr__(self):
+        return (f"<RoomCompliance(id={self.id}, room_id={self.room_id}, sensor='{self.sensor}', "
+                f"window_days={self.window_days}, compliant={self.compliant}, evaluated_at='{self.evaluated_at}')>")